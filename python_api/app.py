@@ -1,12 +1,25 @@
 from fastapi import FastAPI, HTTPException, Request, UploadFile, File, Form
-from fastapi.responses import StreamingResponse
+from fastapi.responses import StreamingResponse, Response, JSONResponse, PlainTextResponse
 from pydantic import BaseModel
 from typing import Optional, List
 from notebook_client import manager
 from task_manager import task_manager
+from summary_service import summary_service
+from browser_supervisor import supervisor
+from media_stream import file_range_response
+from artifact_store import artifact_store, content_cache
+from generation_dedup import generation_dedup
+from export_service import export_service, ExportQueueFull, can_render
+from file_io import run_io, remove_quietly, flush_all, blocking_guard_from_env, log_dir
+from loop_monitor import loop_monitor
+from metrics import metrics, Counter, Gauge, generation_duration
+from tracing import tracer
+from profiler import profiler, active_profile
+from loop_monitor import endpoint_label
 import os
 import asyncio
 import json
+import time
 from pathlib import Path
 
 app = FastAPI()
@@ -37,11 +50,92 @@ class SourceUrlResult(BaseModel):
     source_id: str
     notebook_id: str
 
+# Test mode: NOTEBOOKLM_BLOCK_THRESHOLD_MS reports callbacks that block the loop;
+# NOTEBOOKLM_BLOCK_STRICT=1 also fails the requests during which that happened
+blocking_guard = blocking_guard_from_env()
+
+@app.middleware("http")
+async def fail_on_blocking(request: Request, call_next):
+    if not blocking_guard or not blocking_guard.strict:
+        return await call_next(request)
+    seen = len(blocking_guard.violations)
+    response = await call_next(request)
+    if len(blocking_guard.violations) > seen:
+        worst = max(blocking_guard.violations[seen:], key=lambda v: v["ms"])
+        return JSONResponse(
+            {"detail": f"Event loop blocked {worst['ms']} ms (threshold {blocking_guard.threshold_ms:.0f} ms)", "callback": worst["callback"]},
+            status_code=500
+        )
+    return response
+
+@app.middleware("http")
+async def attribute_loop_stalls(request: Request, call_next):
+    # Lets the loop monitor tell which endpoint was running when the loop stalled
+    if not loop_monitor:
+        return await call_next(request)
+    token = loop_monitor.request_started(request.scope)
+    try:
+        return await call_next(request)
+    finally:
+        loop_monitor.request_finished(request.scope, token)
+
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    # Root span per request; manager, RPC, file I/O and generation spans nest under it
+    if not tracer.enabled:
+        return await call_next(request)
+    with tracer.span("http.request", method=request.method, path=request.url.path) as span:
+        response = await call_next(request)
+        span.name = endpoint_label(request.scope)
+        span.set(status_code=response.status_code)
+        return response
+
+@app.middleware("http")
+async def profile_on_request(request: Request, call_next):
+    # "X-Profile: 1" (or ?profile=1) samples this request and every task it spawns
+    flag = request.headers.get("x-profile") or request.query_params.get("profile")
+    if not flag or flag in ("0", "false"):
+        return await call_next(request)
+    session = profiler.start(f"{request.method} {request.url.path}")
+    try:
+        response = await call_next(request)
+    except BaseException:
+        profiler.stop(session)
+        raise
+
+    # Streaming bodies (NDJSON, media) are produced after this returns; stop once they're sent
+    body = response.body_iterator
+
+    async def stream_then_stop():
+        try:
+            async for chunk in body:
+                yield chunk
+        finally:
+            profiler.stop(session)
+
+    response.body_iterator = stream_then_stop()
+    response.headers["X-Profile-Id"] = session.name
+    return response
+
 @app.on_event("startup")
 async def startup_event():
-    print("Startup: Checking authentication...")
-    # Optional: try to auto-connect here?
-    await manager.try_auto_connect()
+    if blocking_guard:
+        blocking_guard.install(asyncio.get_running_loop())
+    if loop_monitor:
+        loop_monitor.start()
+    print("Startup: Checking authentication in the background...")
+    # Don't block socket binding on browser launch; requests wait on readiness
+    manager.start_background_connect()
+    supervisor.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    # Background saves still in flight must reach disk before exit
+    await flush_all()
+    if loop_monitor:
+        await loop_monitor.stop()
+    if tracer.exporter:
+        await asyncio.to_thread(tracer.exporter.flush)
 
 @app.get("/api/notebooks")
 async def list_notebooks():
@@ -56,7 +150,110 @@ async def list_notebooks():
 
 @app.get("/health")
 def health():
-    return {"status": "ok", "authenticated": manager.client is not None}
+    return {
+        "status": "ok",
+        "authenticated": manager.client is not None,
+        **manager.get_readiness(),
+        "supervisor": supervisor.get_stats(),
+        "completion_watcher": manager.completion_watcher.get_stats(),
+        "content_cache": content_cache.get_stats(),
+        "summaries": summary_service.get_stats(),
+        "exports": export_service.get_stats(),
+        "loop": loop_monitor.get_stats() if loop_monitor else None,
+        "tracing": tracer.get_stats()
+    }
+
+@metrics.collector
+def collect_service_metrics():
+    """Cache, queue, browser and loop metrics read from the services' own stats at scrape time"""
+    hits = Counter("notebooklm_cache_hits_total", "Cache hits since start", ("cache",))
+    misses = Counter("notebooklm_cache_misses_total", "Cache misses since start", ("cache",))
+    ratio = Gauge("notebooklm_cache_hit_ratio", "Cache hit ratio since start", ("cache",))
+    content, summaries, exports = content_cache.get_stats(), summary_service.get_stats(), export_service.get_stats()
+    for name, h, m in (
+        ("artifact_content", content["hits"], content["misses"]),
+        ("source_summary", summaries["hits"], summaries["misses"]),
+        ("export", exports["cache_hits"], exports["rendered"]),
+    ):
+        hits.inc(h, cache=name)
+        misses.inc(m, cache=name)
+        if h + m:
+            ratio.set(round(h / (h + m), 4), cache=name)
+
+    depth = Gauge("notebooklm_queue_depth", "Work waiting or running per queue", ("queue",))
+    tasks = Gauge("notebooklm_tasks", "Tracked generation tasks by type and status", ("type", "status"))
+    for t in task_manager.tasks.values():
+        tasks.inc(type=t["type"], status=t["status"])
+    depth.set(sum(1 for t in task_manager.tasks.values() if t["status"] in ("pending", "running")), queue="generation_tasks")
+    depth.set(manager.completion_watcher.get_stats()["pending"], queue="completion_watcher")
+    depth.set(exports["pending"], queue="exports")
+    depth.set(summaries["inflight"], queue="source_summaries")
+
+    collected = [hits, misses, ratio, depth, tasks]
+
+    # Browser supervision and idle hibernation
+    sup, hib = supervisor.get_stats(), manager.hibernation_stats
+    recycles = Counter("notebooklm_browser_recycles_total", "Browser recycles by reason", ("reason",))
+    for reason, count in sup["recycle_reasons"].items():
+        recycles.inc(count, reason=reason)
+    recycle_failures = Counter("notebooklm_browser_recycle_failures_total", "Browser recycles that failed")
+    recycle_failures.inc(sup["failed_recycles"])
+    recycle_seconds = Counter("notebooklm_browser_recycle_seconds_total", "Time spent recycling the browser")
+    recycle_seconds.inc(sup["total_recycle_s"])
+    last_recycle = Gauge("notebooklm_browser_last_recycle_seconds", "Duration of the latest browser recycle")
+    if sup["last_recycle_s"] is not None:
+        last_recycle.set(sup["last_recycle_s"])
+    rss = Gauge("notebooklm_browser_rss_mb", "Browser process tree RSS at the latest supervisor check")
+    if sup["last_rss_mb"] is not None:
+        rss.set(sup["last_rss_mb"])
+    hibernations = Counter("notebooklm_browser_hibernations_total", "Idle hibernations of the browser")
+    hibernations.inc(hib["count"])
+    resumes = Counter("notebooklm_browser_resumes_total", "Browser relaunches after hibernation")
+    resumes.inc(hib["resume_count"])
+    last_resume = Gauge("notebooklm_browser_last_resume_seconds", "Duration of the latest relaunch after hibernation")
+    if hib["last_resume_s"] is not None:
+        last_resume.set(hib["last_resume_s"])
+    hibernated = Gauge("notebooklm_browser_hibernated", "1 while the browser is hibernated")
+    hibernated.set(1 if manager.hibernated else 0)
+    collected += [recycles, recycle_failures, recycle_seconds, last_recycle, rss, hibernations, resumes, last_resume, hibernated]
+    if loop_monitor:
+        loop = loop_monitor.get_stats()
+        lag = Gauge("notebooklm_event_loop_lag_ms", "Event loop lag over the recent window", ("quantile",))
+        lag.set(loop["lag_p50_ms"], quantile="0.5")
+        lag.set(loop["lag_p99_ms"], quantile="0.99")
+        stalls = Counter("notebooklm_event_loop_stalls_total", "Event loop stalls since start")
+        stalls.inc(loop["stalls"])
+        collected += [lag, stalls]
+    return collected
+
+@app.get("/metrics")
+async def get_metrics():
+    """Prometheus text exposition of RPC, manager, generation, cache and queue metrics"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/debug/profiles")
+async def list_profiles():
+    """Captured profiles (folded stacks for speedscope / flamegraph.pl), newest first"""
+    return {**profiler.get_stats(), "dir": profiler.get_out_dir(), "profiles": await run_io(profiler.list_profiles)}
+
+@app.get("/debug/profiles/{name}")
+async def get_profile(name: str):
+    path = await run_io(profiler.profile_path, name)
+    if not path:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return Response(await run_io(Path(path).read_bytes), media_type="text/plain")
+
+@app.get("/debug/loop")
+async def debug_loop(stalls: int = 20, stacks: bool = True, reset: bool = False):
+    """Event-loop lag, recent stalls with the loop thread's stack, and per-endpoint blocking"""
+    if not loop_monitor:
+        raise HTTPException(status_code=404, detail="Loop monitor is disabled (NOTEBOOKLM_LOOP_MONITOR=0)")
+    data = loop_monitor.snapshot(stalls=stalls, stacks=stacks)
+    if blocking_guard:
+        data["blocking_guard"] = blocking_guard.violations[-stalls:]
+    if reset:
+        loop_monitor.reset()
+    return data
 
 @app.post("/api/login")
 async def login():
@@ -69,27 +266,6 @@ async def login():
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/api/generate_video")
-async def create_video(req: ContentRequest):
-    notebook_id = manager.current_notebook_id
-    task_id = None
-    
-    try:
-        if notebook_id:
-            task_id = task_manager.create_task("generate_video", notebook_id)
-            task_manager.update_status(task_id, "running")
-            
-        filename = await manager.generate_video(req.content)
-        
-        if task_id:
-            task_manager.update_status(task_id, "completed")
-            
-        return {"status": "success", "filename": filename}
-    except Exception as e:
-        if task_id:
-            task_manager.update_status(task_id, "error", error=str(e))
-        raise HTTPException(status_code=500, detail=str(e))
-
 @app.post("/api/notebooks")
 async def create_notebook(notebook: NotebookCreate):
     try:
@@ -130,6 +306,58 @@ async def select_notebook(req: dict):
          print(f"Error fetching sources on select: {e}")
          return {"status": "success", "sources": []}
 
+@app.post("/api/open_notebook")
+async def open_notebook(req: dict):
+    """Load everything the notebook view needs in one request.
+
+    Sources, suggestions, artifacts and history are fetched concurrently and
+    streamed back as newline-delimited JSON sections in completion order, so
+    the UI can render each part as soon as it arrives.
+    """
+    notebook_id = req.get("notebook_id")
+    if not notebook_id:
+        raise HTTPException(status_code=400, detail="notebook_id required")
+    history_limit = req.get("history_limit")
+
+    manager.set_notebook(notebook_id)
+
+    async def load_artifacts():
+        return manager.get_artifacts(notebook_id)
+
+    async def load_history():
+        return manager.get_history(notebook_id, limit=history_limit)
+
+    sections = {
+        "sources": lambda: manager.get_sources(notebook_id),
+        "suggestions": lambda: manager.get_suggested_questions(notebook_id),
+        "artifacts": load_artifacts,
+        "history": load_history,
+        # Local artifacts merged with ones generated earlier in NotebookLM
+        "remote_artifacts": lambda: manager.list_artifacts(notebook_id, include_remote=True),
+    }
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def run_section(name, loader):
+        try:
+            data = await loader()
+            await queue.put({"section": name, "data": data})
+        except Exception as e:
+            print(f"Error loading {name} for notebook {notebook_id}: {e}")
+            await queue.put({"section": name, "data": [], "error": str(e)})
+
+    async def stream_sections():
+        gathered = asyncio.gather(*(run_section(name, loader) for name, loader in sections.items()))
+        try:
+            for _ in sections:
+                item = await queue.get()
+                yield json.dumps(item, ensure_ascii=False) + "\n"
+            await gathered
+        finally:
+            if not gathered.done():
+                gathered.cancel()
+
+    return StreamingResponse(stream_sections(), media_type="application/x-ndjson")
+
 @app.get("/api/sources/{source_id}")
 async def get_source(source_id: str):
     try:
@@ -147,14 +375,19 @@ async def delete_source(source_id: str, notebook_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/notebooks/{notebook_id}/sources/{source_id}/summary")
-async def get_source_summary(notebook_id: str, source_id: str):
+async def get_source_summary(notebook_id: str, source_id: str, force: bool = False):
     try:
-        summary = await manager.generate_source_summary(notebook_id, source_id)
+        summary = await manager.generate_source_summary(notebook_id, source_id, force=force)
         return {"summary": summary}
     except Exception as e:
         print(f"Error generating summary: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/notebooks/{notebook_id}/summaries")
+async def get_cached_summaries(notebook_id: str):
+    """Return the locally cached summaries of a notebook's sources"""
+    return {"summaries": summary_service.get_cached_for_notebook(notebook_id)}
+
 @app.post("/api/sources/url")
 async def add_source_url(req: dict):
     url = req.get("url")
@@ -193,18 +426,19 @@ async def add_source_file(
         temp_dir.mkdir(exist_ok=True)
         temp_file_path = temp_dir / file.filename
         
-        with open(temp_file_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
+        # Copy in chunks on the I/O executor instead of writing on the event loop
+        buffer = await run_io(open, temp_file_path, "wb")
+        try:
+            while chunk := await file.read(1024 * 1024):
+                await run_io(buffer.write, chunk)
+        finally:
+            await run_io(buffer.close)
             
         print(f"Uploading file {temp_file_path} to notebook {notebook_id}")
         await manager.add_source_file(notebook_id, str(temp_file_path.absolute()))
         
         # Clean up
-        try:
-            temp_file_path.unlink()
-        except:
-            pass
+        await run_io(remove_quietly, temp_file_path)
         
         return {"status": "success", "message": f"File {file.filename} added"}
     except Exception as e:
@@ -254,22 +488,77 @@ async def get_suggestions(notebook_id: str):
         return {"suggestions": []}
 
 @app.get("/api/notebooks/{notebook_id}/artifacts")
-async def get_artifacts(notebook_id: str):
-    artifacts = manager.get_artifacts(notebook_id)
+async def get_artifacts(notebook_id: str, include_remote: bool = False, refresh: bool = False):
+    try:
+        artifacts = await manager.list_artifacts(notebook_id, include_remote=include_remote, refresh=refresh)
+    except Exception as e:
+        if not include_remote:
+            raise HTTPException(status_code=500, detail=str(e))
+        # Remote listing is best-effort; local artifacts are always available
+        print(f"Remote artifact sync failed for {notebook_id}: {e}")
+        artifacts = manager.get_artifacts(notebook_id)
     return {"artifacts": artifacts}
 
+@app.post("/api/notebooks/{notebook_id}/artifacts/sync")
+async def sync_artifacts(notebook_id: str):
+    """Re-list the notebook's remote artifacts and merge them with local ones"""
+    try:
+        artifacts = await manager.list_artifacts(notebook_id, include_remote=True, refresh=True)
+        return {"artifacts": artifacts}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/notebooks/{notebook_id}/artifacts/remote/{remote_id}/download")
+async def download_remote_artifact(notebook_id: str, remote_id: str):
+    """Fetch an artifact that already exists in NotebookLM instead of regenerating it"""
+    try:
+        artifact = await manager.download_remote_artifact(notebook_id, remote_id)
+        return {"artifact": artifact}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.get("/api/notebooks/{notebook_id}/artifacts/{artifact_id}/content")
-async def get_artifact_content(notebook_id: str, artifact_id: str):
-    content = manager.get_artifact_content(notebook_id, artifact_id)
-    if content is None:
+async def get_artifact_content(notebook_id: str, artifact_id: str, request: Request, parsed: bool = False):
+    """Artifact text from the content cache; parsed=true returns the normalized quiz/flashcard/mindmap structure instead"""
+    payload = await manager.get_artifact_payload(notebook_id, artifact_id, parsed=parsed)
+    if payload is None:
         raise HTTPException(status_code=404, detail="Artifact content not found")
-    return {"content": content}
+
+    # The parsed variant is a different representation, so it gets its own validator
+    etag = payload["etag"][:-1] + '-p"' if parsed else payload["etag"]
+    headers = {"ETag": etag, "Cache-Control": "private, max-age=0, must-revalidate"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag in [t.strip() for t in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+
+    # Send one representation: the normalized structure when there is one, else the raw text
+    body = {"type": payload["artifact"]["type"]}
+    if parsed and payload["parsed"] is not None:
+        body["parsed"] = payload["parsed"]
+    else:
+        body["content"] = payload["content"]
+    return JSONResponse(body, headers=headers)
+
+@app.get("/api/notebooks/{notebook_id}/artifacts/{artifact_id}/media")
+async def get_artifact_media(notebook_id: str, artifact_id: str, request: Request):
+    """Stream audio/video artifacts with HTTP Range support so players can seek"""
+    artifact = manager.get_artifact(notebook_id, artifact_id)
+    if not artifact:
+        raise HTTPException(status_code=404, detail="Artifact not found")
+
+    path = artifact["details"].get("path")
+    if not path or not await run_io(os.path.exists, path):
+        raise HTTPException(status_code=404, detail="Artifact file not found")
+
+    artifact_store.touch(path)
+    return await file_range_response(request, path)
 
 @app.post("/api/notebooks/{notebook_id}/artifacts/{artifact_id}/export/docx")
 async def export_artifact_docx(notebook_id: str, artifact_id: str):
-    content = manager.get_artifact_content(notebook_id, artifact_id)
-    if content is None:
+    payload = await manager.get_artifact_payload(notebook_id, artifact_id)
+    if payload is None:
         raise HTTPException(status_code=404, detail="Artifact content not found")
+    content = payload["content"]
     
     # Check if artifact is quiz type (rough check, or we assume frontend sends correct request)
     # We'll just try to convert. If it fails, error out.
@@ -280,22 +569,52 @@ async def export_artifact_docx(notebook_id: str, artifact_id: str):
         downloads_path = Path.home() / "Downloads"
         
         # Get artifact details for filename
-        artifacts = manager.get_artifacts(notebook_id)
-        artifact = next((a for a in artifacts if a["id"] == artifact_id), None)
-        title = artifact.get("title", "Quiz") if artifact else "Quiz"
+        title = payload["artifact"].get("title") or "Quiz"
         
         # Sanitize filename
         safe_title = "".join(x for x in title if x.isalnum() or x in " -_").strip()
         filename = downloads_path / f"{safe_title}.docx"
         
-        # Generate
-        saved_path = await manager.export_quiz_to_docx(content, str(filename))
+        # Generate (cached by content hash, rendered in the export pool)
+        saved_path = await manager.export_quiz_to_docx(content, str(filename), payload["artifact"]["details"].get("hash"))
         
         return {"status": "success", "path": saved_path}
+    except ExportQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         print(f"Export error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/notebooks/{notebook_id}/artifacts/export/batch")
+async def export_artifacts_batch(notebook_id: str, req: dict):
+    """Export several artifacts into one zip in the Downloads folder"""
+    artifact_ids = req.get("artifact_ids") or []
+    format = req.get("format", "docx")
+    if not artifact_ids:
+        raise HTTPException(status_code=400, detail="artifact_ids required")
+
+    payloads = await asyncio.gather(*(manager.get_artifact_payload(notebook_id, aid) for aid in artifact_ids))
+    items = []
+    for aid, payload in zip(artifact_ids, payloads):
+        if payload is None:
+            raise HTTPException(status_code=404, detail=f"Artifact content not found: {aid}")
+        type = payload["artifact"]["type"]
+        if not can_render(type, format):
+            raise HTTPException(status_code=400, detail=f"Cannot export {type} artifacts as {format}: {aid}")
+        default_title = type.replace("_", " ").title()
+        title = "".join(x for x in (payload["artifact"].get("title") or default_title) if x.isalnum() or x in " -_").strip() or default_title
+        items.append({"title": title, "type": type, "content": payload["content"], "hash": payload["artifact"]["details"].get("hash")})
+
+    try:
+        zip_path = Path.home() / "Downloads" / f"notebooklm_export_{int(time.time())}.zip"
+        result = await export_service.export_batch(items, str(zip_path), format)
+        return {"status": "success", **result}
+    except ExportQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        print(f"Batch export error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 # --- Task Management Endpoints ---
 
 @app.post("/api/tasks/source_summary")
@@ -321,6 +640,30 @@ async def start_source_summary_task(req: dict):
     
     return {"task_id": task_id, "status": "pending"}
 
+@app.post("/api/tasks/source_summaries")
+async def start_source_summaries_task(req: dict):
+    """Start a background task summarizing many (or all) sources of a notebook"""
+    notebook_id = req.get("notebook_id")
+    source_ids = req.get("source_ids")
+    force = bool(req.get("force", False))
+
+    if not notebook_id:
+        raise HTTPException(status_code=400, detail="notebook_id required")
+
+    task_id = task_manager.create_task("source_summaries", notebook_id)
+
+    async def run_task():
+        try:
+            task_manager.update_status(task_id, "running")
+            result = await manager.summarize_sources(notebook_id, source_ids, force=force)
+            task_manager.update_status(task_id, "completed", result=result)
+        except Exception as e:
+            task_manager.update_status(task_id, "error", error=str(e))
+
+    asyncio.create_task(run_task())
+
+    return {"task_id": task_id, "status": "pending"}
+
 @app.get("/api/tasks/active")
 async def get_active_tasks():
     """Get all active tasks grouped by notebook ID"""
@@ -340,210 +683,159 @@ async def get_task_status(task_id: str):
 
 # --- Generators ---
 
-@app.post("/api/generate_audio")
-async def create_audio(req: ContentRequest):
+async def run_generation(type: str, params: dict, generate):
+    """Run a generator as a tracked task, sharing identical in-flight or recent requests.
+
+    generate(notebook_id) must work on the notebook it is given, which is the one
+    selected when the request arrived, not whatever is selected by the time it runs.
+    Returns (result, reuse); result is the generator's {"path", "artifact", "data"}
+    and reuse is None unless another task's result was used.
+    """
     notebook_id = manager.current_notebook_id
     task_id = None
-    
+    if notebook_id:
+        session = active_profile.get()
+        task_id = task_manager.create_task(type, notebook_id, profile=session.name if session else None)
+        task_manager.update_status(task_id, "running")
+
+    start = time.perf_counter()
+    outcome = "error"
     try:
         if notebook_id:
-            task_id = task_manager.create_task("generate_audio", notebook_id)
-            task_manager.update_status(task_id, "running")
-            
-        filename = await manager.generate_audio(req.content)
-        
+            fingerprint = await manager.get_source_fingerprint(notebook_id)
+            key = generation_dedup.make_key(notebook_id, type, params, fingerprint)
+            result, reuse = await generation_dedup.run(key, task_id, lambda: generate(notebook_id),
+                                                       is_valid=lambda r: run_io(os.path.exists, r["path"]))
+        else:
+            result, reuse = await generate(notebook_id), None
+
         if task_id:
-            task_manager.update_status(task_id, "completed")
-            
-        return {"status": "success", "filename": filename}
+            if reuse:
+                task_manager.mark_reused(task_id, reuse)
+            task_manager.update_status(task_id, "completed",
+                                       result={"filename": result["path"], "artifact_id": result["artifact"]["id"]})
+        outcome = f"reused_{reuse['kind']}" if reuse else "completed"
+        return result, reuse
     except Exception as e:
         if task_id:
             task_manager.update_status(task_id, "error", error=str(e))
+        raise
+    finally:
+        generation_duration.observe(time.perf_counter() - start, type=type.removeprefix("generate_"), outcome=outcome)
+
+@app.post("/api/generate_audio")
+async def create_audio(req: ContentRequest):
+    try:
+        result, reuse = await run_generation(
+            "generate_audio", {"instructions": req.content},
+            lambda nb: manager.generate_audio(req.content, notebook_id=nb)
+        )
+        return {"status": "success", "filename": result["path"], "data": result["data"], "artifact": result["artifact"], "reused": reuse}
+    except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/generate_video")
 async def create_video(req: ContentRequest):
-    notebook_id = manager.current_notebook_id
-    task_id = None
-    
     try:
-        if notebook_id:
-            task_id = task_manager.create_task("generate_video", notebook_id)
-            task_manager.update_status(task_id, "running")
-        
-        filename = await manager.generate_video(req.content)
-        
-        if task_id:
-            task_manager.update_status(task_id, "completed")
-        
-        return {"status": "success", "filename": filename}
+        result, reuse = await run_generation(
+            "generate_video", {"style": req.content},
+            lambda nb: manager.generate_video(req.content, notebook_id=nb)
+        )
+        return {"status": "success", "filename": result["path"], "data": result["data"], "artifact": result["artifact"], "reused": reuse}
     except Exception as e:
-        if task_id:
-            task_manager.update_status(task_id, "error", error=str(e))
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/generate_quiz")
 async def create_quiz(req: QuizRequest):
     """Generate quiz with custom settings"""
-    notebook_id = manager.current_notebook_id
-    task_id = None
-    
     try:
-        if notebook_id:
-            task_id = task_manager.create_task("generate_quiz", notebook_id)
-            task_manager.update_status(task_id, "running")
-            
-        filename = await manager.generate_quiz(
-            difficulty=req.difficulty,
-            quantity=req.quantity,
-            instructions=req.instructions,
-            output_format=req.output_format
+        result, reuse = await run_generation(
+            "generate_quiz",
+            {
+                "difficulty": req.difficulty,
+                "quantity": req.quantity,
+                "instructions": req.instructions,
+                "output_format": req.output_format
+            },
+            lambda nb: manager.generate_quiz(
+                notebook_id=nb,
+                difficulty=req.difficulty,
+                quantity=req.quantity,
+                instructions=req.instructions,
+                output_format=req.output_format
+            )
         )
-        
-        if task_id:
-            task_manager.update_status(task_id, "completed")
-            
-        return {"status": "success", "filename": filename}
+        return {"status": "success", "filename": result["path"], "data": result["data"], "artifact": result["artifact"], "reused": reuse}
     except Exception as e:
-        if task_id:
-            task_manager.update_status(task_id, "error", error=str(e))
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/generate_mindmap")
 async def create_mindmap(req: ContentRequest):
     notebook_id = manager.current_notebook_id
-    task_id = None
     
     try:
-        if notebook_id:
-            task_id = task_manager.create_task("generate_mindmap", notebook_id)
-            task_manager.update_status(task_id, "running")
-        
-        filename = await manager.generate_mindmap()
-        print(f"[DEBUG] Mindmap generated at: {filename}")
+        result, reuse = await run_generation("generate_mindmap", {}, lambda nb: manager.generate_mindmap(notebook_id=nb))
+        print(f"[DEBUG] Mindmap generated at: {result['path']}")
+        mindmap_data = result["data"]
         
-        # Read the generated mindmap file to return its content
-        mindmap_data = None
-        if os.path.exists(filename):
-            print(f"[DEBUG] Mindmap file exists. Size: {os.path.getsize(filename)} bytes")
-            try:
-                # Try UTF-8 first
-                with open(filename, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    print(f"[DEBUG] Successfully read {len(content)} chars from file")
-                    mindmap_data = json.loads(content)
-                
-                # ALSO: Add it to the chat history so it persists
-                if notebook_id and mindmap_data:
-                    mindmap_text = f"!!MINDMAP!!{json.dumps(mindmap_data)}"
-                    manager.add_message(notebook_id, "ai", mindmap_text)
-                    print(f"[DEBUG] Saved mindmap to history for notebook {notebook_id}")
-            except Exception as read_err:
-                print(f"[ERROR] Error reading mindmap file: {read_err}")
-                try:
-                    # Fallback for some Windows encodings
-                    print("[DEBUG] Attempting fallback encoding (cp950)...")
-                    with open(filename, 'r', encoding='cp950', errors='replace') as f:
-                        mindmap_data = json.load(f)
-                except Exception as fallback_err:
-                    print(f"[ERROR] Fallback encoding also failed: {fallback_err}")
-        else:
-            print(f"[ERROR] Mindmap file not found at expected path: {filename}")
-        
-        if task_id:
-            task_manager.update_status(task_id, "completed")
+        # ALSO: Add it to the chat history so it persists (once, not per duplicate request)
+        if notebook_id and mindmap_data and not reuse:
+            mindmap_text = f"!!MINDMAP!!{json.dumps(mindmap_data)}"
+            manager.add_message(notebook_id, "ai", mindmap_text)
+            print(f"[DEBUG] Saved mindmap to history for notebook {notebook_id}")
         
         return {
             "status": "success", 
-            "filename": filename,
-            "data": mindmap_data
+            "filename": result["path"],
+            "data": mindmap_data,
+            "artifact": result["artifact"],
+            "reused": reuse
         }
     except Exception as e:
-        if task_id:
-            task_manager.update_status(task_id, "error", error=str(e))
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/generate_slides")
 async def create_slides(req: ContentRequest):
-    notebook_id = manager.current_notebook_id
-    task_id = None
-    
     try:
-        if notebook_id:
-            task_id = task_manager.create_task("generate_slides", notebook_id)
-            task_manager.update_status(task_id, "running")
-        
-        filename = await manager.generate_slide_deck()
-        
-        if task_id:
-            task_manager.update_status(task_id, "completed")
-        
-        return {"status": "success", "filename": filename}
+        result, reuse = await run_generation("generate_slides", {}, lambda nb: manager.generate_slide_deck(notebook_id=nb))
+        return {"status": "success", "filename": result["path"], "data": result["data"], "artifact": result["artifact"], "reused": reuse}
     except Exception as e:
-        if task_id:
-            task_manager.update_status(task_id, "error", error=str(e))
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/generate_flashcards")
 async def create_flashcards(req: ContentRequest):
     """Generate flashcards - quantity can be 'less', 'normal', or 'more'"""
-    notebook_id = manager.current_notebook_id
-    task_id = None
-    
     try:
-        if notebook_id:
-            task_id = task_manager.create_task("generate_flashcards", notebook_id)
-            task_manager.update_status(task_id, "running")
-        
         quantity = req.content if req.content in ["less", "normal", "more"] else "normal"
-        filename = await manager.generate_flashcards(quantity=quantity, output_format="json")
-        
-        if task_id:
-            task_manager.update_status(task_id, "completed")
-            
-        return {"status": "success", "filename": filename}
+        result, reuse = await run_generation(
+            "generate_flashcards", {"quantity": quantity},
+            lambda nb: manager.generate_flashcards(quantity=quantity, output_format="json", notebook_id=nb)
+        )
+        return {"status": "success", "filename": result["path"], "data": result["data"], "artifact": result["artifact"], "reused": reuse}
     except Exception as e:
-        if task_id:
-            task_manager.update_status(task_id, "error", error=str(e))
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/generate_study_guide")
 async def create_study_guide(req: ContentRequest):
     notebook_id = manager.current_notebook_id
-    task_id = None
     
     try:
-        if notebook_id:
-            task_id = task_manager.create_task("generate_study_guide", notebook_id)
-            task_manager.update_status(task_id, "running")
+        result, reuse = await run_generation("generate_study_guide", {}, lambda nb: manager.generate_study_guide(notebook_id=nb))
+        study_guide_content = result["data"] or ""
         
-        filename = await manager.generate_study_guide()
-        
-        # Read the generated study guide content
-        study_guide_content = ""
-        if os.path.exists(filename):
-            try:
-                with open(filename, 'r', encoding='utf-8') as f:
-                    study_guide_content = f.read()
-                
-                # Add to chat history
-                if notebook_id and study_guide_content:
-                    manager.add_message(notebook_id, "ai", study_guide_content)
-                    print(f"[DEBUG] Saved study guide to history for notebook {notebook_id}")
-            except Exception as read_err:
-                print(f"[ERROR] Error reading study guide file: {read_err}")
-        
-        if task_id:
-            task_manager.update_status(task_id, "completed")
+        # Add to chat history (once, not per duplicate request)
+        if notebook_id and study_guide_content and not reuse:
+            manager.add_message(notebook_id, "ai", study_guide_content)
+            print(f"[DEBUG] Saved study guide to history for notebook {notebook_id}")
         
         return {
             "status": "success", 
-            "filename": filename,
-            "data": study_guide_content
+            "filename": result["path"],
+            "data": study_guide_content,
+            "artifact": result["artifact"],
+            "reused": reuse
         }
     except Exception as e:
-        if task_id:
-            task_manager.update_status(task_id, "error", error=str(e))
         raise HTTPException(status_code=500, detail=str(e))
 
 if __name__ == "__main__":
@@ -557,10 +849,10 @@ if __name__ == "__main__":
         import os
         
         # Create log file for output in APPDATA to ensure write permissions
-        log_dir = os.path.join(os.environ.get("LOCALAPPDATA", os.environ.get("APPDATA", ".")), "notebooklm-desktop")
+        backend_log_dir = log_dir()
         try:
-            os.makedirs(log_dir, exist_ok=True)
-            log_file_path = os.path.join(log_dir, "backend.log")
+            os.makedirs(backend_log_dir, exist_ok=True)
+            log_file_path = os.path.join(backend_log_dir, "backend.log")
             log_file = open(log_file_path, "w", encoding="utf-8")
             print(f"Logging to {log_file_path}")
         except Exception as e:
@@ -0,0 +1,78 @@
+import json
+from typing import Any, Dict, Optional
+
+# JSON artifacts whose item count is worth keeping in the catalog
+_ITEM_KEYS = ("questions", "cards", "flashcards")
+
+def decode_text(raw: bytes) -> str:
+    try:
+        return raw.decode("utf-8")
+    except UnicodeDecodeError:
+        # Fallback for files written with the Windows Traditional Chinese code page
+        return raw.decode("cp950", errors="replace")
+
+def _json_metadata(parsed: Any) -> Dict[str, Any]:
+    if not isinstance(parsed, dict):
+        return {}
+    for key in _ITEM_KEYS:
+        if isinstance(parsed.get(key), list):
+            return {"items": len(parsed[key])}
+    return {}
+
+def process_json(parsed: Any) -> Dict[str, Any]:
+    """Serialize already-parsed JSON content in its stored, human-readable form"""
+    return {
+        "data": json.dumps(parsed, ensure_ascii=False, indent=2).encode("utf-8"),
+        "parsed": parsed,
+        "title": parsed.get("title") if isinstance(parsed, dict) else None,
+        "metadata": _json_metadata(parsed),
+    }
+
+def process_download(raw: bytes, ext: str) -> Dict[str, Any]:
+    """Normalize a downloaded text artifact in one pass.
+
+    Returns {"data": bytes to store, "parsed": JSON object or text, "title", "metadata"}.
+    JSON is re-serialized with ensure_ascii=False so stored files stay readable.
+    """
+    text = decode_text(raw)
+    if ext == ".json":
+        try:
+            return process_json(json.loads(text))
+        except json.JSONDecodeError as e:
+            print(f"Warning: Downloaded JSON artifact is not valid JSON: {e}")
+            return {"data": raw, "parsed": None, "title": None, "metadata": {}}
+    return {"data": text.encode("utf-8"), "parsed": text, "title": None, "metadata": {"chars": len(text)}}
+
+def normalize_payload(type: str, parsed: Any) -> Optional[Any]:
+    """Normalize parsed quiz/flashcard/mindmap JSON into the shapes the viewer renders"""
+    if parsed is None or isinstance(parsed, str):
+        return None
+    if type == "quiz":
+        raw = parsed if isinstance(parsed, list) else parsed.get("questions", [])
+        return {
+            "title": parsed.get("title") if isinstance(parsed, dict) else None,
+            "questions": [
+                {
+                    "text": q.get("text") or q.get("question", ""),
+                    "options": [
+                        {
+                            "text": o.get("text") or o.get("option", ""),
+                            "isCorrect": bool(o.get("isCorrect")),
+                            "rationale": o.get("rationale"),
+                        }
+                        for o in (q.get("options") or q.get("answerOptions") or [])
+                    ],
+                    "hint": q.get("hint"),
+                }
+                for q in raw
+            ],
+        }
+    if type == "flashcards":
+        raw = parsed if isinstance(parsed, list) else (parsed.get("cards") or parsed.get("flashcards") or [])
+        return {
+            "title": parsed.get("title") if isinstance(parsed, dict) else None,
+            "cards": [{"front": c.get("front") or c.get("f", ""), "back": c.get("back") or c.get("b", "")} for c in raw],
+        }
+    if type == "mindmap":
+        return parsed.get("root", parsed) if isinstance(parsed, dict) else parsed
+    return None
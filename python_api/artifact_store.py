@@ -0,0 +1,234 @@
+import hashlib
+import json
+import os
+import time
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Any
+from artifact_pipeline import decode_text
+from file_io import json_saver, run_io, remove_quietly
+
+class ArtifactStore:
+    """Content-addressed storage for generated artifacts.
+
+    Files live at <root>/<notebook_id>/<type>/<sha256 prefix><ext>, are written
+    atomically, deduplicated by content and evicted least-recently-used once the
+    store exceeds its disk quota.
+    """
+
+    def __init__(self, root: str = "artifacts", quota_mb: float = None):
+        self.root = Path(root)
+        self.tmp_dir = self.root / ".tmp"
+        self.index_file = self.root / "index.json"
+        self.quota_bytes = int((quota_mb if quota_mb is not None else float(os.environ.get("NOTEBOOKLM_ARTIFACT_QUOTA_MB", "2048"))) * 1024 * 1024)
+        # relative path -> {"size", "hash", "notebook_id", "type", "last_access"}
+        self.index: Dict[str, Dict[str, Any]] = {}
+        # Called with the absolute paths of evicted files so catalogs can drop them
+        self.on_evict: Optional[Callable[[List[str]], None]] = None
+        self._index_saver = json_saver(self.index_file, lambda: {k: dict(v) for k, v in self.index.items()}, indent=2)
+        self._load()
+
+    def _load(self):
+        if self.index_file.exists():
+            try:
+                self.index = json.loads(self.index_file.read_text(encoding="utf-8"))
+            except:
+                self.index = {}
+
+        # Downloads interrupted by a crash leave partial files behind
+        if self.tmp_dir.exists():
+            cutoff = time.time() - 3600
+            for leftover in self.tmp_dir.iterdir():
+                try:
+                    if leftover.stat().st_mtime < cutoff:
+                        leftover.unlink()
+                except OSError:
+                    pass
+
+    def _save(self):
+        self._index_saver.request()
+
+    def temp_path(self, ext: str) -> str:
+        """A unique scratch path for a download in progress"""
+        self.tmp_dir.mkdir(parents=True, exist_ok=True)
+        return str((self.tmp_dir / f"{uuid.uuid4().hex}{ext}").absolute())
+
+    @staticmethod
+    def _hash_file(path: str) -> str:
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                h.update(block)
+        return h.hexdigest()
+
+    def _target(self, notebook_id: str, type: str, digest: str, ext: str) -> Path:
+        return self.root / notebook_id / type / f"{digest[:16]}{ext}"
+
+    def _place(self, src: str, target: Path) -> bool:
+        """Move src into place atomically; returns False if identical content was already stored"""
+        target.parent.mkdir(parents=True, exist_ok=True)
+        if target.exists():
+            os.remove(src)
+            return False
+        os.replace(src, target)
+        return True
+
+    async def _record(self, target: Path, digest: str, size: int, notebook_id: str, type: str, created: bool) -> Dict[str, Any]:
+        rel = target.relative_to(self.root).as_posix()
+        self.index[rel] = {
+            "size": size,
+            "hash": digest,
+            "notebook_id": notebook_id,
+            "type": type,
+            "last_access": time.time()
+        }
+        evicted = self._evict(keep=rel)
+        if evicted:
+            await run_io(lambda: [remove_quietly(self.root / e) for e in evicted])
+            if self.on_evict:
+                self.on_evict([str((self.root / e).absolute()) for e in evicted])
+        self._save()
+        print(f"{'Stored' if created else 'Deduplicated'} artifact {rel}")
+        return {"path": str(target.absolute()), "filename": target.name, "hash": digest, "size": size, "deduplicated": not created}
+
+    async def commit_file(self, notebook_id: str, type: str, temp_path: str, ext: str) -> Dict[str, Any]:
+        """Move a finished download from temp_path into the store"""
+        def work():
+            digest = self._hash_file(temp_path)
+            target = self._target(notebook_id, type, digest, ext)
+            created = self._place(temp_path, target)
+            return digest, target, target.stat().st_size, created
+
+        digest, target, size, created = await run_io(work)
+        return await self._record(target, digest, size, notebook_id, type, created)
+
+    async def store_bytes(self, notebook_id: str, type: str, data: bytes, ext: str) -> Dict[str, Any]:
+        """Atomically store in-memory content"""
+        digest = hashlib.sha256(data).hexdigest()
+        target = self._target(notebook_id, type, digest, ext)
+
+        def work():
+            if target.exists():
+                return False
+            tmp = self.temp_path(ext)
+            with open(tmp, "wb") as f:
+                f.write(data)
+            return self._place(tmp, target)
+
+        created = await run_io(work)
+        return await self._record(target, digest, len(data), notebook_id, type, created)
+
+    def touch(self, path: str):
+        """Mark a stored file as recently used"""
+        try:
+            rel = Path(path).absolute().relative_to(self.root.absolute()).as_posix()
+        except ValueError:
+            return
+        if rel in self.index:
+            self.index[rel]["last_access"] = time.time()
+            self._save()
+
+    def usage_bytes(self) -> int:
+        return sum(e["size"] for e in self.index.values())
+
+    def _evict(self, keep: Optional[str] = None) -> List[str]:
+        """Drop least recently used entries over quota; returns the files to delete"""
+        evicted = []
+        if self.quota_bytes <= 0:
+            return evicted
+        usage = self.usage_bytes()
+        if usage <= self.quota_bytes:
+            return evicted
+        for rel, entry in sorted(self.index.items(), key=lambda kv: kv[1]["last_access"]):
+            if usage <= self.quota_bytes:
+                break
+            if rel == keep:
+                continue
+            usage -= entry["size"]
+            del self.index[rel]
+            evicted.append(rel)
+            print(f"Evicted artifact {rel} (quota {self.quota_bytes // (1024 * 1024)} MB)")
+        return evicted
+
+class ArtifactContentCache:
+    """In-memory cache of artifact text, revalidated against each file's mtime and size.
+
+    Entries also hold the parsed JSON so repeat views skip the disk read and parse.
+    Least recently used entries are dropped beyond max_bytes.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        # path -> {"mtime_ns", "size", "text", "etag", "parsed"}
+        self.entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _etag(st: os.stat_result, content_hash: Optional[str]) -> str:
+        # Content-addressed files never change in place, so their hash is a stable validator
+        if content_hash:
+            return f'"{content_hash[:32]}"'
+        return f'"{st.st_size:x}-{st.st_mtime_ns:x}"'
+
+    def _put(self, path: str, st: os.stat_result, text: str, content_hash: Optional[str], parsed: Any = None) -> Dict[str, Any]:
+        self._drop(path)
+        entry = {
+            "mtime_ns": st.st_mtime_ns,
+            "size": st.st_size,
+            "text": text,
+            "etag": self._etag(st, content_hash),
+            "parsed": parsed,
+        }
+        self.entries[path] = entry
+        self.bytes += st.st_size
+        while self.bytes > self.max_bytes and len(self.entries) > 1:
+            self._drop(next(iter(self.entries)))
+        return entry
+
+    def _drop(self, path: str):
+        entry = self.entries.pop(path, None)
+        if entry:
+            self.bytes -= entry["size"]
+
+    def prime(self, path: str, text: str, content_hash: Optional[str] = None, parsed: Any = None):
+        """Seed the cache with content that was just written"""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return
+        self._put(path, st, text, content_hash, parsed)
+
+    async def get(self, path: str, content_hash: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Cached entry for path, re-reading the file only if it changed on disk"""
+        try:
+            st = await run_io(os.stat, path)
+        except OSError:
+            self._drop(path)
+            return None
+
+        entry = self.entries.get(path)
+        if entry and entry["mtime_ns"] == st.st_mtime_ns and entry["size"] == st.st_size:
+            self.entries.move_to_end(path)
+            self.hits += 1
+            return entry
+
+        self.misses += 1
+        raw = await run_io(Path(path).read_bytes)
+        return self._put(path, st, decode_text(raw), content_hash)
+
+    def get_stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 3) if total else None,
+        }
+
+# Global instances
+artifact_store = ArtifactStore()
+content_cache = ArtifactContentCache()
@@ -0,0 +1,71 @@
+"""Benchmark endpoint latency while chat history is being persisted.
+
+Runs in a scratch directory so the real chat_history.json is never touched.
+Compares legacy synchronous saves (NOTEBOOKLM_SYNC_IO=1 behaviour) against the
+background I/O executor, probing a cheap endpoint while messages are appended.
+
+Usage:
+    python bench_io.py [--messages 1500] [--size 1000] [--probes 200]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+async def run_mode(label, sync_io, args):
+    import file_io
+    import httpx
+    from app import app
+    from notebook_client import manager
+
+    file_io.SYNC_IO = sync_io
+    text = "x" * args.size
+    manager.chat_history = {f"nb{i % 10}": [] for i in range(10)}
+    for i in range(args.messages):
+        manager.chat_history[f"nb{i % 10}"].append({"role": "user", "text": text})
+
+    stop = asyncio.Event()
+
+    async def writer():
+        # Roughly a streaming chat: a message every 20 ms
+        while not stop.is_set():
+            manager.add_message("nb0", "ai", text)
+            await asyncio.sleep(0.02)
+
+    latencies = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        writers = [asyncio.create_task(writer()) for _ in range(2)]
+        for _ in range(args.probes):
+            start = time.perf_counter()
+            await client.get("/api/notebooks/nb0/summaries")
+            latencies.append((time.perf_counter() - start) * 1000)
+            await asyncio.sleep(0.005)
+        stop.set()
+        await asyncio.gather(*writers)
+    await manager.flush_history()
+
+    print(f"{label:<22} p50={percentile(latencies, 50):8.2f}ms  p95={percentile(latencies, 95):8.2f}ms  "
+          f"p99={percentile(latencies, 99):8.2f}ms  max={max(latencies):8.2f}ms")
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=1500)
+    parser.add_argument("--size", type=int, default=1000)
+    parser.add_argument("--probes", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"History: {args.messages} messages x {args.size} chars")
+    await run_mode("sync saves", True, args)
+    await run_mode("background saves", False, args)
+
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    os.chdir(tempfile.mkdtemp(prefix="bench_io_"))
+    asyncio.run(main())
@@ -0,0 +1,320 @@
+"""Load-test the backend against a local fake NotebookLM (fake_notebooklm.py).
+
+The fake server emulates the batchexecute RPC, chat and media endpoints with
+configurable latency, payload sizes and failure rates. NotebookManager talks to
+it through the same PlaywrightHttpClient used in production, and the FastAPI
+app is served by uvicorn on localhost (startup events off, so no browser is
+launched), so the whole stack from socket to RPC is measured.
+
+Workers pick scenarios from a weighted mix until the duration is up:
+    chat      POST /api/stream_query (full stream; time to first chunk is reported too)
+    open      POST /api/open_notebook (all NDJSON sections)
+    ingest    several POST /api/sources/text, then POST /api/select_notebook
+    generate  POST /api/generate_quiz or /api/generate_flashcards
+
+Runs in a scratch directory so real history and artifacts are never touched.
+
+Usage:
+    python bench_load.py [--mix chat=5,open=3,ingest=1,generate=1] [--concurrency 8] [--duration 30]
+                         [--latency-scale 1.0] [--failure-rate 0] [--json report.json]
+                         [--save-baseline] [--compare] [--tolerance 0.25]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_load_baseline.json")
+DEFAULT_MIX = "chat=5,open=3,ingest=1,generate=1"
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = float(weight or 1)
+    unknown = set(mix) - set(SCENARIOS)
+    if unknown:
+        raise SystemExit(f"Unknown scenario(s): {', '.join(sorted(unknown))}; choose from {', '.join(SCENARIOS)}")
+    return mix
+
+class Recorder:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        # First failure per endpoint, to tell injected upstream errors from real ones
+        self.first_error = {}
+
+    async def timed(self, endpoint, request):
+        start = time.perf_counter()
+        error = None
+        try:
+            response = await request
+            if response.status_code >= 400:
+                error = f"HTTP {response.status_code}: {response.text[:200]}"
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        self.record(endpoint, start, error)
+        return error is None
+
+    def record(self, endpoint, start, error=None):
+        if error is None:
+            self.latencies[endpoint].append((time.perf_counter() - start) * 1000)
+        else:
+            self.errors[endpoint] += 1
+            self.first_error.setdefault(endpoint, error)
+
+# --- scenarios: (client, recorder, state) ---
+
+async def scenario_chat(client, rec, state):
+    notebook_id = state["rng"].choice(state["notebooks"])
+    await client.post("/api/select_notebook", json={"notebook_id": notebook_id})
+    start = time.perf_counter()
+    error, first = None, None
+    try:
+        async with client.stream("POST", "/api/stream_query", json={"prompt": f"Question {state['rng'].random()}"}) as response:
+            if response.status_code >= 400:
+                error = f"HTTP {response.status_code}"
+            async for _ in response.aiter_bytes():
+                if first is None:
+                    first = (time.perf_counter() - start) * 1000
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    rec.record("POST /api/stream_query", start, error)
+    if error is None and first is not None:
+        rec.latencies["POST /api/stream_query (first chunk)"].append(first)
+
+async def scenario_open(client, rec, state):
+    notebook_id = state["rng"].choice(state["notebooks"])
+    start = time.perf_counter()
+    error = None
+    try:
+        async with client.stream("POST", "/api/open_notebook", json={"notebook_id": notebook_id}) as response:
+            if response.status_code >= 400:
+                error = f"HTTP {response.status_code}"
+            async for line in response.aiter_lines():
+                section = json.loads(line) if line else {}
+                if "error" in section:
+                    error = error or f"{section['section']}: {section['error'][:200]}"
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    rec.record("POST /api/open_notebook", start, error)
+
+async def scenario_ingest(client, rec, state):
+    notebook_id = state["rng"].choice(state["notebooks"])
+    content = "ingested text " * (state["args"].source_chars // 14)
+    batch = [
+        rec.timed("POST /api/sources/text", client.post("/api/sources/text", json={
+            "notebook_id": notebook_id, "title": f"Bulk {i}", "content": content}))
+        for i in range(state["args"].ingest_batch)
+    ]
+    await asyncio.gather(*batch)
+    await rec.timed("POST /api/select_notebook", client.post("/api/select_notebook", json={"notebook_id": notebook_id}))
+
+async def scenario_generate(client, rec, state):
+    notebook_id = state["rng"].choice(state["notebooks"])
+    await client.post("/api/select_notebook", json={"notebook_id": notebook_id})
+    # Unique parameters so generation dedup doesn't turn the request into a cache hit
+    nonce = f"{state['rng'].random():.12f}"
+    if state["rng"].random() < 0.5:
+        await rec.timed("POST /api/generate_quiz", client.post("/api/generate_quiz", json={"instructions": nonce}))
+    else:
+        await rec.timed("POST /api/generate_flashcards", client.post("/api/generate_flashcards", json={"content": nonce}))
+
+SCENARIOS = {
+    "chat": scenario_chat,
+    "open": scenario_open,
+    "ingest": scenario_ingest,
+    "generate": scenario_generate,
+}
+
+async def run(args):
+    import httpx
+    import uvicorn
+    from fake_notebooklm import FakeConfig, FakeNotebookLM, HttpxRequestContext, StandInClient
+    from notebook_client import manager, PlaywrightHttpClient
+    from loop_monitor import loop_monitor
+    from app import app
+    import metrics
+
+    fake = FakeNotebookLM(FakeConfig(
+        latency_scale=args.latency_scale,
+        failure_rate=args.failure_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        notebooks=args.notebooks,
+        sources_per_notebook=args.sources,
+        source_chars=args.source_chars,
+        answer_chars=args.answer_chars,
+        media_kb=args.media_kb,
+        generation_seconds=args.generation_seconds,
+        seed=args.seed,
+    ))
+    base_url = fake.start()
+    context = HttpxRequestContext(base_url)
+    manager.client = StandInClient(PlaywrightHttpClient(context))
+    if loop_monitor:
+        loop_monitor.start()
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=args.port, lifespan="off",
+                                           log_level="warning", access_log=False))
+    serving = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.02)
+    port = server.servers[0].sockets[0].getsockname()[1]
+
+    mix = parse_mix(args.mix)
+    rec = Recorder()
+    limits = httpx.Limits(max_connections=args.concurrency * 2)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=600, limits=limits) as client:
+        notebooks = (await client.get("/api/notebooks")).json()
+        state = {"notebooks": [nb["id"] for nb in notebooks], "args": args, "rng": random.Random(args.seed)}
+        deadline = time.perf_counter() + args.duration
+
+        async def worker():
+            while time.perf_counter() < deadline:
+                name = state["rng"].choices(list(mix), weights=list(mix.values()))[0]
+                await SCENARIOS[name](client, rec, state)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+
+    server.should_exit = True
+    await serving
+    await manager.flush_history()
+    loop = loop_monitor.get_stats() if loop_monitor else {}
+    loop = {k: v for k, v in loop.items() if k != "running"}
+    if loop_monitor:
+        await loop_monitor.stop()
+    await context.dispose()
+    fake.stop()
+
+    endpoints = {}
+    for endpoint in sorted(set(rec.latencies) | set(rec.errors)):
+        values = rec.latencies.get(endpoint, [])
+        entry = {"count": len(values), "errors": rec.errors.get(endpoint, 0), "rps": round(len(values) / elapsed, 2)}
+        if endpoint in rec.first_error:
+            entry["first_error"] = rec.first_error[endpoint]
+        if values:
+            entry.update({
+                "p50_ms": round(percentile(values, 50), 1),
+                "p95_ms": round(percentile(values, 95), 1),
+                "p99_ms": round(percentile(values, 99), 1),
+                "max_ms": round(max(values), 1),
+            })
+        endpoints[endpoint] = entry
+    rpc_total = sum(metrics.rpc_requests.values.values())
+    return {
+        "config": {k: getattr(args, k) for k in (
+            "mix", "concurrency", "duration", "latency_scale", "failure_rate", "rate_limit_rate", "notebooks",
+            "sources", "source_chars", "answer_chars", "media_kb", "generation_seconds", "ingest_batch", "seed")},
+        "python": sys.version.split()[0],
+        "elapsed_s": round(elapsed, 2),
+        "throughput_rps": round(sum(e["count"] for e in endpoints.values()) / elapsed, 2),
+        "upstream_requests": fake.requests,
+        "upstream_injected_failures": fake.failures,
+        "rpc_requests": rpc_total,
+        "loop": loop,
+        "endpoints": endpoints,
+    }
+
+def print_report(report):
+    print(f"\n{report['elapsed_s']}s, {report['config']['concurrency']} workers, mix {report['config']['mix']}: "
+          f"{report['throughput_rps']} req/s, {report['upstream_requests']} upstream requests "
+          f"({report['upstream_injected_failures']} injected failures)")
+    print(f"{'endpoint':<40} {'count':>6} {'err':>4} {'req/s':>7} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}")
+    for endpoint, e in report["endpoints"].items():
+        if "p50_ms" in e:
+            times = f"{e['p50_ms']:7.1f}ms {e['p95_ms']:7.1f}ms {e['p99_ms']:7.1f}ms {e['max_ms']:7.1f}ms"
+        else:
+            times = f"{'-':>9} {'-':>9} {'-':>9} {'-':>9}"
+        print(f"{endpoint:<40} {e['count']:>6} {e['errors']:>4} {e['rps']:>7.2f} {times}")
+    for endpoint, e in report["endpoints"].items():
+        if "first_error" in e:
+            print(f"  first error on {endpoint}: {e['first_error']}")
+    if report["loop"]:
+        print(f"event loop: {report['loop']}")
+
+def compare(report, baseline, tolerance):
+    """Regressions of p95 latency, error count and throughput against a baseline report"""
+    problems = []
+    if baseline.get("config") != report["config"]:
+        print("Warning: baseline was recorded with a different configuration; comparison may be meaningless")
+    for endpoint, base in baseline["endpoints"].items():
+        current = report["endpoints"].get(endpoint)
+        if current is None:
+            problems.append(f"{endpoint}: no successful requests (baseline had {base['count']})")
+            continue
+        if "p95_ms" in base and "p95_ms" in current and current["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            problems.append(f"{endpoint}: p95 {current['p95_ms']}ms vs baseline {base['p95_ms']}ms")
+        if current["errors"] > base["errors"] and current["errors"] > current["count"] * 0.01:
+            problems.append(f"{endpoint}: {current['errors']} errors vs baseline {base['errors']}")
+    if report["throughput_rps"] < baseline["throughput_rps"] * (1 - tolerance):
+        problems.append(f"throughput {report['throughput_rps']} req/s vs baseline {baseline['throughput_rps']} req/s")
+    return problems
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="scenario=weight list")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=30, help="seconds")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="multiplier for the fake's upstream latencies")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="fraction of upstream requests answered with 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="fraction answered with 429")
+    parser.add_argument("--notebooks", type=int, default=10)
+    parser.add_argument("--sources", type=int, default=20, help="sources per notebook")
+    parser.add_argument("--source-chars", type=int, default=20000)
+    parser.add_argument("--answer-chars", type=int, default=400)
+    parser.add_argument("--media-kb", type=int, default=512)
+    parser.add_argument("--generation-seconds", type=float, default=2.0)
+    parser.add_argument("--ingest-batch", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--port", type=int, default=0, help="port for the backend (default: any free port)")
+    parser.add_argument("--json", help="write the report here")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--compare", action="store_true", help="exit 1 if the run regresses against the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+    parse_mix(args.mix)
+
+    args.baseline = os.path.abspath(args.baseline)
+    if args.json:
+        args.json = os.path.abspath(args.json)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    os.chdir(tempfile.mkdtemp(prefix="bench_load_"))
+    report = asyncio.run(run(args))
+    print_report(report)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+        print(f"Baseline saved to {args.baseline}")
+    if args.compare:
+        if not os.path.exists(args.baseline):
+            print(f"No baseline at {args.baseline}")
+            return 1
+        with open(args.baseline, encoding="utf-8") as f:
+            problems = compare(report, json.load(f), args.tolerance)
+        if problems:
+            print("Regressions:")
+            for problem in problems:
+                print(f"  {problem}")
+            return 1
+        print("No regressions against baseline")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
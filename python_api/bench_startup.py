@@ -0,0 +1,100 @@
+"""Benchmark browser startup with and without the cached browser config.
+
+Usage:
+    python bench_startup.py            # discovery vs cached validation only
+    python bench_startup.py --launch   # also time full cold/warm browser launches
+    python bench_startup.py --connect  # launch-to-ready time and browser RSS, lean mode off vs on
+"""
+import asyncio
+import sys
+import time
+from browser_config import BrowserConfigCache, browser_config
+from notebook_client import NotebookManager, DEFAULT_LAUNCH_OPTIONS, browser_rss_bytes
+
+RUNS = 5
+
+async def time_it(label, fn, runs=RUNS):
+    durations = []
+    result = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = await fn()
+        durations.append(time.perf_counter() - start)
+    durations.sort()
+    print(f"{label:<32} min={durations[0]*1000:9.2f}ms  median={durations[len(durations)//2]*1000:9.2f}ms")
+    return result
+
+async def bench_discovery(mgr):
+    print("\n[Discovery]")
+    executable = await time_it("cold: full discovery", mgr._discover_browser, runs=1)
+    if not executable:
+        print("No browser found; skipping cached validation benchmark.")
+        return
+
+    bench_cache = BrowserConfigCache("browser_config.bench.json")
+    bench_cache.save(executable, DEFAULT_LAUNCH_OPTIONS)
+
+    async def warm():
+        return bench_cache.get_valid()
+
+    await time_it("warm: cached stat + version", warm)
+    bench_cache.clear()
+
+async def bench_launch(mgr):
+    print("\n[Launch]")
+    saved = browser_config.config
+
+    async def launch_and_close():
+        await mgr._launch_browser(headless=True)
+        await mgr.context.close()
+        await mgr.playwright.stop()
+        mgr.playwright = None
+
+    async def cold():
+        browser_config.clear()
+        await launch_and_close()
+
+    try:
+        await time_it("cold launch (no cache)", cold, runs=1)
+        await time_it("warm launch (cached config)", launch_and_close, runs=3)
+    finally:
+        # Restore whatever config the user had before benchmarking
+        if saved:
+            browser_config.save(saved["executable_path"], saved.get("launch_args") or DEFAULT_LAUNCH_OPTIONS)
+
+async def bench_connect(mgr):
+    print("\n[Connect: launch-to-ready and memory]")
+    # Fast start would validate persisted tokens without launching a browser at all
+    mgr.fast_start = False
+    for lean in (False, True):
+        mgr.lean_mode = lean
+        start = time.perf_counter()
+        ok = await mgr.try_auto_connect()
+        elapsed = time.perf_counter() - start
+        # Let the renderer settle before sampling memory
+        await asyncio.sleep(3)
+        rss = browser_rss_bytes(mgr.browser_executable)
+        rss_text = f"{rss / (1024 * 1024):8.1f}MB" if rss is not None else "n/a (install psutil)"
+        print(f"lean={str(lean):<5} connected={ok!s:<5} launch-to-ready={elapsed*1000:9.2f}ms  browser RSS={rss_text}")
+        # try_auto_connect starts these on success; they must not outlive the run
+        for task in (mgr._refresher_task, mgr._idle_task):
+            if task and not task.done():
+                task.cancel()
+        mgr._refresher_task = mgr._idle_task = None
+        if mgr.context:
+            await mgr.context.close()
+        if mgr.playwright:
+            await mgr.playwright.stop()
+            mgr.playwright = None
+        mgr.client = None
+
+async def main():
+    mgr = NotebookManager()
+    await bench_discovery(mgr)
+    if "--launch" in sys.argv:
+        await bench_launch(mgr)
+    if "--connect" in sys.argv:
+        await bench_connect(mgr)
+
+if __name__ == "__main__":
+    asyncio.run(main())
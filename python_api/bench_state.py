@@ -0,0 +1,284 @@
+"""Benchmark local state operations as chat history, artifacts and tasks grow.
+
+For each history size a scratch directory gets a synthetic chat_history.json
+(one busy notebook holds half the messages) and artifacts.json with real
+artifact files. The script then times:
+    startup                 NotebookManager() construction, which loads both files
+    save_history            one full serialize-and-write of chat_history.json
+    add_message             appending to the busy notebook (includes scheduling the save)
+    get_history             full and last-50 reads of the busy notebook
+    add_artifact            new (hash not seen) and duplicate artifacts in a large notebook
+    get_artifact_content    cold (file read) and warm (content cache) reads
+    tasks                   TaskManager create/update/get and the active-task queries
+
+Timings run without tracemalloc. A separate tracemalloc pass records peak
+(and, for startup, retained) Python memory, since tracing slows allocation.
+
+Usage:
+    python bench_state.py [--sizes 1000,10000,100000] [--artifacts 2000] [--tasks 5000] [--json report.json]
+    python bench_state.py --sizes 1000000                 # about 2 GB of RAM
+    python bench_state.py --compare old.json [--tolerance 0.5]
+"""
+import argparse
+import asyncio
+import gc
+import hashlib
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+def summarize(samples):
+    """Per-call statistics in microseconds"""
+    samples = sorted(samples)
+    n = len(samples)
+    return {
+        "n": n,
+        "mean_us": round(sum(samples) / n * 1e6, 2),
+        "p50_us": round(samples[n // 2] * 1e6, 2),
+        "p99_us": round(samples[min(n - 1, int(n * 0.99))] * 1e6, 2),
+        "max_us": round(samples[-1] * 1e6, 2),
+    }
+
+def measure(fn, n):
+    samples = []
+    for i in range(n):
+        start = time.perf_counter()
+        fn(i)
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+async def ameasure(fn, n):
+    samples = []
+    for i in range(n):
+        start = time.perf_counter()
+        await fn(i)
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+def peak_memory(fn):
+    """(peak MB, retained MB, result) of fn() under tracemalloc"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = fn()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return round(peak / 2**20, 2), round(current / 2**20, 2), result
+
+# --- synthetic data ---
+
+def make_texts(rng, count, chars):
+    words = ["notebook", "source", "answer", "citation", "summary", "quiz", "evidence", "研究", "資料", "分析"]
+    texts = []
+    for _ in range(count):
+        target = int(rng.uniform(0.3, 1.7) * chars)
+        parts, size = [], 0
+        while size < target:
+            w = rng.choice(words)
+            parts.append(w)
+            size += len(w) + 1
+        texts.append(" ".join(parts))
+    return texts
+
+def write_history(path, rng, messages, notebooks, chars):
+    texts = make_texts(rng, 500, chars)
+    history = {f"nb{i:03d}": [] for i in range(notebooks)}
+    busy = history["nb000"]
+    others = [history[nb] for nb in history if nb != "nb000"] or [busy]
+    for i in range(messages):
+        target = busy if i % 2 == 0 else rng.choice(others)
+        target.append({"role": "user" if i % 4 < 2 else "ai", "text": rng.choice(texts)})
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(history, f, indent=2, ensure_ascii=False)
+
+def write_artifacts(path, rng, count, notebooks, size):
+    """artifacts.json plus one file per artifact; a quarter of them sit in the busy notebook"""
+    types = [("quiz", ".json"), ("flashcards", ".json"), ("report", ".md"), ("mindmap", ".json")]
+    store = {f"nb{i:03d}": [] for i in range(notebooks)}
+    texts = make_texts(rng, 50, size)
+    os.makedirs("artifacts", exist_ok=True)
+    for i in range(count):
+        nb = "nb000" if i % 4 == 0 else f"nb{rng.randrange(notebooks):03d}"
+        type, ext = rng.choice(types)
+        text = f"{i} {rng.choice(texts)}"
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        file_path = os.path.abspath(os.path.join("artifacts", f"{digest[:16]}{ext}"))
+        with open(file_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        store[nb].append({
+            "id": f"{type}_{1700000000 + i}_{digest[:6]}",
+            "type": type,
+            "title": f"{type.title()} {i}",
+            "details": {"path": file_path, "hash": digest, "size": len(text)},
+            "created_at": "2026-01-01T00:00:00",
+        })
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(store, f, indent=2, ensure_ascii=False)
+    return store
+
+# --- benchmarks ---
+
+async def bench_manager(args, size, rng):
+    from notebook_client import NotebookManager
+    from artifact_store import content_cache
+
+    results, memory = {}, {}
+    write_history("chat_history.json", rng, size, args.notebooks, args.message_chars)
+    store = write_artifacts("artifacts.json", rng, args.artifacts, args.notebooks, args.artifact_chars)
+    files = {name: round(os.path.getsize(name) / 2**20, 2) for name in ("chat_history.json", "artifacts.json")}
+
+    managers = []
+    results["startup"] = measure(lambda i: managers.append(NotebookManager()), args.repeat)
+    manager = managers.pop()
+    managers.clear()
+    gc.collect()
+    memory["startup_peak_mb"], memory["startup_retained_mb"], _ = peak_memory(NotebookManager)
+
+    saver = manager._history_saver
+    results["save_history"] = measure(lambda i: saver._write(saver.snapshot()), args.repeat)
+    memory["save_history_peak_mb"], _, _ = peak_memory(lambda: saver._write(saver.snapshot()))
+
+    texts = make_texts(rng, 50, args.message_chars)
+    results["add_message"] = measure(lambda i: manager.add_message("nb000", "user", texts[i % 50]), args.ops)
+    start = time.perf_counter()
+    await manager.flush_history()
+    results["add_message_flush"] = summarize([time.perf_counter() - start])
+
+    results["get_history"] = measure(lambda i: manager.get_history("nb000"), args.ops)
+    results["get_history_last_50"] = measure(lambda i: manager.get_history("nb000", limit=50), args.ops)
+    results["get_history_other_notebook"] = measure(lambda i: manager.get_history(f"nb{1 + i % (args.notebooks - 1):03d}"), args.ops)
+
+    busy = store["nb000"]
+    results["add_artifact_new"] = measure(lambda i: manager.add_artifact(
+        "nb000", "quiz", "New", {"path": "unused", "hash": f"new-{size}-{i}"}), args.ops // 4)
+    results["add_artifact_duplicate"] = measure(lambda i: manager.add_artifact(
+        "nb000", busy[-1 - i % len(busy)]["type"], "Dup", dict(busy[-1 - i % len(busy)]["details"])), args.ops // 4)
+    await manager.flush_history()
+
+    reads = [(nb, a["id"]) for nb, artifacts in store.items() for a in artifacts][:args.ops // 4]
+    content_cache.entries.clear()
+    content_cache.bytes = 0
+    results["get_artifact_content_cold"] = await ameasure(lambda i: manager.get_artifact_content(*reads[i]), len(reads))
+    results["get_artifact_content_warm"] = await ameasure(lambda i: manager.get_artifact_content(*reads[i]), len(reads))
+    return results, memory, files
+
+def bench_tasks(args, rng):
+    from task_manager import TaskManager
+
+    results, memory = {}, {}
+    tasks = TaskManager()
+    types = ["generate_quiz", "generate_audio", "generate_flashcards", "chat_query", "source_summary"]
+    results["task_create"] = measure(lambda i: tasks.create_task(rng.choice(types), f"nb{rng.randrange(args.notebooks):03d}"), args.tasks)
+    now = time.time()
+    ids = list(tasks.tasks)
+    for i, task_id in enumerate(ids):
+        # Mostly finished tasks from the last 50 minutes (so cleanup keeps them), a few still running
+        task = tasks.tasks[task_id]
+        task["status"] = "running" if i % 20 == 0 else rng.choice(["completed", "completed", "error"])
+        task["updated_at"] = now - rng.uniform(10, 3000)
+    results["task_update_status"] = measure(lambda i: tasks.update_status(ids[i % len(ids)], "running" if i % 20 == 0 else "completed"), args.ops)
+    results["task_get"] = measure(lambda i: tasks.get_task(ids[i % len(ids)]), args.ops)
+    results["task_get_active"] = measure(lambda i: tasks.get_active_tasks(f"nb{i % args.notebooks:03d}"), args.ops // 10)
+    results["task_active_grouped"] = measure(lambda i: tasks.get_all_active_tasks_grouped(), args.ops // 10)
+    memory["task_active_grouped_peak_mb"], _, _ = peak_memory(tasks.get_all_active_tasks_grouped)
+    return results, memory
+
+async def run(args):
+    report = {
+        "python": sys.version.split()[0],
+        "platform": sys.platform,
+        "config": {k: getattr(args, k) for k in (
+            "notebooks", "message_chars", "artifacts", "artifact_chars", "tasks", "ops", "repeat", "seed")},
+        "sizes": {},
+    }
+    root = os.getcwd()
+    for size in args.sizes:
+        workdir = os.path.join(root, f"messages_{size}")
+        os.makedirs(workdir)
+        os.chdir(workdir)
+        rng = random.Random(args.seed)
+        print(f"\n[{size} messages, {args.artifacts} artifacts, {args.tasks} tasks]")
+        ops, memory, files = await bench_manager(args, size, rng)
+        task_ops, task_memory = bench_tasks(args, rng)
+        ops.update(task_ops)
+        memory.update(task_memory)
+        report["sizes"][str(size)] = {"files_mb": files, "memory_mb": memory, "ops": ops}
+        print_size(report["sizes"][str(size)])
+        os.chdir(root)
+    return report
+
+def print_size(entry):
+    print(f"files: {entry['files_mb']}  memory: {entry['memory_mb']}")
+    print(f"{'operation':<30} {'n':>6} {'mean':>12} {'p50':>12} {'p99':>12} {'max':>12}")
+    for name, s in entry["ops"].items():
+        print(f"{name:<30} {s['n']:>6} {s['mean_us']:>10.1f}us {s['p50_us']:>10.1f}us {s['p99_us']:>10.1f}us {s['max_us']:>10.1f}us")
+
+def compare(report, baseline, tolerance):
+    """Operations whose mean time or whose memory grew beyond tolerance against a previous report"""
+    problems = []
+    if baseline.get("config") != report["config"]:
+        print("Warning: baseline was recorded with a different configuration; comparison may be meaningless")
+    for size, entry in report["sizes"].items():
+        base = baseline.get("sizes", {}).get(size)
+        if base is None:
+            continue
+        for name, s in entry["ops"].items():
+            old = base["ops"].get(name)
+            # Sub-microsecond differences are timer noise
+            if old and s["mean_us"] > old["mean_us"] * (1 + tolerance) and s["mean_us"] - old["mean_us"] > 1:
+                problems.append(f"{size} messages, {name}: mean {s['mean_us']}us vs {old['mean_us']}us")
+        for name, mb in entry["memory_mb"].items():
+            old = base["memory_mb"].get(name)
+            if old is not None and mb > old * (1 + tolerance) and mb - old > 1:
+                problems.append(f"{size} messages, {name}: {mb} MB vs {old} MB")
+    return problems
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="1000,10000,100000", help="comma-separated history sizes in messages")
+    parser.add_argument("--notebooks", type=int, default=50)
+    parser.add_argument("--message-chars", type=int, default=400)
+    parser.add_argument("--artifacts", type=int, default=2000)
+    parser.add_argument("--artifact-chars", type=int, default=4000)
+    parser.add_argument("--tasks", type=int, default=5000)
+    parser.add_argument("--ops", type=int, default=2000, help="calls per operation (fewer for the slower ones)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs of startup and full saves")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="write the report here")
+    parser.add_argument("--compare", help="previous report; exit 1 on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.5)
+    args = parser.parse_args()
+    args.sizes = [int(s) for s in args.sizes.split(",")]
+    if args.notebooks < 2:
+        parser.error("--notebooks must be at least 2")
+    if args.json:
+        args.json = os.path.abspath(args.json)
+    if args.compare:
+        args.compare = os.path.abspath(args.compare)
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    os.chdir(tempfile.mkdtemp(prefix="bench_state_"))
+    report = asyncio.run(run(args))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport written to {args.json}")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            problems = compare(report, json.load(f), args.tolerance)
+        if problems:
+            print("Regressions:")
+            for problem in problems:
+                print(f"  {problem}")
+            return 1
+        print("No regressions against baseline")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
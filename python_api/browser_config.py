@@ -0,0 +1,87 @@
+import json
+import os
+import re
+import time
+from pathlib import Path
+from typing import Dict, Optional, Any
+
+_VERSION_DIR = re.compile(r"^\d+(\.\d+){2,3}$")
+
+def detect_browser_version(executable_path: str) -> Optional[str]:
+    """Cheap version detection from the install layout (no process spawn)"""
+    exe = Path(executable_path)
+    # Playwright managed browsers: .../ms-playwright/chromium-1097/chrome-win64/chrome.exe
+    for parent in exe.parents:
+        if parent.name.startswith("chromium-"):
+            return parent.name
+    # Chrome/Edge keep a versioned sibling directory next to the executable
+    try:
+        versions = [d.name for d in exe.parent.iterdir() if d.is_dir() and _VERSION_DIR.match(d.name)]
+    except OSError:
+        versions = []
+    if versions:
+        return max(versions, key=lambda v: tuple(int(p) for p in v.split(".")))
+    return None
+
+class BrowserConfigCache:
+    """Remembers the browser executable and launch args that last launched successfully"""
+
+    def __init__(self, config_file: str = "browser_config.json"):
+        self.config_file = Path(config_file)
+        self.config: Optional[Dict[str, Any]] = None
+        self._load()
+
+    def _load(self):
+        if self.config_file.exists():
+            try:
+                self.config = json.loads(self.config_file.read_text(encoding="utf-8"))
+            except:
+                self.config = None
+
+    def get_valid(self) -> Optional[Dict[str, Any]]:
+        """Return the cached config if the executable is unchanged on disk"""
+        if not self.config:
+            return None
+        path = self.config.get("executable_path")
+        if not path:
+            return None
+        try:
+            st = os.stat(path)
+        except OSError:
+            print(f"Cached browser missing: {path}")
+            return None
+        if st.st_size != self.config.get("size") or int(st.st_mtime) != self.config.get("mtime"):
+            print(f"Cached browser changed on disk: {path}")
+            return None
+        if detect_browser_version(path) != self.config.get("version"):
+            print(f"Cached browser version changed: {path}")
+            return None
+        return self.config
+
+    def save(self, executable_path: str, launch_args: Dict[str, Any]):
+        try:
+            st = os.stat(executable_path)
+        except OSError:
+            return
+        self.config = {
+            "executable_path": executable_path,
+            "version": detect_browser_version(executable_path),
+            "size": st.st_size,
+            "mtime": int(st.st_mtime),
+            "launch_args": launch_args,
+            "validated_at": time.time()
+        }
+        try:
+            self.config_file.write_text(json.dumps(self.config, indent=2), encoding="utf-8")
+        except Exception as e:
+            print(f"Warning: Failed to save browser config: {e}")
+
+    def clear(self):
+        self.config = None
+        try:
+            self.config_file.unlink()
+        except FileNotFoundError:
+            pass
+
+# Global instance
+browser_config = BrowserConfigCache()
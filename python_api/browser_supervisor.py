@@ -0,0 +1,79 @@
+import asyncio
+import os
+import time
+from typing import Dict, Optional, Any
+from notebook_client import manager, browser_rss_bytes
+
+class BrowserSupervisor:
+    """Watches the headless browser's memory and liveness and recycles it when needed"""
+
+    def __init__(self, rss_cap_mb: float = None, check_interval: float = 30.0):
+        self.rss_cap_mb = rss_cap_mb if rss_cap_mb is not None else float(os.environ.get("NOTEBOOKLM_BROWSER_RSS_CAP_MB", "1024"))
+        self.check_interval = check_interval
+        self.stats: Dict[str, Any] = {
+            "checks": 0,
+            "recycles": 0,
+            "recycle_reasons": {},
+            "failed_recycles": 0,
+            "last_recycle_at": None,
+            "last_recycle_s": None,
+            "total_recycle_s": 0.0,
+            "last_rss_mb": None,
+            "max_rss_mb": None,
+        }
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.check_interval)
+            try:
+                await self.check()
+            except Exception as e:
+                print(f"Browser supervisor check failed: {e}")
+
+    async def check(self) -> Optional[str]:
+        """Run one supervision pass; returns the recycle reason if a recycle happened"""
+        # Nothing to supervise while hibernated or on the non-browser transport
+        if manager.context is None or manager.transport != "browser":
+            return None
+        self.stats["checks"] += 1
+
+        reason = None
+        rss = browser_rss_bytes(manager.browser_executable)
+        if rss is not None:
+            rss_mb = round(rss / (1024 * 1024), 1)
+            self.stats["last_rss_mb"] = rss_mb
+            self.stats["max_rss_mb"] = max(self.stats["max_rss_mb"] or 0, rss_mb)
+            if self.rss_cap_mb > 0 and rss_mb > self.rss_cap_mb:
+                reason = "rss_cap"
+
+        if reason is None and not await manager.is_browser_alive():
+            reason = "crashed"
+
+        if reason:
+            await self.recycle(reason)
+        return reason
+
+    async def recycle(self, reason: str):
+        try:
+            duration = await manager.recycle_browser(reason)
+        except Exception as e:
+            self.stats["failed_recycles"] += 1
+            print(f"Browser recycle failed ({reason}): {e}")
+            return
+        reasons = self.stats["recycle_reasons"]
+        reasons[reason] = reasons.get(reason, 0) + 1
+        self.stats["recycles"] += 1
+        self.stats["last_recycle_at"] = time.time()
+        self.stats["last_recycle_s"] = round(duration, 3)
+        self.stats["total_recycle_s"] = round(self.stats["total_recycle_s"] + duration, 3)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"rss_cap_mb": self.rss_cap_mb, **self.stats}
+
+# Global instance
+supervisor = BrowserSupervisor()
@@ -0,0 +1,307 @@
+"""Record upstream RPC traffic into cassettes and replay it without a Google session.
+
+A cassette is a JSONL file: a header line, then one line per request/response
+pair with its start offset and upstream latency. Cookies, the CSRF token
+(`at`), the session id (`f.sid`) and any other known secret values are
+replaced with "REDACTED" before anything is written.
+
+Recording: NOTEBOOKLM_RECORD=1 (writes to <backend.log dir>/cassettes/) or
+NOTEBOOKLM_RECORD=<file.jsonl>. Replay: NOTEBOOKLM_REPLAY=<file.jsonl>, with
+NOTEBOOKLM_REPLAY_SPEED=1 for the recorded latencies (default), 2 for twice as
+fast, or 0 for no delay at all.
+
+Usage:
+    python cassette.py <file.jsonl>    # per-RPC summary of a cassette
+    python cassette.py --check         # record against fake_notebooklm, replay, compare
+"""
+import asyncio
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+REDACTED = "REDACTED"
+CASSETTE_VERSION = 1
+
+# Query/form parameters holding tokens, and parameters that change per request without changing the answer
+_SECRET_PARAMS = ("at", "f.sid")
+_VOLATILE_PARAMS = ("at", "f.sid", "_reqid", "bl", "hl", "rt")
+_SECRET_HEADERS = ("cookie", "authorization", "set-cookie", "x-goog-authuser", "x-client-data")
+_PARAM_RE = re.compile(r"(^|[?&])(%s)=[^&]*" % "|".join(re.escape(p) for p in _SECRET_PARAMS))
+
+def _redact_params(text: str) -> str:
+    return _PARAM_RE.sub(lambda m: f"{m.group(1)}{m.group(2)}={REDACTED}", text)
+
+def _redact_headers(headers: Optional[Dict[str, str]]) -> Dict[str, str]:
+    return {k: (REDACTED if k.lower() in _SECRET_HEADERS else v) for k, v in (headers or {}).items()}
+
+def _as_text(content) -> str:
+    if content is None:
+        return ""
+    if isinstance(content, bytes):
+        return content.decode("utf-8", errors="replace")
+    return str(content)
+
+def match_key(method: str, url: str, body: str) -> Tuple[str, str, str]:
+    """Identity of a request for replay: method, path with stable query params, and body without tokens"""
+    parts = urlsplit(url)
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k not in _VOLATILE_PARAMS]
+    form = [(k, v) for k, v in parse_qsl(body, keep_blank_values=True) if k not in _VOLATILE_PARAMS] if "=" in body else body
+    return method, f"{parts.path}?{urlencode(sorted(query))}", form if isinstance(form, str) else urlencode(form)
+
+def route_key(method: str, url: str) -> Tuple[str, str]:
+    """Looser identity used when no exact match is left: method, path and rpcids"""
+    parts = urlsplit(url)
+    rpc_ids = dict(parse_qsl(parts.query)).get("rpcids", "")
+    return method, f"{parts.path}?rpcids={rpc_ids}"
+
+class CassetteRecorder:
+    """Appends redacted request/response pairs to a cassette from the I/O executor"""
+
+    def __init__(self, path: str, secrets: Optional[Callable[[], Iterable[str]]] = None):
+        self.path = path
+        # () -> current token and cookie values to scrub wherever they appear
+        self.secrets = secrets
+        self.started = time.time()
+        self.recorded = 0
+        self._seq = 0
+        self._lock = threading.Lock()
+        self._header_written = False
+
+    def _scrub(self, text: str, secrets: List[str]) -> str:
+        text = _redact_params(text)
+        for value in secrets:
+            text = text.replace(value, REDACTED)
+        return text
+
+    def record(self, method: str, url: str, body, request_headers: Optional[Dict[str, str]],
+               status: int, response_headers: Optional[Dict[str, str]], response_text: str,
+               started: float, elapsed: float):
+        from urllib.parse import quote
+        secrets = []
+        for value in (self.secrets() if self.secrets else ()):
+            # Long enough to be a token, not a word that happens to appear in a response
+            if value and len(value) >= 8:
+                secrets.extend({value, quote(value, safe="")})
+        self._seq += 1
+        entry = {
+            "seq": self._seq,
+            "offset_s": round(started - self.started, 4),
+            "elapsed_ms": round(elapsed * 1000, 2),
+            "method": method,
+            "url": self._scrub(url, secrets),
+            "request_headers": _redact_headers(request_headers),
+            "body": self._scrub(_as_text(body), secrets),
+            "status": status,
+            "response_headers": _redact_headers(response_headers),
+            "response": self._scrub(response_text, secrets),
+        }
+        from file_io import io_executor
+        io_executor.submit(self._append, entry)
+
+    def _append(self, entry: Dict[str, Any]):
+        try:
+            with self._lock:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                with open(self.path, "a", encoding="utf-8") as f:
+                    if not self._header_written:
+                        header = {"cassette": CASSETTE_VERSION, "recorded_at": self.started}
+                        f.write(json.dumps(header) + "\n")
+                        self._header_written = True
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                self.recorded += 1
+        except OSError as e:
+            print(f"Warning: Failed to write cassette {self.path}: {e}")
+
+def load_cassette(path: str) -> List[Dict[str, Any]]:
+    """Interactions of a cassette in recorded order"""
+    entries = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            item = json.loads(line)
+            if "cassette" in item:
+                if item["cassette"] > CASSETTE_VERSION:
+                    raise ValueError(f"{path}: unsupported cassette version {item['cassette']}")
+                continue
+            entries.append(item)
+    entries.sort(key=lambda e: e["seq"])
+    return entries
+
+class ReplayResponse:
+    """Playwright APIResponse look-alike for a recorded interaction"""
+
+    def __init__(self, entry: Dict[str, Any], url: str):
+        self.entry = entry
+        self.url = url
+        self.status = entry["status"]
+        self.headers = entry.get("response_headers", {})
+
+    async def text(self) -> str:
+        return self.entry["response"]
+
+    async def body(self) -> bytes:
+        return self.entry["response"].encode("utf-8")
+
+class ReplayRequestContext:
+    """Playwright APIRequestContext look-alike that answers from a cassette.
+
+    Requests are matched on method, path, stable query parameters and the body
+    without tokens; identical requests get their recorded responses in order
+    (the last one repeats once they run out). A request with no exact match
+    falls back to the next unused response of the same RPC, otherwise it gets
+    a 404. `speed` scales the recorded latencies: 1 replays them as recorded,
+    0 answers immediately.
+    """
+
+    def __init__(self, path: str, speed: float = 1.0):
+        self.path = path
+        self.speed = speed
+        self.entries = load_cassette(path)
+        self.exact: Dict[Tuple[str, str, str], Deque[Dict[str, Any]]] = defaultdict(deque)
+        self.by_route: Dict[Tuple[str, str], Deque[Dict[str, Any]]] = defaultdict(deque)
+        self.used: set = set()
+        self.last: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+        self.stats = {"exact": 0, "repeated": 0, "fallback": 0, "missing": 0}
+        for entry in self.entries:
+            self.exact[match_key(entry["method"], entry["url"], entry["body"])].append(entry)
+            self.by_route[route_key(entry["method"], entry["url"])].append(entry)
+
+    def _take(self, queue: Deque[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        while queue:
+            entry = queue.popleft()
+            if entry["seq"] not in self.used:
+                self.used.add(entry["seq"])
+                return entry
+        return None
+
+    def match(self, method: str, url: str, body) -> Optional[Dict[str, Any]]:
+        key = match_key(method, url, _redact_params(_as_text(body)))
+        entry = self._take(self.exact.get(key, deque()))
+        if entry is not None:
+            self.stats["exact"] += 1
+        elif key in self.last:
+            entry = self.last[key]
+            self.stats["repeated"] += 1
+        else:
+            entry = self._take(self.by_route.get(route_key(method, url), deque()))
+            if entry is None:
+                self.stats["missing"] += 1
+                return None
+            self.stats["fallback"] += 1
+        self.last[key] = entry
+        return entry
+
+    async def _respond(self, method: str, url: str, body) -> ReplayResponse:
+        entry = self.match(method, url, body)
+        if entry is None:
+            print(f"Replay: no recorded response for {method} {url[:120]}")
+            entry = {"seq": 0, "status": 404, "response": "no recorded response", "elapsed_ms": 0}
+        if self.speed > 0:
+            await asyncio.sleep(entry["elapsed_ms"] / 1000 / self.speed)
+        return ReplayResponse(entry, url)
+
+    async def post(self, url, data=None, headers=None, timeout=0):
+        return await self._respond("POST", url, data)
+
+    async def get(self, url, headers=None, timeout=0):
+        return await self._respond("GET", url, None)
+
+    async def dispose(self):
+        pass
+
+def recorder_from_env() -> Optional[CassetteRecorder]:
+    target = os.environ.get("NOTEBOOKLM_RECORD")
+    if not target or target == "0":
+        return None
+    if target == "1":
+        from file_io import log_dir
+        target = os.path.join(log_dir(), "cassettes", time.strftime("%Y%m%d-%H%M%S") + ".jsonl")
+    print(f"Recording upstream traffic to {target}")
+    return CassetteRecorder(target)
+
+def replay_from_env() -> Optional[ReplayRequestContext]:
+    path = os.environ.get("NOTEBOOKLM_REPLAY")
+    if not path:
+        return None
+    speed = float(os.environ.get("NOTEBOOKLM_REPLAY_SPEED", "1"))
+    replay = ReplayRequestContext(path, speed=speed)
+    print(f"Replaying {len(replay.entries)} recorded requests from {path} (speed {speed or 'unlimited'})")
+    return replay
+
+def summarize(path: str):
+    from notebook_client import rpc_labels
+    entries = load_cassette(path)
+    rows = defaultdict(list)
+    for entry in entries:
+        rpc, _ = rpc_labels(entry["url"])
+        rows[(entry["method"], rpc)].append(entry)
+    span = max((e["offset_s"] + e["elapsed_ms"] / 1000 for e in entries), default=0)
+    print(f"{path}: {len(entries)} requests over {span:.1f}s")
+    print(f"{'method':<6} {'rpc':<28} {'count':>6} {'total':>10} {'mean':>9} {'max':>9} {'resp KB':>8}")
+    for (method, rpc), items in sorted(rows.items(), key=lambda kv: -sum(e["elapsed_ms"] for e in kv[1])):
+        times = [e["elapsed_ms"] for e in items]
+        size = sum(len(e["response"]) for e in items) / 1024
+        print(f"{method:<6} {rpc:<28} {len(items):>6} {sum(times):>8.0f}ms {sum(times) / len(times):>7.0f}ms "
+              f"{max(times):>7.0f}ms {size:>8.1f}")
+
+async def _roundtrip_calls(client) -> List[Any]:
+    notebooks = await client.notebooks.list()
+    notebook_id = notebooks[0].id
+    return [
+        notebooks,
+        await client.sources.list(notebook_id),
+        await client.notebooks.get_description(notebook_id),
+        await client.chat.ask(notebook_id, "What are the main topics?"),
+        await client.artifacts.list(notebook_id),
+    ]
+
+async def roundtrip_check(path: str) -> bool:
+    """Record calls through PlaywrightHttpClient against fake_notebooklm, then replay them via the manager"""
+    from fake_notebooklm import FakeConfig, FakeNotebookLM, HttpxRequestContext, StandInClient
+    from notebook_client import manager, PlaywrightHttpClient
+
+    csrf, session_id = "check-csrf-0123456789", "check-session-0123456789"
+    fake = FakeNotebookLM(FakeConfig(latency_scale=0.05, notebooks=2, sources_per_notebook=3, seed=7))
+    context = HttpxRequestContext(fake.start())
+    recorder = CassetteRecorder(path, secrets=lambda: [csrf, session_id])
+    try:
+        recorded = await _roundtrip_calls(StandInClient(PlaywrightHttpClient(context, recorder=recorder),
+                                                        csrf_token=csrf, session_id=session_id))
+    finally:
+        await context.dispose()
+        fake.stop()
+    while recorder.recorded < recorder._seq:
+        await asyncio.sleep(0.01)
+
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    leaked = [s for s in (csrf, session_id) if s in text]
+
+    manager.replay = ReplayRequestContext(path, speed=0)
+    if not await manager._connect_replay():
+        print(f"Replay connect failed: {manager.connect_error}")
+        return False
+    replayed = await _roundtrip_calls(manager.client)
+
+    ok = replayed == recorded and not leaked and manager.replay.stats["missing"] == 0
+    print(f"Recorded {recorder.recorded} requests to {path}; replay {manager.replay.stats}; "
+          f"secrets leaked: {leaked or 'none'}; results {'match' if replayed == recorded else 'DIFFER'}")
+    return ok
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print(__doc__)
+        sys.exit(1)
+    if sys.argv[1] == "--check":
+        import tempfile
+        target = os.path.join(tempfile.mkdtemp(), "roundtrip.jsonl")
+        sys.exit(0 if asyncio.run(roundtrip_check(target)) else 1)
+    summarize(sys.argv[1])
@@ -0,0 +1,114 @@
+import asyncio
+import time
+from tracing import tracer
+from typing import Awaitable, Callable, Dict, Any, Optional
+
+# Artifact type -> (first poll interval, max poll interval) in seconds.
+# Audio/video take many minutes, so they start slower and back off further.
+POLL_SCHEDULES = {
+    "audio": (10.0, 30.0),
+    "video": (15.0, 45.0),
+    "slide_deck": (5.0, 20.0),
+    "report": (3.0, 15.0),
+    "quiz": (3.0, 15.0),
+    "flashcards": (3.0, 15.0),
+}
+DEFAULT_POLL_SCHEDULE = (5.0, 20.0)
+
+# Successful listings in a row without the task before it counts as gone (deleted remotely or a bad id)
+MAX_MISSING_TICKS = 3
+
+def poll_interval(kind: str, elapsed: float) -> float:
+    """Interval grows with elapsed time: initial + 10% of elapsed, capped per type"""
+    initial, maximum = POLL_SCHEDULES.get(kind, DEFAULT_POLL_SCHEDULE)
+    return min(maximum, initial + elapsed * 0.1)
+
+class CompletionWatcher:
+    """Waits for remote generation tasks with one polling loop per notebook.
+
+    Every tick lists the notebook's artifacts once and resolves all waiters
+    whose artifact completed or failed, instead of each generation polling
+    on its own schedule.
+    """
+
+    def __init__(self, fetch_statuses: Callable[[str], Awaitable[Dict[str, str]]]):
+        # notebook_id -> {artifact_id: status string}
+        self.fetch_statuses = fetch_statuses
+        # notebook_id -> task_id -> {"future", "kind", "started", "deadline", "missing"}
+        self.pending: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._loops: Dict[str, asyncio.Task] = {}
+        self.stats: Dict[str, Any] = {"ticks": 0, "fetch_errors": 0, "completed": 0, "failed": 0, "not_found": 0, "timed_out": 0}
+
+    async def wait(self, notebook_id: str, task_id: str, kind: str, timeout: float = 900.0) -> str:
+        """Wait until task_id completes; raises on failure or timeout"""
+        waiters = self.pending.setdefault(notebook_id, {})
+        entry = waiters.get(task_id)
+        if entry is None:
+            now = time.time()
+            entry = {
+                "future": asyncio.get_running_loop().create_future(),
+                "kind": kind,
+                "started": now,
+                "deadline": now + timeout,
+                "missing": 0,
+            }
+            waiters[task_id] = entry
+        else:
+            entry["deadline"] = max(entry["deadline"], time.time() + timeout)
+
+        loop_task = self._loops.get(notebook_id)
+        if loop_task is None or loop_task.done():
+            self._loops[notebook_id] = asyncio.create_task(self._run(notebook_id))
+        with tracer.span("generation.wait", type=kind, task_id=task_id):
+            return await asyncio.shield(entry["future"])
+
+    def _next_delay(self, waiters: Dict[str, Dict[str, Any]]) -> float:
+        now = time.time()
+        return min(poll_interval(e["kind"], now - e["started"]) for e in waiters.values())
+
+    async def _run(self, notebook_id: str):
+        waiters = self.pending[notebook_id]
+        try:
+            while waiters:
+                await asyncio.sleep(self._next_delay(waiters))
+                await self._tick(notebook_id, waiters)
+        finally:
+            self.pending.pop(notebook_id, None)
+            self._loops.pop(notebook_id, None)
+
+    async def _tick(self, notebook_id: str, waiters: Dict[str, Dict[str, Any]]):
+        self.stats["ticks"] += 1
+        statuses: Optional[Dict[str, str]] = None
+        try:
+            statuses = await self.fetch_statuses(notebook_id)
+        except Exception as e:
+            # Keep waiting; the next tick retries and deadlines still apply
+            self.stats["fetch_errors"] += 1
+            print(f"Completion poll failed for notebook {notebook_id}: {e}")
+
+        now = time.time()
+        for task_id, entry in list(waiters.items()):
+            future = entry["future"]
+            status = statuses.get(task_id) if statuses is not None else None
+            if statuses is not None:
+                entry["missing"] = 0 if task_id in statuses else entry["missing"] + 1
+            if status == "completed":
+                self.stats["completed"] += 1
+                future.set_result(status)
+            elif status == "failed":
+                self.stats["failed"] += 1
+                future.set_exception(Exception(f"Generation {task_id} failed"))
+            elif entry["missing"] >= MAX_MISSING_TICKS:
+                self.stats["not_found"] += 1
+                status = "not found"
+                future.set_exception(Exception(f"Generation {task_id} not found in the notebook's artifacts"))
+            elif now > entry["deadline"]:
+                self.stats["timed_out"] += 1
+                future.set_exception(TimeoutError(f"Generation {task_id} did not complete in time (last status: {status})"))
+            else:
+                continue
+            print(f"Generation {task_id} ({entry['kind']}) finished as {status} after {now - entry['started']:.0f}s")
+            del waiters[task_id]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "pending": sum(len(w) for w in self.pending.values())}
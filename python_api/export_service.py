@@ -0,0 +1,308 @@
+import asyncio
+import hashlib
+import json
+import os
+import re
+import shutil
+import time
+import uuid
+import zipfile
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Any, Tuple
+from docx import Document
+from docx.shared import Pt
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+from artifact_pipeline import normalize_payload
+from file_io import run_io
+from tracing import tracer
+
+class ExportQueueFull(Exception):
+    pass
+
+def _load_json(content: str, kind: str) -> Any:
+    try:
+        return json.loads(content)
+    except json.JSONDecodeError:
+        raise Exception(f"Invalid {kind} content format")
+
+def _add_title(doc, text: str):
+    title_para = doc.add_paragraph()
+    run = title_para.add_run(text)
+    run.bold = True
+    run.font.size = Pt(16)
+    title_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    doc.add_paragraph() # Spacer
+
+def _save(doc, output_path: str) -> str:
+    # Write to a temp name first so a cached output is never half-written
+    tmp = f"{output_path}.{uuid.uuid4().hex}.tmp"
+    doc.save(tmp)
+    os.replace(tmp, output_path)
+    return os.path.abspath(output_path)
+
+def render_quiz_docx(quiz_content: str, output_path: str) -> str:
+    """Render quiz JSON content to a Word document (runs in a worker)"""
+    quiz_data = _load_json(quiz_content, "quiz")
+
+    doc = Document()
+    _add_title(doc, quiz_data.get("title", "Quiz"))
+
+    # Questions
+    questions = quiz_data.get("questions", [])
+    for i, q in enumerate(questions):
+        # Question Text
+        q_para = doc.add_paragraph(f"{i+1}. {q.get('question') or q.get('text', '')}")
+        q_para.runs[0].bold = True
+
+        # Options
+        options = q.get("answerOptions") or q.get("options") or []
+        for opt in options:
+            opt_text = opt.get("text") or opt.get("option", "")
+
+            # Checkbox style; answers are revealed in the key at the end
+            o_para = doc.add_paragraph(f"[ ] {opt_text}")
+            o_para.paragraph_format.left_indent = Pt(20)
+
+        doc.add_paragraph() # Spacer between questions
+
+    # Answer Key Section (New Page)
+    doc.add_page_break()
+    key_header = doc.add_paragraph("Answer Key")
+    key_header.runs[0].bold = True
+    key_header.runs[0].font.size = Pt(14)
+
+    for i, q in enumerate(questions):
+        options = q.get("answerOptions") or q.get("options") or []
+        correct_opt = next((opt for opt in options if opt.get("isCorrect")), None)
+
+        if correct_opt:
+            correct_text = correct_opt.get("text") or correct_opt.get("option", "")
+            rationale = correct_opt.get("rationale", "")
+
+            p = doc.add_paragraph()
+            p.add_run(f"{i+1}. {correct_text}").bold = True
+            if rationale:
+                p.add_run(f"\nRationale: {rationale}").italic = True
+
+        doc.add_paragraph()
+
+    return _save(doc, output_path)
+
+def render_flashcards_docx(content: str, output_path: str) -> str:
+    """Render flashcard JSON as numbered front/back pairs"""
+    cards = normalize_payload("flashcards", _load_json(content, "flashcards"))
+    doc = Document()
+    _add_title(doc, cards["title"] or "Flashcards")
+    for i, card in enumerate(cards["cards"]):
+        front = doc.add_paragraph(f"{i+1}. {card['front']}")
+        front.runs[0].bold = True
+        back = doc.add_paragraph(card["back"])
+        back.paragraph_format.left_indent = Pt(20)
+    return _save(doc, output_path)
+
+def render_mindmap_docx(content: str, output_path: str) -> str:
+    """Render a mind map as an indented outline"""
+    root = normalize_payload("mindmap", _load_json(content, "mind map"))
+    if not isinstance(root, dict):
+        raise Exception("Invalid mind map content format")
+
+    def label(node: Dict[str, Any]) -> str:
+        return node.get("name") or node.get("topic") or ""
+
+    doc = Document()
+    _add_title(doc, label(root) or "Mind Map")
+    stack = [(child, 0) for child in reversed(root.get("children") or [])]
+    while stack:
+        node, depth = stack.pop()
+        para = doc.add_paragraph(f"\u2022 {label(node)}")
+        para.paragraph_format.left_indent = Pt(20 * depth)
+        if depth == 0:
+            para.runs[0].bold = True
+        stack.extend((child, depth + 1) for child in reversed(node.get("children") or []))
+    return _save(doc, output_path)
+
+_BOLD_RE = re.compile(r"\*\*(.+?)\*\*")
+
+def _add_markdown_runs(para, text: str):
+    # **bold** spans become bold runs; other inline markup is kept as text
+    for i, part in enumerate(_BOLD_RE.split(text)):
+        if part:
+            para.add_run(part).bold = i % 2 == 1
+
+def render_markdown_docx(content: str, output_path: str) -> str:
+    """Render a markdown report (study guide, briefing) with headings and lists"""
+    doc = Document()
+    for line in content.splitlines():
+        stripped = line.strip()
+        if not stripped:
+            continue
+        heading = re.match(r"(#{1,6})\s+(.*)", stripped)
+        bullet = re.match(r"[-*+]\s+(.*)", stripped)
+        numbered = re.match(r"\d+[.)]\s+(.*)", stripped)
+        if heading:
+            doc.add_heading(heading.group(2).strip("# "), level=min(len(heading.group(1)), 4))
+        elif bullet:
+            _add_markdown_runs(doc.add_paragraph(style="List Bullet"), bullet.group(1))
+        elif numbered:
+            _add_markdown_runs(doc.add_paragraph(style="List Number"), numbered.group(1))
+        else:
+            _add_markdown_runs(doc.add_paragraph(), stripped)
+    return _save(doc, output_path)
+
+def _write_zip(zip_path: str, members: List[tuple]) -> str:
+    tmp = f"{zip_path}.{uuid.uuid4().hex}.tmp"
+    with zipfile.ZipFile(tmp, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for src, arcname in members:
+            zf.write(src, arcname)
+    os.replace(tmp, zip_path)
+    return os.path.abspath(zip_path)
+
+# (format, artifact type) -> renderer(content, output_path)
+RENDERERS = {
+    ("docx", "quiz"): render_quiz_docx,
+    ("docx", "flashcards"): render_flashcards_docx,
+    ("docx", "mindmap"): render_mindmap_docx,
+    ("docx", "study_guide"): render_markdown_docx,
+    ("docx", "report"): render_markdown_docx,
+}
+
+def can_render(type: str, format: str = "docx") -> bool:
+    return (format, type) in RENDERERS
+
+class ExportService:
+    """Renders exports off the event loop with a bounded queue and a content-addressed output cache"""
+
+    def __init__(self, cache_dir: str = "artifacts/exports", max_workers: int = None, max_queue: int = 8, pool: str = None):
+        self.cache_dir = Path(cache_dir)
+        self.max_workers = max_workers or int(os.environ.get("NOTEBOOKLM_EXPORT_WORKERS", "2"))
+        self.max_queue = max_queue
+        # Threads by default: process pools need freeze_support() handling in the packaged app
+        self.pool = pool or os.environ.get("NOTEBOOKLM_EXPORT_POOL", "thread")
+        self._executor: Optional[Executor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.pending = 0
+        # (content hash, artifact type, format) -> render in progress, shared by identical requests
+        self._inflight: Dict[Tuple[str, str, str], asyncio.Task] = {}
+        self.stats: Dict[str, Any] = {
+            "rendered": 0,
+            "cache_hits": 0,
+            "coalesced": 0,
+            "rejected": 0,
+            "batches": 0,
+            "render_s_total": 0.0,
+            "loop_stall_max_ms": 0.0,
+            "loop_stall_total_ms": 0.0,
+        }
+        self._stall_task: Optional[asyncio.Task] = None
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.pool == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="export")
+        return self._executor
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_workers)
+        return self._slots
+
+    async def _watch_loop_stall(self, interval: float = 0.02):
+        # Samples how late the event loop wakes up while exports are running
+        loop = asyncio.get_running_loop()
+        while self.pending:
+            start = loop.time()
+            await asyncio.sleep(interval)
+            stall_ms = max(0.0, (loop.time() - start - interval) * 1000)
+            self.stats["loop_stall_total_ms"] = round(self.stats["loop_stall_total_ms"] + stall_ms, 2)
+            self.stats["loop_stall_max_ms"] = round(max(self.stats["loop_stall_max_ms"], stall_ms), 2)
+
+    @staticmethod
+    def content_hash(content: str) -> str:
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    async def render(self, content: str, format: str = "docx", content_hash: Optional[str] = None, type: str = "quiz") -> str:
+        """Render an artifact of the given type to format, reusing a cached output for identical content"""
+        if not can_render(type, format):
+            raise Exception(f"Unsupported export: {type} as {format}")
+        content_hash = content_hash or self.content_hash(content)
+        cached = self.cache_dir / f"{content_hash[:16]}-{type}.{format}"
+        if await run_io(cached.exists):
+            self.stats["cache_hits"] += 1
+            return str(cached.absolute())
+
+        key = (content_hash, type, format)
+        task = self._inflight.get(key)
+        if task is not None:
+            self.stats["coalesced"] += 1
+        else:
+            if self.pending >= self.max_queue:
+                self.stats["rejected"] += 1
+                raise ExportQueueFull(f"Export queue is full ({self.max_queue} pending)")
+            self.pending += 1
+            task = asyncio.create_task(self._render(content, format, type, cached))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._finish(key))
+        # Shielded so one caller giving up doesn't cancel the render for the others
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Tuple[str, str, str]):
+        self._inflight.pop(key, None)
+        self.pending -= 1
+
+    async def _render(self, content: str, format: str, type: str, cached: Path) -> str:
+        if self._stall_task is None or self._stall_task.done():
+            self._stall_task = asyncio.create_task(self._watch_loop_stall())
+        async with self._get_slots():
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            start = time.perf_counter()
+            loop = asyncio.get_running_loop()
+            with tracer.span("export.render", format=format, pool=self.pool):
+                path = await loop.run_in_executor(self._get_executor(), RENDERERS[(format, type)], content, str(cached))
+            self.stats["rendered"] += 1
+            self.stats["render_s_total"] = round(self.stats["render_s_total"] + time.perf_counter() - start, 3)
+            return path
+
+    async def export(self, content: str, output_path: str, format: str = "docx", content_hash: Optional[str] = None) -> str:
+        """Render (or reuse) an export and copy it to output_path"""
+        rendered = await self.render(content, format, content_hash)
+        await run_io(shutil.copyfile, rendered, output_path)
+        return os.path.abspath(output_path)
+
+    async def export_batch(self, items: List[Dict[str, Any]], zip_path: str, format: str = "docx") -> Dict[str, Any]:
+        """Export several artifacts into one zip.
+
+        items: [{"title", "type", "content", "hash"}]. Renders run concurrently through the
+        same bounded pool; items that fail are reported instead of failing the batch.
+        """
+        self.stats["batches"] += 1
+        results = await asyncio.gather(
+            *(self.render(item["content"], format, item.get("hash"), item.get("type", "quiz")) for item in items),
+            return_exceptions=True
+        )
+
+        members, errors, used = [], [], set()
+        for item, result in zip(items, results):
+            if isinstance(result, Exception):
+                errors.append({"title": item["title"], "error": str(result)})
+                continue
+            name = f"{item['title']}.{format}"
+            n = 2
+            while name in used:
+                name = f"{item['title']} ({n}).{format}"
+                n += 1
+            used.add(name)
+            members.append((result, name))
+
+        if not members:
+            raise Exception("No artifacts could be exported")
+        path = await asyncio.get_running_loop().run_in_executor(self._get_executor(), _write_zip, zip_path, members)
+        return {"path": path, "exported": len(members), "errors": errors}
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"pool": self.pool, "workers": self.max_workers, "pending": self.pending, **self.stats}
+
+# Global instance
+export_service = ExportService()
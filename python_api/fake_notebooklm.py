@@ -0,0 +1,573 @@
+"""Local stand-in for the NotebookLM RPC and download endpoints, for benchmarks.
+
+FakeNotebookLM serves batchexecute-style responses (")]}'" envelope with
+"wrb.fr" chunks) from in-memory notebooks, sources and artifacts, with
+configurable latency, payload sizes and failure rates.
+
+StandInClient mirrors the parts of the notebooklm client API that
+NotebookManager uses. It encodes every call as a batchexecute request and sends
+it through the injected PlaywrightHttpClient, so the backend's HTTP client,
+metrics and tracing run as they would against Google. HttpxRequestContext
+plays the browser's APIRequestContext and points requests at the fake server.
+"""
+import asyncio
+import json
+import random
+import socket
+import string
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from enum import Enum
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, quote, urlsplit
+
+import httpx
+
+ORIGIN = "https://notebooklm.google.com"
+MEDIA_ORIGIN = "https://lh3.googleusercontent.com"
+BATCHEXECUTE_PATH = "/_/LabsTailwindUi/data/batchexecute"
+CHAT_PATH = "/_/LabsTailwindUi/data/google.internal.labs.tailwind.orchestration.v1.LabsTailwindOrchestrationService/GenerateFreeFormStreamed"
+
+# RPC ids as sent by the notebooklm library
+RPC_IDS = {
+    "list_notebooks": "wXbhsf",
+    "create_notebook": "CCqFvf",
+    "get_notebook": "rLM1Ne",
+    "rename_notebook": "s0tc2d",
+    "delete_notebook": "WWINqb",
+    "add_source": "izAoDd",
+    "delete_source": "tGMBJ",
+    "get_source": "hizoJc",
+    "get_source_guide": "tr032e",
+    "summarize": "VfAZjd",
+    "create_artifact": "R7cb6c",
+    "list_artifacts": "gArtLc",
+    "generate_mind_map": "yyryJe",
+}
+RPC_NAMES = {v: k for k, v in RPC_IDS.items()}
+
+# Typical upstream latencies in ms (before FakeConfig.latency_scale)
+DEFAULT_LATENCY_MS = {
+    "list_notebooks": 250,
+    "get_notebook": 400,
+    "add_source": 900,
+    "get_source": 300,
+    "get_source_guide": 600,
+    "summarize": 700,
+    "create_artifact": 500,
+    "list_artifacts": 300,
+    "generate_mind_map": 2500,
+    "chat": 2000,
+    "download": 150,
+}
+
+@dataclass
+class FakeConfig:
+    latency_ms: Dict[str, float] = field(default_factory=lambda: dict(DEFAULT_LATENCY_MS))
+    latency_scale: float = 1.0
+    # Uniform jitter around each latency, as a fraction (0.5 -> 50%..150%)
+    jitter: float = 0.5
+    failure_rate: float = 0.0  # HTTP 500
+    rate_limit_rate: float = 0.0  # HTTP 429
+    notebooks: int = 10
+    sources_per_notebook: int = 20
+    source_chars: int = 20000
+    answer_chars: int = 400
+    quiz_questions: int = 10
+    media_kb: int = 512
+    generation_seconds: float = 2.0
+    generation_failure_rate: float = 0.0
+    seed: Optional[int] = None
+
+def _envelope(rpc_id: str, result: Any, error: Optional[str] = None) -> str:
+    if error is None:
+        item = ["wrb.fr", rpc_id, json.dumps(result, ensure_ascii=False), None, None, None, "generic"]
+    else:
+        item = ["er", rpc_id, error]
+    chunk = json.dumps([item], ensure_ascii=False)
+    tail = json.dumps([["di", 42], ["af.httprm", 42, "-1", 7]])
+    return f")]}}'\n\n{len(chunk)}\n{chunk}\n{len(tail)}\n{tail}\n"
+
+def decode_envelope(text: str, rpc_id: str) -> Any:
+    """Result of rpc_id from a batchexecute response body"""
+    lines = text.split("\n")
+    for line in lines[1:]:
+        if not line.startswith("["):
+            continue
+        for item in json.loads(line):
+            if item and item[0] == "wrb.fr" and item[1] == rpc_id:
+                return json.loads(item[2]) if item[2] else None
+            if item and item[0] == "er":
+                raise Exception(f"RPC {rpc_id} returned an error: {item}")
+    raise Exception(f"RPC {rpc_id} missing from response")
+
+class FakeNotebookLM:
+    """In-memory NotebookLM served over HTTP from a background thread"""
+
+    def __init__(self, config: Optional[FakeConfig] = None):
+        self.config = config or FakeConfig()
+        self.random = random.Random(self.config.seed)
+        self.notebooks: Dict[str, Dict[str, Any]] = {}
+        self.requests = 0
+        self.failures = 0
+        self.port: Optional[int] = None
+        self._server = None
+        self._thread: Optional[threading.Thread] = None
+        for i in range(self.config.notebooks):
+            nb = self._new_notebook(f"Benchmark notebook {i + 1}")
+            for j in range(self.config.sources_per_notebook):
+                self._new_source(nb, f"Source {j + 1}", self._text(self.config.source_chars))
+
+    # --- state ---
+
+    def _id(self, n: int = 12) -> str:
+        return "".join(self.random.choices(string.ascii_lowercase + string.digits, k=n))
+
+    def _text(self, chars: int) -> str:
+        words = ["notebook", "source", "summary", "analysis", "topic", "evidence", "method", "result", "研究", "資料"]
+        out, size = [], 0
+        while size < chars:
+            w = self.random.choice(words)
+            out.append(w)
+            size += len(w) + 1
+        return " ".join(out)[:chars]
+
+    def _new_notebook(self, title: str) -> Dict[str, Any]:
+        nb = {"id": self._id(), "title": title, "sources": {}, "artifacts": {}}
+        self.notebooks[nb["id"]] = nb
+        return nb
+
+    def _new_source(self, nb: Dict[str, Any], title: str, content: str) -> Dict[str, Any]:
+        src = {"id": self._id(), "title": title, "content": content, "created": time.time()}
+        nb["sources"][src["id"]] = src
+        return src
+
+    def _artifact_status(self, artifact: Dict[str, Any]) -> str:
+        if time.time() < artifact["ready_at"]:
+            return "in_progress"
+        return "failed" if artifact["fails"] else "completed"
+
+    def _artifact_row(self, a: Dict[str, Any]) -> List[Any]:
+        return [a["id"], a["title"], a["kind"], a["created"], self._artifact_status(a), a["etag"]]
+
+    def _source_row(self, s: Dict[str, Any]) -> List[Any]:
+        return [[s["id"]], s["title"], [None, len(s["content"]), [int(s["created"])], None, 4], [2]]
+
+    # --- RPC handlers: params -> result ---
+
+    def _notebook(self, nb_id: str) -> Dict[str, Any]:
+        nb = self.notebooks.get(nb_id)
+        if nb is None:
+            raise KeyError(f"notebook {nb_id} not found")
+        return nb
+
+    def handle_rpc(self, name: str, params: List[Any]) -> Any:
+        if name == "list_notebooks":
+            return [[[nb["title"], [self._source_row(s) for s in nb["sources"].values()], nb["id"]] for nb in self.notebooks.values()]]
+        if name == "create_notebook":
+            nb = self._new_notebook(params[0])
+            return [nb["title"], [], nb["id"]]
+        if name == "get_notebook":
+            nb = self._notebook(params[0])
+            return [[nb["title"], [self._source_row(s) for s in nb["sources"].values()], nb["id"]]]
+        if name == "rename_notebook":
+            self._notebook(params[0])["title"] = params[1]
+            return []
+        if name == "delete_notebook":
+            self.notebooks.pop(params[0], None)
+            return []
+        if name == "add_source":
+            nb = self._notebook(params[0])
+            src = self._new_source(nb, params[1], params[2])
+            return [[self._source_row(src)]]
+        if name == "delete_source":
+            self._notebook(params[0])["sources"].pop(params[1], None)
+            return []
+        if name == "get_source":
+            src = self._notebook(params[0])["sources"][params[1]]
+            return [[src["id"], src["title"], None, src["content"]]]
+        if name == "get_source_guide":
+            src = self._notebook(params[0])["sources"][params[1]]
+            return [[[None, [self._text(600)]], [src["title"].split()]]]
+        if name == "summarize":
+            nb = self._notebook(params[0])
+            questions = [[f"What does {s['title']} conclude?", f"Summarize {s['title']}"] for s in list(nb["sources"].values())[:3]]
+            return [[self._text(500)], [questions]]
+        if name == "create_artifact":
+            nb = self._notebook(params[0])
+            kind = params[1]
+            artifact = {
+                "id": self._id(),
+                "kind": kind,
+                "title": kind.replace("_", " ").title(),
+                "created": time.time(),
+                "ready_at": time.time() + self.config.generation_seconds,
+                "fails": self.random.random() < self.config.generation_failure_rate,
+                "etag": self._id(8),
+            }
+            nb["artifacts"][artifact["id"]] = artifact
+            return [self._artifact_row(artifact)]
+        if name == "list_artifacts":
+            nb = self._notebook(params[0])
+            return [[self._artifact_row(a) for a in nb["artifacts"].values()]]
+        if name == "generate_mind_map":
+            nb = self._notebook(params[0])
+            root = {"name": nb["title"], "children": [{"name": s["title"]} for s in nb["sources"].values()]}
+            return [[json.dumps(root, ensure_ascii=False)]]
+        raise KeyError(f"unsupported rpc {name}")
+
+    def media(self, artifact_id: str) -> Tuple[bytes, str]:
+        for nb in self.notebooks.values():
+            artifact = nb["artifacts"].get(artifact_id)
+            if artifact is None:
+                continue
+            kind = artifact["kind"]
+            if kind in ("quiz", "flashcards"):
+                if kind == "quiz":
+                    payload = {"title": "Quiz", "questions": [
+                        {"question": self._text(80), "hint": self._text(40), "answerOptions": [
+                            {"text": self._text(30), "isCorrect": k == 0, "rationale": self._text(60)} for k in range(4)
+                        ]} for _ in range(self.config.quiz_questions)
+                    ]}
+                else:
+                    payload = {"title": "Flashcards", "cards": [
+                        {"front": self._text(60), "back": self._text(120)} for _ in range(self.config.quiz_questions)
+                    ]}
+                return json.dumps(payload, ensure_ascii=False).encode("utf-8"), "application/json"
+            if kind == "report":
+                return ("# Study guide\n\n" + self._text(4000)).encode("utf-8"), "text/markdown"
+            return self.random.randbytes(self.config.media_kb * 1024), "application/octet-stream"
+        raise KeyError(f"artifact {artifact_id} not found")
+
+    # --- HTTP ---
+
+    async def _delay(self, name: str):
+        base = self.config.latency_ms.get(name, 200) * self.config.latency_scale
+        jitter = self.config.jitter
+        await asyncio.sleep(base * self.random.uniform(1 - jitter, 1 + jitter) / 1000)
+
+    def _injected_failure(self) -> Optional[int]:
+        roll = self.random.random()
+        if roll < self.config.failure_rate:
+            return 500
+        if roll < self.config.failure_rate + self.config.rate_limit_rate:
+            return 429
+        return None
+
+    def build_app(self):
+        from fastapi import FastAPI, Request
+        from fastapi.responses import Response, PlainTextResponse
+
+        app = FastAPI()
+
+        @app.post(BATCHEXECUTE_PATH)
+        async def batchexecute(request: Request):
+            self.requests += 1
+            rpc_id = request.query_params.get("rpcids", "")
+            name = RPC_NAMES.get(rpc_id, rpc_id)
+            await self._delay(name)
+            status = self._injected_failure()
+            if status:
+                self.failures += 1
+                return PlainTextResponse("injected failure", status_code=status)
+            form = parse_qs((await request.body()).decode("utf-8"))
+            params = json.loads(json.loads(form["f.req"][0])[0][0][1])
+            try:
+                result = self.handle_rpc(name, params)
+            except KeyError as e:
+                return PlainTextResponse(_envelope(rpc_id, None, error=str(e)))
+            return PlainTextResponse(_envelope(rpc_id, result))
+
+        @app.post(CHAT_PATH)
+        async def chat(request: Request):
+            self.requests += 1
+            await self._delay("chat")
+            status = self._injected_failure()
+            if status:
+                self.failures += 1
+                return PlainTextResponse("injected failure", status_code=status)
+            form = parse_qs((await request.body()).decode("utf-8"))
+            notebook_id = json.loads(form["f.req"][0])[0]
+            sources = list(self._notebook(notebook_id)["sources"].values())[:3]
+            answer = self._text(self.config.answer_chars)
+            citations = [[s["id"], self._text(50)] for s in sources]
+            return PlainTextResponse(_envelope("chat", [[answer, None, citations]]))
+
+        @app.get("/media/{artifact_id}")
+        async def media(artifact_id: str):
+            self.requests += 1
+            await self._delay("download")
+            try:
+                body, media_type = self.media(artifact_id)
+            except KeyError:
+                return PlainTextResponse("not found", status_code=404)
+            return Response(body, media_type=media_type)
+
+        return app
+
+    def start(self) -> str:
+        """Serve on a free localhost port from a background thread; returns the base URL"""
+        import uvicorn
+
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            self.port = sock.getsockname()[1]
+        config = uvicorn.Config(self.build_app(), host="127.0.0.1", port=self.port, log_level="warning", access_log=False)
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(target=self._server.run, name="fake-notebooklm", daemon=True)
+        self._thread.start()
+        deadline = time.time() + 10
+        while not self._server.started:
+            if time.time() > deadline:
+                raise RuntimeError("Fake NotebookLM server did not start")
+            time.sleep(0.02)
+        return self.base_url
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def stop(self):
+        if self._server:
+            self._server.should_exit = True
+            self._thread.join(timeout=5)
+
+class HttpxResponse:
+    """Playwright APIResponse look-alike"""
+
+    def __init__(self, response: httpx.Response):
+        self._response = response
+
+    @property
+    def status(self) -> int:
+        return self._response.status_code
+
+    @property
+    def url(self) -> str:
+        return str(self._response.url)
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return dict(self._response.headers)
+
+    async def text(self) -> str:
+        return self._response.text
+
+    async def body(self) -> bytes:
+        return self._response.content
+
+class HttpxRequestContext:
+    """Playwright APIRequestContext look-alike that sends Google-bound requests to base_url"""
+
+    def __init__(self, base_url: str, max_connections: int = 64):
+        self.base_url = base_url.rstrip("/")
+        self.client = httpx.AsyncClient(limits=httpx.Limits(max_connections=max_connections))
+
+    def _rewrite(self, url: str) -> str:
+        parts = urlsplit(url)
+        path = parts.path
+        if url.startswith(MEDIA_ORIGIN):
+            path = "/media" + path[len("/notebooklm"):]
+        return f"{self.base_url}{path}" + (f"?{parts.query}" if parts.query else "")
+
+    async def post(self, url, data=None, headers=None, timeout=0):
+        response = await self.client.post(self._rewrite(url), content=data, headers=headers,
+                                          timeout=(timeout / 1000) if timeout else None)
+        return HttpxResponse(response)
+
+    async def get(self, url, headers=None, timeout=0):
+        response = await self.client.get(self._rewrite(url), headers=headers,
+                                         timeout=(timeout / 1000) if timeout else None)
+        return HttpxResponse(response)
+
+    async def dispose(self):
+        await self.client.aclose()
+
+# --- client side ---
+
+class SourceKind(Enum):
+    PASTED_TEXT = "pasted_text"
+
+class ArtifactKind(str, Enum):
+    AUDIO = "audio"
+    VIDEO = "video"
+    REPORT = "report"
+    QUIZ = "quiz"
+    FLASHCARDS = "flashcards"
+    MIND_MAP = "mind_map"
+    SLIDE_DECK = "slide_deck"
+
+_STATUS_CODES = {"in_progress": 1, "completed": 3, "failed": 4}
+
+def _artifact(row: List[Any]) -> SimpleNamespace:
+    artifact_id, title, kind, created, status, etag = row
+    return SimpleNamespace(
+        id=artifact_id, title=title, kind=ArtifactKind(kind), status=_STATUS_CODES[status], status_str=status,
+        is_completed=status == "completed", etag=etag,
+        created_at=datetime.fromtimestamp(created, timezone.utc), last_modified_at=None,
+    )
+
+def _source(row: List[Any]) -> SimpleNamespace:
+    return SimpleNamespace(id=row[0][0], title=row[1], url=None, status="ready", kind=SourceKind.PASTED_TEXT)
+
+class _Api:
+    def __init__(self, client: "StandInClient"):
+        self.client = client
+
+    async def _rpc(self, name: str, params: List[Any], notebook_id: Optional[str] = None) -> Any:
+        return await self.client.rpc(name, params, notebook_id)
+
+class _Notebooks(_Api):
+    async def list(self):
+        result = await self._rpc("list_notebooks", [None, 1])
+        return [SimpleNamespace(id=row[2], title=row[0]) for row in result[0]]
+
+    async def create(self, title: str):
+        row = await self._rpc("create_notebook", [title])
+        return SimpleNamespace(id=row[2], title=row[0])
+
+    async def rename(self, notebook_id: str, title: str):
+        await self._rpc("rename_notebook", [notebook_id, title], notebook_id)
+
+    async def delete(self, notebook_id: str):
+        await self._rpc("delete_notebook", [notebook_id])
+
+    async def get_description(self, notebook_id: str):
+        result = await self._rpc("summarize", [notebook_id], notebook_id)
+        topics = [SimpleNamespace(question=q, prompt=p) for q, p in result[1][0]]
+        return SimpleNamespace(summary=result[0][0], suggested_topics=topics)
+
+class _Sources(_Api):
+    async def list(self, notebook_id: str):
+        result = await self._rpc("get_notebook", [notebook_id], notebook_id)
+        return [_source(row) for row in result[0][1]]
+
+    async def add_text(self, notebook_id: str, title: str, content: str):
+        result = await self._rpc("add_source", [notebook_id, title, content], notebook_id)
+        return _source(result[0][0])
+
+    async def add_url(self, notebook_id: str, url: str):
+        return await self.add_text(notebook_id, url, url)
+
+    async def delete(self, notebook_id: str, source_id: str):
+        await self._rpc("delete_source", [notebook_id, source_id], notebook_id)
+
+    async def get_fulltext(self, notebook_id: str, source_id: str):
+        row = (await self._rpc("get_source", [notebook_id, source_id], notebook_id))[0]
+        return SimpleNamespace(content=row[3], title=row[1], url=row[2], char_count=len(row[3]))
+
+    async def get_guide(self, notebook_id: str, source_id: str):
+        result = await self._rpc("get_source_guide", [notebook_id, source_id], notebook_id)
+        return {"summary": result[0][0][1][0], "keywords": result[0][1][0]}
+
+class _Chat(_Api):
+    async def ask(self, notebook_id: str, question: str, source_ids=None, conversation_id=None):
+        body = "f.req=" + quote(json.dumps([notebook_id, question, source_ids])) + "&at=" + quote(self.client.csrf_token)
+        response = await self.client.http.post(f"{ORIGIN}{CHAT_PATH}?rt=c", content=body, timeout=120.0)
+        response.raise_for_status()
+        answer, _, citations = decode_envelope(response.text, "chat")[0]
+        return SimpleNamespace(
+            answer=answer,
+            citations=[SimpleNamespace(source_id=sid, content=text) for sid, text in citations],
+            conversation_id=None,
+        )
+
+class _Artifacts(_Api):
+    async def _create(self, notebook_id: str, kind: str):
+        row = (await self._rpc("create_artifact", [notebook_id, kind], notebook_id))[0]
+        return SimpleNamespace(task_id=row[0], status=row[4])
+
+    async def generate_audio(self, notebook_id: str, **kwargs):
+        return await self._create(notebook_id, "audio")
+
+    async def generate_video(self, notebook_id: str, **kwargs):
+        return await self._create(notebook_id, "video")
+
+    async def generate_quiz(self, notebook_id: str, **kwargs):
+        return await self._create(notebook_id, "quiz")
+
+    async def generate_flashcards(self, notebook_id: str, **kwargs):
+        return await self._create(notebook_id, "flashcards")
+
+    async def generate_report(self, notebook_id: str, **kwargs):
+        return await self._create(notebook_id, "report")
+
+    async def generate_slide_deck(self, notebook_id: str, **kwargs):
+        return await self._create(notebook_id, "slide_deck")
+
+    async def generate_mind_map(self, notebook_id: str, **kwargs):
+        result = await self._rpc("generate_mind_map", [notebook_id], notebook_id)
+        return {"mind_map": json.loads(result[0][0]), "note_id": None}
+
+    async def list(self, notebook_id: str):
+        result = await self._rpc("list_artifacts", [notebook_id], notebook_id)
+        return [_artifact(row) for row in result[0]]
+
+    async def _latest(self, notebook_id: str, kind: str, artifact_id: Optional[str]) -> str:
+        if artifact_id:
+            return artifact_id
+        done = [a for a in await self.list(notebook_id) if a.kind.value == kind and a.is_completed]
+        if not done:
+            raise Exception(f"No completed {kind} artifact")
+        return max(done, key=lambda a: a.created_at).id
+
+    async def _download(self, notebook_id: str, kind: str, output_path: str, artifact_id: Optional[str]) -> str:
+        artifact_id = await self._latest(notebook_id, kind, artifact_id)
+        # Media comes from the CDN like real downloads, not through the RPC client
+        response = await self.client.http.request.get(f"{MEDIA_ORIGIN}/notebooklm/{artifact_id}", timeout=120000)
+        if response.status != 200:
+            raise Exception(f"Download failed: HTTP {response.status}")
+        data = await response.body()
+        await asyncio.to_thread(Path(output_path).write_bytes, data)
+        return output_path
+
+    async def download_audio(self, notebook_id, output_path, artifact_id=None):
+        return await self._download(notebook_id, "audio", output_path, artifact_id)
+
+    async def download_video(self, notebook_id, output_path, artifact_id=None):
+        return await self._download(notebook_id, "video", output_path, artifact_id)
+
+    async def download_quiz(self, notebook_id, output_path, artifact_id=None, output_format="json"):
+        return await self._download(notebook_id, "quiz", output_path, artifact_id)
+
+    async def download_flashcards(self, notebook_id, output_path, artifact_id=None, output_format="json"):
+        return await self._download(notebook_id, "flashcards", output_path, artifact_id)
+
+    async def download_report(self, notebook_id, output_path, artifact_id=None):
+        return await self._download(notebook_id, "report", output_path, artifact_id)
+
+    async def download_slide_deck(self, notebook_id, output_path, artifact_id=None):
+        return await self._download(notebook_id, "slide_deck", output_path, artifact_id)
+
+    async def download_mind_map(self, notebook_id, output_path, artifact_id=None):
+        raise Exception("Mind maps are not downloadable from the stand-in")
+
+class StandInClient:
+    """The slice of NotebookLMClient that NotebookManager calls, spoken over batchexecute"""
+
+    def __init__(self, http, csrf_token: str = "bench-csrf", session_id: str = "bench-session"):
+        # The injected HTTP client (a PlaywrightHttpClient in benchmarks)
+        self.http = http
+        self.csrf_token = csrf_token
+        self.session_id = session_id
+        self._reqid = 100000
+        self.notebooks = _Notebooks(self)
+        self.sources = _Sources(self)
+        self.chat = _Chat(self)
+        self.artifacts = _Artifacts(self)
+
+    async def rpc(self, name: str, params: List[Any], notebook_id: Optional[str] = None) -> Any:
+        rpc_id = RPC_IDS[name]
+        self._reqid += 100000
+        source_path = quote(f"/notebook/{notebook_id}" if notebook_id else "/", safe="")
+        url = (f"{ORIGIN}{BATCHEXECUTE_PATH}?rpcids={rpc_id}&source-path={source_path}"
+               f"&f.sid={quote(self.session_id)}&hl=en&_reqid={self._reqid}&rt=c")
+        f_req = json.dumps([[[rpc_id, json.dumps(params, ensure_ascii=False), None, "generic"]]], ensure_ascii=False)
+        body = f"f.req={quote(f_req)}&at={quote(self.csrf_token)}&"
+        response = await self.http.post(url, content=body, timeout=30.0)
+        response.raise_for_status()
+        return decode_envelope(response.text, rpc_id)
@@ -0,0 +1,160 @@
+import asyncio
+import functools
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+from tracing import tracer
+
+# Dedicated pool for disk work so it never competes with to_thread users or runs on the loop
+io_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="file-io")
+
+# Legacy synchronous writes, for comparison benchmarks or debugging
+SYNC_IO = os.environ.get("NOTEBOOKLM_SYNC_IO", "0") == "1"
+
+def log_dir() -> str:
+    """Directory of backend.log: %LOCALAPPDATA%/notebooklm-desktop when packaged, else the working directory"""
+    if getattr(sys, "frozen", False):
+        return os.path.join(os.environ.get("LOCALAPPDATA", os.environ.get("APPDATA", ".")), "notebooklm-desktop")
+    return os.getcwd()
+
+def _io_target(fn: Callable, args) -> Optional[str]:
+    target = args[0] if args else getattr(fn, "__self__", None)
+    return str(target) if isinstance(target, (str, os.PathLike)) else None
+
+async def run_io(fn: Callable, *args, **kwargs):
+    """Run blocking file work on the I/O executor"""
+    loop = asyncio.get_running_loop()
+    call = functools.partial(fn, *args, **kwargs)
+    if not tracer.enabled:
+        return await loop.run_in_executor(io_executor, call)
+    with tracer.span(f"io.{getattr(fn, '__name__', 'call')}", path=_io_target(fn, args)):
+        return await loop.run_in_executor(io_executor, call)
+
+def write_atomic(path, data) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    if isinstance(data, str):
+        tmp.write_text(data, encoding="utf-8")
+    else:
+        tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+def remove_quietly(path) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+class JsonSaver:
+    """Coalescing, awaitable writer for one JSON file.
+
+    request() only marks the file dirty; the writer takes one snapshot on the
+    loop (a cheap structural copy) when it picks the save up, then serializes
+    and writes it on the I/O executor. A burst of requests costs one snapshot
+    and one write. Without a running loop the write happens synchronously.
+    """
+
+    def __init__(self, path, snapshot: Callable[[], Any], **dumps_kwargs):
+        self.path = Path(path)
+        self.snapshot = snapshot
+        self.dumps_kwargs = dumps_kwargs
+        self._has_pending = False
+        self._waiters: List[asyncio.Future] = []
+        self._task: Optional[asyncio.Task] = None
+        self.writes = 0
+
+    def _write(self, data: Any):
+        write_atomic(self.path, json.dumps(data, **self.dumps_kwargs))
+        self.writes += 1
+
+    def request(self) -> Optional[asyncio.Future]:
+        """Schedule a save; the returned future resolves once this state is on disk"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        if loop is None or SYNC_IO:
+            self._write(self.snapshot())
+            return None
+
+        self._has_pending = True
+        waiter = loop.create_future()
+        self._waiters.append(waiter)
+        if self._task is None or self._task.done():
+            self._task = loop.create_task(self._drain())
+        return waiter
+
+    async def _drain(self):
+        while self._has_pending:
+            self._has_pending = False
+            waiters, self._waiters = self._waiters, []
+            error = None
+            try:
+                data = self.snapshot()
+                with tracer.span("io.save", path=str(self.path)):
+                    await asyncio.get_running_loop().run_in_executor(io_executor, self._write, data)
+            except Exception as e:
+                error = e
+                print(f"Warning: Failed to save {self.path}: {e}")
+            for waiter in waiters:
+                if waiter.done():
+                    continue
+                if error:
+                    waiter.set_exception(error)
+                else:
+                    waiter.set_result(None)
+
+    async def flush(self):
+        """Wait until every requested save has been written"""
+        while self._task is not None and not self._task.done():
+            await asyncio.shield(self._task)
+
+_savers: List[JsonSaver] = []
+
+def json_saver(path, snapshot: Callable[[], Any], **dumps_kwargs) -> JsonSaver:
+    saver = JsonSaver(path, snapshot, **dumps_kwargs)
+    _savers.append(saver)
+    return saver
+
+async def flush_all():
+    for saver in _savers:
+        await saver.flush()
+
+class BlockingGuard(logging.Handler):
+    """Test mode: records callbacks that block the event loop longer than a threshold.
+
+    Uses asyncio debug mode's slow-callback reporting. With strict=True the
+    request middleware turns any violation during a request into a 500.
+    """
+
+    def __init__(self, threshold_ms: float, strict: bool = False):
+        super().__init__(level=logging.WARNING)
+        self.threshold_ms = threshold_ms
+        self.strict = strict
+        self.violations: List[Dict[str, Any]] = []
+
+    def install(self, loop: asyncio.AbstractEventLoop):
+        loop.set_debug(True)
+        loop.slow_callback_duration = self.threshold_ms / 1000
+        logging.getLogger("asyncio").addHandler(self)
+        print(f"Blocking guard active: threshold {self.threshold_ms:.0f} ms{' (strict)' if self.strict else ''}")
+
+    def emit(self, record: logging.LogRecord):
+        if not record.msg.startswith("Executing") or not record.args:
+            return
+        handle, seconds = record.args[0], record.args[-1]
+        self.violations.append({"at": time.time(), "ms": round(seconds * 1000, 1), "callback": repr(handle)[:300]})
+        del self.violations[:-200]
+        print(f"[BLOCKING] Event loop blocked {seconds * 1000:.1f} ms by {repr(handle)[:200]}")
+
+def blocking_guard_from_env() -> Optional[BlockingGuard]:
+    threshold = os.environ.get("NOTEBOOKLM_BLOCK_THRESHOLD_MS")
+    if not threshold:
+        return None
+    return BlockingGuard(float(threshold), strict=os.environ.get("NOTEBOOKLM_BLOCK_STRICT", "0") == "1")
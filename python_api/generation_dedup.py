@@ -0,0 +1,91 @@
+import asyncio
+import hashlib
+import json
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+class GenerationDeduplicator:
+    """Shares identical generation requests.
+
+    Requests are keyed by (notebook, type, normalized params, source fingerprint).
+    A duplicate attaches to the in-flight generation, or reuses a result that
+    finished within the freshness window.
+    """
+
+    def __init__(self, freshness_s: float = None):
+        self.freshness_s = freshness_s if freshness_s is not None else float(os.environ.get("NOTEBOOKLM_GENERATION_REUSE_MINUTES", "10")) * 60
+        # key -> {"task": asyncio.Task, "task_id"}
+        self._inflight: Dict[str, Dict[str, Any]] = {}
+        # key -> {"result", "task_id", "finished_at"}
+        self._recent: Dict[str, Dict[str, Any]] = {}
+
+    @staticmethod
+    def normalize_params(params: Dict[str, Any]) -> str:
+        normalized = {}
+        for k, v in params.items():
+            if v is None:
+                continue
+            if isinstance(v, str):
+                v = " ".join(v.split())
+                if not v:
+                    continue
+            normalized[k] = v
+        return json.dumps(normalized, sort_keys=True, ensure_ascii=False)
+
+    @staticmethod
+    def source_fingerprint(sources: Dict[str, Dict[str, Any]], fingerprint: Callable[[Dict[str, Any]], str]) -> str:
+        h = hashlib.sha256()
+        for sid in sorted(sources):
+            h.update(f"{sid}={fingerprint(sources[sid])}\n".encode("utf-8"))
+        return h.hexdigest()[:16]
+
+    def make_key(self, notebook_id: str, type: str, params: Dict[str, Any], source_fingerprint: str) -> str:
+        return f"{notebook_id}|{type}|{self.normalize_params(params)}|{source_fingerprint}"
+
+    async def _recent_result(self, key: str, is_valid: Optional[Callable[[Any], Awaitable[bool]]]) -> Optional[Dict[str, Any]]:
+        entry = self._recent.get(key)
+        if not entry:
+            return None
+        if time.time() - entry["finished_at"] > self.freshness_s or (is_valid and not await is_valid(entry["result"])):
+            self._recent.pop(key, None)
+            return None
+        return entry
+
+    async def run(self, key: str, task_id: Optional[str], factory: Callable[[], Awaitable[Any]],
+                  is_valid: Optional[Callable[[Any], Awaitable[bool]]] = None) -> Tuple[Any, Optional[Dict[str, Any]]]:
+        """Run factory unless an identical request is running or finished recently.
+
+        Returns (result, reuse) where reuse is None for a fresh run, or
+        {"kind": "inflight" | "recent", "task_id": <original task id>}.
+        """
+        recent = await self._recent_result(key, is_valid)
+        if recent:
+            print(f"Reusing recent generation result for {key}")
+            return recent["result"], {"kind": "recent", "task_id": recent["task_id"]}
+
+        inflight = self._inflight.get(key)
+        if inflight:
+            print(f"Attaching to in-flight generation for {key}")
+            return await asyncio.shield(inflight["task"]), {"kind": "inflight", "task_id": inflight["task_id"]}
+
+        task = asyncio.create_task(factory())
+        self._inflight[key] = {"task": task, "task_id": task_id}
+
+        def finished(t: asyncio.Task):
+            self._inflight.pop(key, None)
+            if not t.cancelled() and t.exception() is None:
+                self._recent[key] = {"result": t.result(), "task_id": task_id, "finished_at": time.time()}
+
+        task.add_done_callback(finished)
+        self._prune()
+        # Shielded so one caller going away does not cancel the run the others share
+        return await asyncio.shield(task), None
+
+    def _prune(self):
+        cutoff = time.time() - self.freshness_s
+        for key in [k for k, e in self._recent.items() if e["finished_at"] < cutoff]:
+            del self._recent[key]
+
+# Global instance
+generation_dedup = GenerationDeduplicator()
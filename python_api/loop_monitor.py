@@ -0,0 +1,215 @@
+import asyncio
+import contextvars
+import json
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+# ASGI scope of the request being handled; copied into every task the request spawns
+current_request: contextvars.ContextVar[Optional[dict]] = contextvars.ContextVar("current_request", default=None)
+
+def endpoint_label(scope: Optional[dict]) -> str:
+    """Route template ("GET /api/notebooks/{notebook_id}") rather than the raw path"""
+    if not scope:
+        return "(background)"
+    route = scope.get("route")
+    path = getattr(route, "path", None) or scope.get("path", "?")
+    return f"{scope.get('method', '')} {path}".strip()
+
+def _percentile(values: List[float], p: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+class LoopMonitor:
+    """Event-loop lag sampler with a watchdog thread for stall stack capture.
+
+    A task on the loop wakes every `interval` seconds and records how late it
+    was. A watchdog thread notices when that heartbeat stops, captures the loop
+    thread's stack while it is still stuck, and attributes the stall to the
+    request (route) whose task was running. Unlike asyncio debug mode this adds
+    no per-callback overhead, so it can stay on in normal use.
+    """
+
+    def __init__(self, interval: float = 0.1, threshold_ms: float = 100.0, log_path: Optional[str] = None,
+                 log_max_bytes: int = 1024 * 1024, history: int = 600):
+        self.interval = interval
+        self.threshold_ms = threshold_ms
+        self.log_path = log_path
+        self.log_max_bytes = log_max_bytes
+        self.lags = deque(maxlen=history)  # ms late per sample, ~1 minute at 100 ms
+        self.stalls = deque(maxlen=50)
+        self.endpoints: Dict[str, Dict[str, Any]] = {}
+        self.stats: Dict[str, Any] = {"samples": 0, "slow_samples": 0, "stalls": 0, "lag_max_ms": 0.0}
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._beat = 0.0
+        self._last_lag_ms = 0.0
+        self._stall: Optional[Dict[str, Any]] = None
+        self._sampler: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    def start(self):
+        if self._sampler is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._beat = time.perf_counter()
+        self._stopped.clear()
+        self._sampler = asyncio.create_task(self._sample())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+        print(f"Loop monitor active: {self.interval * 1000:.0f} ms samples, stalls over {self.threshold_ms:.0f} ms"
+              + (f", logging to {self.log_path}" if self.log_path else ""))
+
+    async def stop(self):
+        self._stopped.set()
+        if self._sampler:
+            self._sampler.cancel()
+            try:
+                await self._sampler
+            except asyncio.CancelledError:
+                pass
+            self._sampler = None
+
+    # --- request attribution ---
+
+    def request_started(self, scope: dict) -> contextvars.Token:
+        return current_request.set(scope)
+
+    def request_finished(self, scope: dict, token: contextvars.Token):
+        current_request.reset(token)
+        label = endpoint_label(scope)
+        with self._lock:
+            entry = self.endpoints.setdefault(label, {"requests": 0, "stalls": 0, "blocked_ms_total": 0.0, "blocked_ms_max": 0.0})
+            entry["requests"] += 1
+
+    # --- loop side ---
+
+    async def _sample(self):
+        while True:
+            expected = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.perf_counter()
+            lag_ms = max(0.0, (now - expected) * 1000)
+            self._last_lag_ms = lag_ms
+            self._beat = now
+            with self._lock:
+                self.lags.append(round(lag_ms, 2))
+            self.stats["samples"] += 1
+            if lag_ms > self.threshold_ms:
+                self.stats["slow_samples"] += 1
+            if lag_ms > self.stats["lag_max_ms"]:
+                self.stats["lag_max_ms"] = round(lag_ms, 2)
+
+    # --- watchdog thread ---
+
+    def _watch(self):
+        poll = min(self.threshold_ms / 4000, 0.05)
+        limit = self.interval + self.threshold_ms / 1000
+        while not self._stopped.wait(poll):
+            silent = time.perf_counter() - self._beat
+            if silent > limit:
+                if self._stall is None:
+                    self._stall = self._capture(silent)
+            elif self._stall is not None:
+                stall, self._stall = self._stall, None
+                self._finish(stall)
+
+    def _capture(self, silent: float) -> Dict[str, Any]:
+        """Snapshot what the loop thread is doing right now (it is still blocked)"""
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = traceback.format_stack(frame)[-25:] if frame else []
+        task = None
+        scope = None
+        try:
+            task = asyncio.current_task(self._loop)
+            if task is not None and hasattr(task, "get_context"):
+                scope = task.get_context().get(current_request)
+        except Exception:
+            pass
+        return {
+            "at": time.time() - silent + self.interval,
+            "endpoint": endpoint_label(scope),
+            "task": task.get_name() if task is not None else None,
+            "coroutine": getattr(task.get_coro(), "__qualname__", None) if task is not None else None,
+            "stack": [line.rstrip() for line in stack],
+        }
+
+    def _finish(self, stall: Dict[str, Any]):
+        stall["ms"] = round(self._last_lag_ms, 1)
+        with self._lock:
+            self.stats["stalls"] += 1
+            self.stalls.append(stall)
+            entry = self.endpoints.setdefault(stall["endpoint"], {"requests": 0, "stalls": 0, "blocked_ms_total": 0.0, "blocked_ms_max": 0.0})
+            entry["stalls"] += 1
+            entry["blocked_ms_total"] = round(entry["blocked_ms_total"] + stall["ms"], 1)
+            entry["blocked_ms_max"] = max(entry["blocked_ms_max"], stall["ms"])
+        where = stall["stack"][-1].strip().splitlines()[0] if stall["stack"] else "?"
+        print(f"[LOOP] Event loop stalled {stall['ms']:.0f} ms during {stall['endpoint']} at {where}")
+        if self.log_path:
+            self._append_log(stall)
+
+    def _append_log(self, record: Dict[str, Any]):
+        # Runs on the watchdog thread, never on the loop
+        try:
+            if os.path.exists(self.log_path) and os.path.getsize(self.log_path) > self.log_max_bytes:
+                os.replace(self.log_path, self.log_path + ".1")
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        except OSError as e:
+            print(f"Warning: Failed to write loop log: {e}")
+
+    # --- reporting ---
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lags = list(self.lags)
+        return {
+            **self.stats,
+            "running": self._sampler is not None,
+            "lag_p50_ms": _percentile(lags, 50),
+            "lag_p99_ms": _percentile(lags, 99),
+        }
+
+    def snapshot(self, stalls: int = 20, stacks: bool = True) -> Dict[str, Any]:
+        with self._lock:
+            recent = list(self.stalls)[-stalls:] if stalls else []
+            endpoints = {k: dict(v) for k, v in self.endpoints.items()}
+            lags = list(self.lags)
+        if not stacks:
+            recent = [{k: v for k, v in s.items() if k != "stack"} for s in recent]
+        return {
+            "interval_ms": self.interval * 1000,
+            "threshold_ms": self.threshold_ms,
+            "log_path": self.log_path,
+            **self.get_stats(),
+            "lag_recent_ms": lags[-20:],
+            "recent_stalls": list(reversed(recent)),
+            "endpoints": dict(sorted(endpoints.items(), key=lambda kv: kv[1]["blocked_ms_total"], reverse=True)),
+        }
+
+    def reset(self):
+        with self._lock:
+            self.lags.clear()
+            self.stalls.clear()
+            self.endpoints.clear()
+            self.stats.update({"samples": 0, "slow_samples": 0, "stalls": 0, "lag_max_ms": 0.0})
+
+def loop_monitor_from_env() -> Optional[LoopMonitor]:
+    if os.environ.get("NOTEBOOKLM_LOOP_MONITOR", "1") == "0":
+        return None
+    return LoopMonitor(
+        threshold_ms=float(os.environ.get("NOTEBOOKLM_LOOP_THRESHOLD_MS", "100")),
+        log_path=os.environ.get("NOTEBOOKLM_LOOP_LOG") or None,
+    )
+
+# Global instance
+loop_monitor = loop_monitor_from_env()
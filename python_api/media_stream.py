@@ -0,0 +1,90 @@
+import mimetypes
+import os
+from typing import Optional, Tuple
+from fastapi import Request
+from file_io import run_io
+from fastapi.responses import Response, StreamingResponse, FileResponse
+
+CHUNK_SIZE = 256 * 1024
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+def make_etag(st: os.stat_result) -> str:
+    return f'"{st.st_size:x}-{st.st_mtime_ns:x}"'
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """Parse a single 'bytes=' range into inclusive (start, end); None means serve the whole file"""
+    if not header or not header.startswith("bytes="):
+        return None
+    spec = header[len("bytes="):].strip()
+    if "," in spec:
+        # Multiple ranges are rare for media; the full body is a valid answer
+        return None
+
+    start_text, _, end_text = spec.partition("-")
+    try:
+        if start_text == "":
+            # Suffix range: the last N bytes
+            length = int(end_text)
+            if length <= 0:
+                raise RangeNotSatisfiable()
+            return max(size - length, 0), size - 1
+        start = int(start_text)
+        end = int(end_text) if end_text else size - 1
+    except ValueError:
+        return None
+
+    if start >= size or start > end:
+        raise RangeNotSatisfiable()
+    return start, min(end, size - 1)
+
+async def _iter_file(path: str, start: int, end: int):
+    # Reads run on the I/O executor so large files never block the event loop
+    f = await run_io(open, path, "rb")
+    try:
+        await run_io(f.seek, start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = await run_io(f.read, min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+    finally:
+        await run_io(f.close)
+
+async def file_range_response(request: Request, path: str, media_type: Optional[str] = None) -> Response:
+    """Serve a file with ETag/If-None-Match and single-range (206) support"""
+    st = await run_io(os.stat, path)
+    size = st.st_size
+    etag = make_etag(st)
+    media_type = media_type or mimetypes.guess_type(path)[0] or "application/octet-stream"
+    headers = {"ETag": etag, "Accept-Ranges": "bytes", "Cache-Control": "private, max-age=0, must-revalidate"}
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag in [t.strip() for t in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and if_range and if_range.strip() != etag:
+        # The client's cached copy is stale: send the whole current file
+        range_header = None
+
+    try:
+        byte_range = parse_range(range_header, size) if range_header else None
+    except RangeNotSatisfiable:
+        return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+
+    if byte_range is None:
+        # Full body: FileResponse lets the server use zero-copy sendfile where supported
+        return FileResponse(path, media_type=media_type, headers=headers, stat_result=st)
+
+    # ASGI has no sendfile for part of a file, so ranges are read in chunks on the I/O executor
+    start, end = byte_range
+    headers.update({
+        "Content-Range": f"bytes {start}-{end}/{size}",
+        "Content-Length": str(end - start + 1),
+    })
+    return StreamingResponse(_iter_file(path, start, end), status_code=206, media_type=media_type, headers=headers)
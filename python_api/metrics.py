@@ -0,0 +1,227 @@
+import asyncio
+import functools
+import inspect
+import time
+from tracing import tracer
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+# Seconds; upstream RPCs range from ~100 ms reads to multi-minute generations
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+GENERATION_BUCKETS = (5.0, 15.0, 30.0, 60.0, 120.0, 300.0, 600.0, 900.0, 1800.0)
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[Any, ...], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class _Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, help: str, labels: Iterable[str] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self.values: Dict[Tuple[Any, ...], Any] = {}
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[Any, ...]:
+        return tuple(labels.get(n, "") for n in self.label_names)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        for key, value in sorted(self.values.items()):
+            lines.append(f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}")
+        return lines
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        self.values[key] = self.values.get(key, 0) + amount
+
+class Gauge(_Metric):
+    type = "gauge"
+
+    def set(self, value: float, **labels):
+        self.values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Iterable[str] = (), buckets: Iterable[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        entry = self.values.get(key)
+        if entry is None:
+            entry = self.values[key] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                entry["counts"][i] += 1
+                break
+        entry["sum"] += value
+        entry["count"] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        for key, entry in sorted(self.values.items()):
+            labels = _format_labels(self.label_names, key)
+            cumulative = 0
+            for bound, count in zip(self.buckets, entry["counts"]):
+                cumulative += count
+                le = 'le="%s"' % bound
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, key, le)} {cumulative}")
+            le = 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.label_names, key, le)} {entry['count']}")
+            lines.append(f"{self.name}_sum{labels} {round(entry['sum'], 6)}")
+            lines.append(f"{self.name}_count{labels} {entry['count']}")
+        return lines
+
+class MetricsRegistry:
+    """Minimal Prometheus text-format registry.
+
+    Counters/histograms are updated inline; collectors are called at scrape
+    time to turn existing stats (caches, queues) into gauges and counters, so
+    those modules don't have to know about metrics.
+    """
+
+    def __init__(self):
+        self.metrics: List[_Metric] = []
+        self.collectors: List[Callable[[], Iterable[_Metric]]] = []
+
+    def counter(self, name: str, help: str, labels: Iterable[str] = ()) -> Counter:
+        return self._add(Counter(name, help, labels))
+
+    def gauge(self, name: str, help: str, labels: Iterable[str] = ()) -> Gauge:
+        return self._add(Gauge(name, help, labels))
+
+    def histogram(self, name: str, help: str, labels: Iterable[str] = (), buckets: Iterable[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._add(Histogram(name, help, labels, buckets))
+
+    def _add(self, metric: _Metric):
+        self.metrics.append(metric)
+        return metric
+
+    def collector(self, fn: Callable[[], Iterable[_Metric]]):
+        self.collectors.append(fn)
+        return fn
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        for collect in self.collectors:
+            try:
+                for metric in collect():
+                    lines.extend(metric.render())
+            except Exception as e:
+                lines.append(f"# collector {getattr(collect, '__name__', collect)} failed: {_escape(e)}")
+        return "\n".join(lines) + "\n"
+
+# Global instance
+metrics = MetricsRegistry()
+
+rpc_requests = metrics.counter(
+    "notebooklm_rpc_requests_total", "Upstream requests made through the browser context",
+    ("rpc", "method", "status", "notebook"))
+rpc_duration = metrics.histogram(
+    "notebooklm_rpc_duration_seconds", "Upstream request latency including browser wake-up",
+    ("rpc", "method", "status"))
+rpc_in_flight = metrics.gauge(
+    "notebooklm_rpc_in_flight", "Upstream requests currently awaiting a response", ("rpc",))
+rpc_auth_retries = metrics.counter(
+    "notebooklm_rpc_auth_retries_total", "Requests retried after a token refresh", ("rpc",))
+
+manager_calls = metrics.counter(
+    "notebooklm_manager_calls_total", "NotebookManager operations", ("method", "status", "notebook"))
+manager_duration = metrics.histogram(
+    "notebooklm_manager_duration_seconds", "NotebookManager operation latency", ("method", "status"))
+manager_in_flight = metrics.gauge(
+    "notebooklm_manager_in_flight", "NotebookManager operations currently running", ("method",))
+
+generation_duration = metrics.histogram(
+    "notebooklm_generation_duration_seconds", "End-to-end artifact generation time as seen by the caller",
+    ("type", "outcome"), buckets=GENERATION_BUCKETS)
+
+def _status_of(error: Optional[BaseException]) -> str:
+    if error is None:
+        return "ok"
+    if isinstance(error, asyncio.CancelledError):
+        return "cancelled"
+    if isinstance(error, TimeoutError):
+        return "timeout"
+    return "error"
+
+def instrumented(fn: Callable) -> Callable:
+    """Count, time, trace and track in-flight calls of a NotebookManager coroutine (or async generator).
+
+    The notebook label comes from a notebook_id argument, else the manager's current notebook.
+    """
+    name = fn.__name__
+    signature = inspect.signature(fn)
+    takes_notebook = "notebook_id" in signature.parameters
+
+    def notebook_of(self, args, kwargs) -> str:
+        notebook_id = None
+        if takes_notebook:
+            try:
+                notebook_id = signature.bind_partial(self, *args, **kwargs).arguments.get("notebook_id")
+            except TypeError:
+                pass
+        return notebook_id or getattr(self, "current_notebook_id", None) or ""
+
+    def record(notebook: str, start: float, error: Optional[BaseException]):
+        status = _status_of(error)
+        manager_in_flight.dec(method=name)
+        manager_calls.inc(method=name, status=status, notebook=notebook)
+        manager_duration.observe(time.perf_counter() - start, method=name, status=status)
+
+    if inspect.isasyncgenfunction(fn):
+        @functools.wraps(fn)
+        async def gen_wrapper(self, *args, **kwargs):
+            notebook = notebook_of(self, args, kwargs)
+            manager_in_flight.inc(method=name)
+            start, error = time.perf_counter(), None
+            try:
+                with tracer.span(f"manager.{name}", notebook=notebook):
+                    async for item in fn(self, *args, **kwargs):
+                        yield item
+            except BaseException as e:
+                error = e
+                raise
+            finally:
+                record(notebook, start, error)
+        return gen_wrapper
+
+    @functools.wraps(fn)
+    async def wrapper(self, *args, **kwargs):
+        notebook = notebook_of(self, args, kwargs)
+        manager_in_flight.inc(method=name)
+        start, error = time.perf_counter(), None
+        try:
+            with tracer.span(f"manager.{name}", notebook=notebook):
+                return await fn(self, *args, **kwargs)
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            record(notebook, start, error)
+    return wrapper
@@ -1,6 +1,8 @@
 import asyncio
+import copy
 import os
 import sys
+import time
 from pathlib import Path
 from typing import Optional, List, Dict, Any
 import json
@@ -9,10 +11,180 @@ from notebooklm.auth import AuthTokens
 from pptx import Presentation
 import pdfkit
 from notebooklm.rpc.types import ReportFormat, QuizDifficulty, QuizQuantity
-from docx import Document
-from docx.shared import Pt, RGBColor
-from docx.enum.text import WD_ALIGN_PARAGRAPH
+from summary_service import summary_service
+from generation_dedup import generation_dedup
+from completion_watcher import CompletionWatcher
+from artifact_pipeline import process_download, process_json, normalize_payload, decode_text
+from browser_config import browser_config
+from artifact_store import artifact_store, content_cache
+from export_service import export_service
+from file_io import json_saver, run_io
+from tracing import tracer
+from profiler import profiler
+from cassette import recorder_from_env, replay_from_env
+from metrics import instrumented, rpc_requests, rpc_duration, rpc_in_flight, rpc_auth_retries
 
+# Browser launch options that don't depend on the profile or headless mode
+DEFAULT_LAUNCH_OPTIONS = {
+    "args": [
+        "--disable-blink-features=AutomationControlled",
+        "--no-sandbox", 
+        "--disable-infobars"
+    ],
+    "ignore_default_args": ["--enable-automation"],
+    "user_agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "viewport": {"width": 1280, "height": 720}
+}
+
+# Extra Chromium flags for the background (headless) session in lean mode
+LEAN_CHROMIUM_ARGS = [
+    "--disable-gpu",
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--disable-dev-shm-usage",
+    "--mute-audio",
+    "--no-first-run",
+    "--renderer-process-limit=2",
+    "--disable-features=Translate,MediaRouter,OptimizationHints,AutofillServerCommunication",
+]
+
+# Resources the token scrape never needs
+BLOCKED_RESOURCE_TYPES = {"image", "media", "font", "stylesheet", "manifest", "other"}
+BLOCKED_URL_PATTERNS = ("google-analytics.com", "googletagmanager.com", "play.google.com/log", "/gen_204")
+
+# Process names of Chromium-family browsers, for when the launched executable is unknown
+BROWSER_PROCESS_NAMES = ("chrome", "chromium", "msedge", "headless_shell")
+
+def _is_browser_process(proc, executable: Optional[str]) -> bool:
+    import psutil
+    try:
+        if executable:
+            exe = proc.exe() or (proc.cmdline() or [""])[0]
+            return os.path.normcase(os.path.realpath(exe)) == os.path.normcase(os.path.realpath(executable))
+        return os.path.splitext(proc.name())[0].lower().startswith(BROWSER_PROCESS_NAMES)
+    except (psutil.NoSuchProcess, psutil.AccessDenied, OSError):
+        return False
+
+def browser_rss_bytes(executable: Optional[str] = None) -> Optional[int]:
+    """Total RSS of the browser spawned by this backend (needs psutil).
+
+    The browser root is the descendant running the launched executable; its whole
+    process tree counts (renderer/GPU helpers may run other binaries, e.g.
+    "Chromium Helper (Renderer)" on macOS). The Playwright driver and export
+    workers are not part of that tree.
+    """
+    try:
+        import psutil
+    except ImportError:
+        return None
+    try:
+        children = psutil.Process().children(recursive=True)
+    except Exception:
+        return None
+    browser_pids = {child.pid for child in children if _is_browser_process(child, executable)}
+    tree: Dict[int, Any] = {}
+    for child in children:
+        if child.pid not in browser_pids:
+            continue
+        try:
+            if child.ppid() in browser_pids:
+                continue  # Inside a tree we already count from its root
+            tree[child.pid] = child
+            for proc in child.children(recursive=True):
+                tree[proc.pid] = proc
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            pass
+    total = 0
+    for proc in tree.values():
+        try:
+            total += proc.memory_info().rss
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            pass
+    return total
+
+# Statuses that mean the CSRF/session tokens were rejected
+AUTH_ERROR_STATUSES = {401, 403}
+
+# Refresh tokens well before Google expires them
+TOKEN_REFRESH_INTERVAL = 20 * 60
+TOKEN_CHECK_INTERVAL = 60
+
+NOTEBOOKLM_URL = "https://notebooklm.google.com/"
+
+# Backoff before a request retries a connect that failed for a transient reason (doubles per failure)
+CONNECT_RETRY_MIN = 10
+CONNECT_RETRY_MAX = 5 * 60
+
+# Seconds between checks of whether the headless browser has been idle for NOTEBOOKLM_IDLE_MINUTES
+IDLE_CHECK_INTERVAL = 30
+
+# Persisted session for fast start (cookies come from the library's storage_state.json)
+STORAGE_STATE_PATH = Path.home() / ".notebooklm" / "storage_state.json"
+TOKEN_CACHE_PATH = Path.home() / ".notebooklm" / "desktop_tokens.json"
+TOKEN_CACHE_MAX_AGE = 24 * 60 * 60
+PREFETCH_MAX_AGE = 30
+
+# Downloads with these extensions are normalized in memory before being stored
+TEXT_ARTIFACT_EXTS = {".json", ".md"}
+
+# Remote artifact listings are reused for this long before asking NotebookLM again
+REMOTE_ARTIFACTS_MAX_AGE = 60
+
+# Remote artifact kind -> (local type, file extension, downloader, extra download kwargs)
+REMOTE_ARTIFACT_KINDS = {
+    "audio": ("audio", ".mp3", "download_audio", {}),
+    "video": ("video", ".mp4", "download_video", {}),
+    "report": ("report", ".md", "download_report", {}),
+    "quiz": ("quiz", ".json", "download_quiz", {"output_format": "json"}),
+    "flashcards": ("flashcards", ".json", "download_flashcards", {"output_format": "json"}),
+    "mind_map": ("mindmap", ".json", "download_mind_map", {}),
+    "slide_deck": ("slides", ".pdf", "download_slide_deck", {}),
+}
+
+def _swap_tokens(url: str, content, old_auth: AuthTokens, new_auth: AuthTokens):
+    """Rewrite a prepared RPC request to carry refreshed tokens"""
+    from urllib.parse import quote
+    if old_auth.session_id and new_auth.session_id:
+        url = url.replace(quote(old_auth.session_id, safe=""), quote(new_auth.session_id, safe=""))
+    if content and old_auth.csrf_token and new_auth.csrf_token:
+        old_at, new_at = quote(old_auth.csrf_token, safe=""), quote(new_auth.csrf_token, safe="")
+        if isinstance(content, bytes):
+            content = content.replace(old_at.encode(), new_at.encode())
+        else:
+            content = content.replace(old_at, new_at)
+    return url, content
+
+def _rpc_names() -> Dict[str, str]:
+    try:
+        from notebooklm.rpc import RPCMethod
+        return {m.value: m.name.lower() for m in RPCMethod}
+    except ImportError:
+        return {}
+
+RPC_NAMES = _rpc_names()
+
+def rpc_labels(url: str):
+    """(rpc, notebook) metric labels for a request URL.
+
+    batchexecute calls carry the RPC id in `rpcids` and the notebook in
+    `source-path`; chat streams are labelled "chat_stream" and anything else
+    (media downloads) by host.
+    """
+    from urllib.parse import urlsplit, parse_qs
+    parts = urlsplit(url)
+    query = parse_qs(parts.query)
+    rpc_ids = query.get("rpcids")
+    if not rpc_ids:
+        if parts.path.endswith("/GenerateFreeFormStreamed"):
+            return "chat_stream", ""
+        return parts.hostname or "unknown", ""
+    rpc = ",".join(RPC_NAMES.get(r, r) for r in rpc_ids[0].split(","))
+    source_path = query.get("source-path", [""])[0]
+    notebook = source_path[len("/notebook/"):] if source_path.startswith("/notebook/") else ""
+    return rpc, notebook
 
 # Wrapper to adapt Playwright APIResponse to httpx.Response interface
 class PlaywrightResponseAdapter:
@@ -45,9 +217,80 @@ class PlaywrightResponseAdapter:
 
 # Wrapper to adapt Playwright APIRequestContext to httpx.AsyncClient interface
 class PlaywrightHttpClient:
-    def __init__(self, request_context):
+    def __init__(self, request_context, on_auth_error=None, before_request=None, after_request=None, recorder=None,
+                 current_auth=None):
         self.request = request_context
         self.headers = {} # Mock headers storage that library might try to update
+        # async () -> (old_auth, new_auth) or None; lets one rejected request retry with fresh tokens
+        self.on_auth_error = on_auth_error
+        # async () -> request context; lets the manager relaunch a hibernated browser lazily
+        self.before_request = before_request
+        self.after_request = after_request
+        # CassetteRecorder that captures each request/response pair (NOTEBOOKLM_RECORD)
+        self.recorder = recorder
+        # () -> the AuthTokens new requests are built with; lets a request built before a
+        # refresh (e.g. one that woke the browser) be rewritten from the tokens it actually carries
+        self.current_auth = current_auth
+
+    async def _acquire(self):
+        if self.before_request:
+            self.request = await self.before_request()
+
+    def _release(self):
+        if self.after_request:
+            self.after_request()
+
+    async def _refresh_for_retry(self, response, rpc: str):
+        if response.status not in AUTH_ERROR_STATUSES or not self.on_auth_error:
+            return None
+        print(f"  [DEBUG] PlaywrightHttpClient: HTTP {response.status}, refreshing tokens and retrying once")
+        rpc_auth_retries.inc(rpc=rpc)
+        return await self.on_auth_error()
+
+    async def _send(self, method: str, url: str, send, content=None, headers=None):
+        """Issue a request via send(swapped=None), retrying once with refreshed tokens.
+
+        swapped is (tokens the request carries, tokens to put in). The library built
+        the request before _acquire(), which may resume the browser and refresh the
+        tokens, so the first send is brought up to date too.
+
+        Records count, latency and in-flight gauges labelled by RPC and notebook,
+        and the exchange itself when a cassette recorder is attached.
+        """
+        rpc, notebook = rpc_labels(url)
+        status = "error"
+        start = time.perf_counter()
+        rpc_in_flight.inc(rpc=rpc)
+        try:
+            with tracer.span(f"rpc.{rpc}", method=method, notebook=notebook) as span:
+                carried = self.current_auth() if self.current_auth else None
+                await self._acquire()
+                try:
+                    sent_at = time.time()
+                    upstream_start = time.perf_counter()
+                    current = self.current_auth() if self.current_auth else None
+                    if carried is not None and current is not None and current is not carried:
+                        response = await send((carried, current))
+                        carried = current
+                    else:
+                        response = await send()
+                    swapped = await self._refresh_for_retry(response, rpc)
+                    if swapped:
+                        response = await send((carried, swapped[1]) if carried is not None else swapped)
+                    status = str(response.status)
+                    text = await response.text()
+                    if self.recorder:
+                        self.recorder.record(method, url, content, headers, response.status, response.headers, text,
+                                             sent_at, time.perf_counter() - upstream_start)
+                    if span:
+                        span.set(status=status, retried=bool(swapped), bytes=len(text))
+                    return PlaywrightResponseAdapter(response, text)
+                finally:
+                    self._release()
+        finally:
+            rpc_in_flight.dec(rpc=rpc)
+            rpc_requests.inc(rpc=rpc, method=method, status=status, notebook=notebook)
+            rpc_duration.observe(time.perf_counter() - start, rpc=rpc, method=method, status=status)
 
     async def post(self, url, content=None, headers=None, **kwargs):
         # Merge mocked headers with request-specific headers
@@ -77,12 +320,14 @@ class PlaywrightHttpClient:
         else:
             timeout_ms = int(timeout_sec * 1000)
 
-        print(f"  [DEBUG] PlaywrightHttpClient.post timeout: {timeout_sec}s -> {timeout_ms}ms") # Debug logging
+        async def send(swapped=None):
+            nonlocal url, content
+            if swapped:
+                url, content = _swap_tokens(url, content, *swapped)
+            # Playwright expects 'data' for body
+            return await self.request.post(url, data=content, headers=final_headers, timeout=timeout_ms)
 
-        # Playwright expects 'data' for body
-        response = await self.request.post(url, data=content, headers=final_headers, timeout=timeout_ms)
-        text = await response.text()
-        return PlaywrightResponseAdapter(response, text)
+        return await self._send("POST", url, send, content=content, headers=final_headers)
 
     async def get(self, url, headers=None, **kwargs):
         final_headers = {**self.headers, **(headers or {})}
@@ -94,11 +339,13 @@ class PlaywrightHttpClient:
         else:
             timeout_ms = int(timeout_sec * 1000)
 
-        print(f"  [DEBUG] PlaywrightHttpClient.get timeout: {timeout_sec}s -> {timeout_ms}ms") # Debug logging
-            
-        response = await self.request.get(url, headers=final_headers, timeout=timeout_ms)
-        text = await response.text()
-        return PlaywrightResponseAdapter(response, text)
+        async def send(swapped=None):
+            nonlocal url
+            if swapped:
+                url, _ = _swap_tokens(url, None, *swapped)
+            return await self.request.get(url, headers=final_headers, timeout=timeout_ms)
+
+        return await self._send("GET", url, send, headers=final_headers)
         
     async def aclose(self):
         pass # Browser is managed by manager
@@ -114,13 +361,88 @@ class NotebookManager:
         self.current_notebook_id: Optional[str] = None
         self.chat_history: Dict[str, List[Dict]] = {}
         self.artifacts_store: Dict[str, List[Dict]] = {} # Persistent artifacts
+        self._artifact_index: Dict[str, Dict[str, Dict]] = {} # notebook_id -> artifact_id -> artifact
         
         # Playwright objects
         self.playwright = None
         self.browser = None
         self.context = None
         self.page = None
-        
+
+        # Connection readiness: idle -> launching -> authenticating -> ready | failed
+        self.phase = "idle"
+        self.phase_timings: Dict[str, Dict[str, float]] = {}
+        self.connect_error: Optional[str] = None
+        self._connect_task: Optional[asyncio.Task] = None
+        # Transient connect failures in a row, and when a request may try again
+        self._connect_failures = 0
+        self._connect_retry_at = 0.0
+
+        # Token lifecycle for the background refresher
+        self.tokens_refreshed_at: Optional[float] = None
+        self._token_lock: Optional[asyncio.Lock] = None
+        self._refresher_task: Optional[asyncio.Task] = None
+
+        # Fast start: reuse persisted cookies/tokens without loading the web app
+        self.fast_start = os.environ.get("NOTEBOOKLM_FAST_START", "1") != "0"
+        self.transport = None  # "browser", "http" or "replay"
+        self._prefetched_notebooks = None
+        self._prefetched_at = 0.0
+
+        # Cassettes: record upstream traffic (browser transport only) or serve a recording offline
+        self.recorder = recorder_from_env()
+        if self.recorder:
+            self.recorder.secrets = self._auth_secrets
+            # Fast start talks to Google through the library's own client, which can't be recorded
+            self.fast_start = False
+        self.replay = replay_from_env()
+
+        # Idle hibernation: close the headless browser after NOTEBOOKLM_IDLE_MINUTES without RPCs (0 disables)
+        self.idle_timeout = float(os.environ.get("NOTEBOOKLM_IDLE_MINUTES", "15")) * 60
+        self.last_activity = time.time()
+        self.inflight_rpcs = 0
+        self.hibernated = False
+        # Executable of the launched browser; its process tree is what the RSS figures cover
+        self.browser_executable: Optional[str] = None
+        self.hibernation_stats: Dict[str, Any] = {
+            "count": 0,
+            "rss_before_mb": None,
+            "rss_idle_mb": None,
+            "resume_count": 0,
+            "last_resume_s": None,
+        }
+        self._browser_lock: Optional[asyncio.Lock] = None
+        self._idle_task: Optional[asyncio.Task] = None
+
+        # Closed while the browser is being recycled so new RPCs wait
+        self._rpc_gate: Optional[asyncio.Event] = None
+        self.browser_crashed = False
+
+        # Lean headless profile: block heavy resources and trim Chromium features
+        self.lean_mode = os.environ.get("NOTEBOOKLM_LEAN_BROWSER", "1") != "0"
+
+        # Remote artifact listings per notebook: {"fetched_at", "items": {remote_id: entry}}
+        self.remote_artifacts: Dict[str, Dict[str, Any]] = {}
+        self._remote_syncs: Dict[str, asyncio.Task] = {}
+        self._remote_downloads: Dict[str, asyncio.Task] = {}
+
+        # One shared polling loop per notebook for pending remote generations
+        self.completion_watcher = CompletionWatcher(self._poll_remote_statuses)
+
+        # History and artifact catalogs are written in the background on the I/O executor
+        self._history_saver = json_saver(
+            "chat_history.json",
+            lambda: {nb: list(messages) for nb, messages in self.chat_history.items()},
+            indent=2, ensure_ascii=False
+        )
+        self._artifacts_saver = json_saver(
+            "artifacts.json",
+            lambda: {nb: [dict(a, details=dict(a["details"])) for a in artifacts] for nb, artifacts in self.artifacts_store.items()},
+            indent=2, ensure_ascii=False
+        )
+        self._token_saver = json_saver(TOKEN_CACHE_PATH, self._token_cache_snapshot)
+        artifact_store.on_evict = self._forget_evicted
+
         self._load_history()
 
     def _load_history(self):
@@ -147,65 +469,246 @@ class NotebookManager:
                 self.artifacts_store = json.loads(artifacts_file.read_text(encoding="utf-8"))
             except:
                 self.artifacts_store = {}
+        self._artifact_index = {
+            nb: {a["id"]: a for a in artifacts} for nb, artifacts in self.artifacts_store.items()
+        }
 
     def _save_history(self):
-        Path("chat_history.json").write_text(
-            json.dumps(self.chat_history, indent=2, ensure_ascii=False), 
-            encoding="utf-8"
-        )
-        Path("artifacts.json").write_text(
-            json.dumps(self.artifacts_store, indent=2, ensure_ascii=False),
-            encoding="utf-8"
-        )
+        self._history_saver.request()
+        self._artifacts_saver.request()
+
+    async def flush_history(self):
+        """Wait until chat history and the artifact catalog are on disk"""
+        await self._history_saver.flush()
+        await self._artifacts_saver.flush()
 
     def add_message(self, notebook_id: str, role: str, text: str):
         if notebook_id not in self.chat_history:
             self.chat_history[notebook_id] = []
         self.chat_history[notebook_id].append({"role": role, "text": text})
-        self._save_history()
+        self._history_saver.request()
 
     def add_artifact(self, notebook_id: str, type: str, title: str, details: Dict):
         if notebook_id not in self.artifacts_store:
             self.artifacts_store[notebook_id] = []
         
+        # Identical stored content is listed once
+        content_hash = details.get("hash")
+        if content_hash:
+            existing = next((a for a in self.artifacts_store[notebook_id]
+                             if a["type"] == type and a["details"].get("hash") == content_hash), None)
+            if existing:
+                # Link a local copy to the remote artifact it matches
+                if details.get("remote_id") and not existing["details"].get("remote_id"):
+                    existing["details"]["remote_id"] = details["remote_id"]
+                    self._artifacts_saver.request()
+                return existing
+        
         # Add timestamp
         from datetime import datetime
+        import uuid
         artifact = {
-            "id": f"{type}_{int(datetime.now().timestamp())}",
+            "id": f"{type}_{int(datetime.now().timestamp())}_{uuid.uuid4().hex[:6]}",
             "type": type,
             "title": title,
             "details": details, # e.g. filename, instructions, content summary
             "created_at": datetime.now().isoformat()
         }
         self.artifacts_store[notebook_id].append(artifact)
-        self._save_history()
+        self._artifact_index.setdefault(notebook_id, {})[artifact["id"]] = artifact
+        self._artifacts_saver.request()
         return artifact
 
+    def _forget_evicted(self, paths: List[str]):
+        """Drop catalog entries whose files the artifact store evicted"""
+        gone = set(paths)
+        changed = False
+        for notebook_id, artifacts in self.artifacts_store.items():
+            kept = [a for a in artifacts if a["details"].get("path") not in gone]
+            if len(kept) == len(artifacts):
+                continue
+            for artifact in artifacts:
+                if artifact["details"].get("path") in gone:
+                    self._artifact_index.get(notebook_id, {}).pop(artifact["id"], None)
+            self.artifacts_store[notebook_id] = kept
+            changed = True
+        if changed:
+            self._artifacts_saver.request()
+
     def get_artifacts(self, notebook_id: str):
         return self.artifacts_store.get(notebook_id, [])
 
-    def get_artifact_content(self, notebook_id: str, artifact_id: str):
-        artifacts = self.artifacts_store.get(notebook_id, [])
-        artifact = next((a for a in artifacts if a["id"] == artifact_id), None)
+    def get_artifact(self, notebook_id: str, artifact_id: str) -> Optional[Dict]:
+        return self._artifact_index.get(notebook_id, {}).get(artifact_id)
+
+    async def get_artifact_payload(self, notebook_id: str, artifact_id: str, parsed: bool = False) -> Optional[Dict[str, Any]]:
+        """Artifact text with its ETag, optionally with a normalized quiz/flashcard/mindmap structure"""
+        artifact = self.get_artifact(notebook_id, artifact_id)
         if not artifact:
             return None
         
         path = artifact["details"].get("path")
-        if not path or not os.path.exists(path):
+        if not path:
             return None
-        
-        # Determine how to read based on type/extension
         try:
-            return Path(path).read_text(encoding="utf-8")
+            entry = await content_cache.get(path, artifact["details"].get("hash"))
         except Exception as e:
             print(f"Error reading artifact {path}: {e}")
             return None
+        if entry is None:
+            return None
+        artifact_store.touch(path)
+
+        payload = {"artifact": artifact, "content": entry["text"], "etag": entry["etag"]}
+        if parsed:
+            if entry["parsed"] is None and path.endswith(".json"):
+                try:
+                    entry["parsed"] = json.loads(entry["text"])
+                except json.JSONDecodeError:
+                    pass
+            payload["parsed"] = normalize_payload(artifact["type"], entry["parsed"])
+        return payload
+
+    async def get_artifact_content(self, notebook_id: str, artifact_id: str) -> Optional[str]:
+        payload = await self.get_artifact_payload(notebook_id, artifact_id)
+        return payload["content"] if payload else None
+
+    def get_history(self, notebook_id: str, limit: Optional[int] = None) -> List[Dict]:
+        history = self.chat_history.get(notebook_id, [])
+        if limit:
+            return history[-limit:]
+        return history
+
+    # Remote artifact sync
+    def _remote_entry(self, artifact) -> Optional[Dict[str, Any]]:
+        kind = getattr(artifact.kind, "value", str(artifact.kind))
+        if kind not in REMOTE_ARTIFACT_KINDS:
+            return None
+        created = getattr(artifact, "created_at", None)
+        modified = getattr(artifact, "last_modified_at", None)
+        return {
+            "id": f"remote_{artifact.id}",
+            "type": REMOTE_ARTIFACT_KINDS[kind][0],
+            "title": artifact.title or REMOTE_ARTIFACT_KINDS[kind][0],
+            "remote": True,
+            "details": {
+                "remote_id": artifact.id,
+                "remote_kind": kind,
+                "status": artifact.status_str,
+                "completed": artifact.is_completed,
+            },
+            "created_at": created.isoformat() if created else None,
+            "_version": (getattr(artifact, "etag", None), modified.isoformat() if modified else None, artifact.status),
+        }
+
+    @instrumented
+    async def sync_remote_artifacts(self, notebook_id: str, force: bool = False) -> Dict[str, Any]:
+        """Refresh the cached remote artifact listing for a notebook"""
+        cached = self.remote_artifacts.get(notebook_id)
+        if cached and not force and time.time() - cached["fetched_at"] < REMOTE_ARTIFACTS_MAX_AGE:
+            return cached
+
+        # Concurrent callers share one listing RPC
+        task = self._remote_syncs.get(notebook_id)
+        if task is None:
+            task = asyncio.create_task(self._fetch_remote_artifacts(notebook_id))
+            self._remote_syncs[notebook_id] = task
+            task.add_done_callback(lambda _: self._remote_syncs.pop(notebook_id, None))
+        return await asyncio.shield(task)
+
+    async def _fetch_remote_artifacts(self, notebook_id: str) -> Dict[str, Any]:
+        await self._require_client()
+        if not hasattr(self.client.artifacts, "list"):
+            raise Exception("Remote artifact listing is not supported by this notebooklm version")
+
+        remote = await self.client.artifacts.list(notebook_id)
+        previous = self.remote_artifacts.get(notebook_id, {}).get("items", {})
+        items = {}
+        added = updated = 0
+        for artifact in remote:
+            old = previous.get(artifact.id)
+            # Unchanged artifacts keep their existing entry; only new or changed ones are rebuilt
+            if old and old["_version"][0] and old["_version"][0] == getattr(artifact, "etag", None) and old["_version"][2] == artifact.status:
+                items[artifact.id] = old
+                continue
+            entry = self._remote_entry(artifact)
+            if entry is None:
+                continue
+            if old is None:
+                added += 1
+            elif old["_version"] != entry["_version"]:
+                updated += 1
+            else:
+                entry = old
+            items[artifact.id] = entry
+        removed = len(set(previous) - set(items))
+
+        # Raw status of every artifact, including kinds not listed in the UI, for the completion watcher
+        statuses = {artifact.id: artifact.status_str for artifact in remote}
+        listing = {"fetched_at": time.time(), "items": items, "statuses": statuses}
+        self.remote_artifacts[notebook_id] = listing
+        print(f"Synced remote artifacts for {notebook_id}: {len(items)} total, +{added} ~{updated} -{removed}")
+        return listing
 
-    def get_history(self, notebook_id: str) -> List[Dict]:
-        return self.chat_history.get(notebook_id, [])
+    async def _poll_remote_statuses(self, notebook_id: str) -> Dict[str, str]:
+        listing = await self.sync_remote_artifacts(notebook_id, force=True)
+        return listing["statuses"]
+
+    @instrumented
+    async def list_artifacts(self, notebook_id: str, include_remote: bool = False, refresh: bool = False) -> List[Dict]:
+        """Local artifacts, optionally merged with remote ones not yet downloaded"""
+        local = self.get_artifacts(notebook_id)
+        if not include_remote:
+            return local
+
+        listing = await self.sync_remote_artifacts(notebook_id, force=refresh)
+        downloaded = {a["details"].get("remote_id") for a in local if a["details"].get("remote_id")}
+        remote_only = [
+            {k: v for k, v in entry.items() if k != "_version"}
+            for rid, entry in listing["items"].items() if rid not in downloaded
+        ]
+        remote_only.sort(key=lambda e: e["created_at"] or "")
+        return remote_only + local
+
+    @instrumented
+    async def download_remote_artifact(self, notebook_id: str, remote_id: str) -> Dict:
+        """Download an existing remote artifact into the local catalog, reusing earlier downloads"""
+        for existing in self.get_artifacts(notebook_id):
+            path = existing["details"].get("path")
+            if existing["details"].get("remote_id") == remote_id and path and await run_io(os.path.exists, path):
+                return existing
+
+        key = f"{notebook_id}:{remote_id}"
+        task = self._remote_downloads.get(key)
+        if task is None:
+            task = asyncio.create_task(self._download_remote_artifact(notebook_id, remote_id))
+            self._remote_downloads[key] = task
+            task.add_done_callback(lambda _: self._remote_downloads.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _download_remote_artifact(self, notebook_id: str, remote_id: str) -> Dict:
+        listing = await self.sync_remote_artifacts(notebook_id)
+        entry = listing["items"].get(remote_id)
+        if entry is None:
+            # It may have been generated since the last listing
+            listing = await self.sync_remote_artifacts(notebook_id, force=True)
+            entry = listing["items"].get(remote_id)
+        if entry is None:
+            raise Exception(f"Remote artifact {remote_id} not found")
+        if not entry["details"]["completed"]:
+            raise Exception(f"Remote artifact {remote_id} is not ready ({entry['details']['status']})")
+
+        type, ext, downloader, kwargs = REMOTE_ARTIFACT_KINDS[entry["details"]["remote_kind"]]
+        temp_path = artifact_store.temp_path(ext)
+        print(f"Downloading remote {type} {remote_id} to {temp_path}...")
+        with tracer.span("generation.download", type=type, remote_id=remote_id):
+            await getattr(self.client.artifacts, downloader)(notebook_id, temp_path, artifact_id=remote_id, **kwargs)
+
+        result = await self._store_download(notebook_id, type, temp_path, ext, entry["title"],
+                                            {"remote_id": remote_id, "origin": "remote"})
+        return result["artifact"]
     async def query(self, prompt: str):
-        if not self.client:
-            raise Exception("Not authenticated")
+        await self._require_client()
         if not self.current_notebook_id:
             raise Exception("No notebook selected")
         
@@ -218,8 +721,88 @@ class NotebookManager:
         self.add_message(self.current_notebook_id, "ai", answer_text)
         return answer_text
 
-    async def _launch_browser(self, headless=True):
-        """Launch browser with persistent context to save login state"""
+    def _set_phase(self, phase: str, error: Optional[str] = None):
+        """Record a connection phase transition with timing"""
+        now = time.time()
+        previous = self.phase_timings.get(self.phase)
+        if previous and "duration" not in previous:
+            previous["duration"] = round(now - previous["started_at"], 3)
+
+        self.phase = phase
+        self.phase_timings[phase] = {"started_at": now}
+        if phase in ("ready", "failed"):
+            self.phase_timings[phase]["duration"] = 0.0
+        self.connect_error = error
+        if phase == "ready":
+            self._connect_failures = 0
+        elif phase == "failed" and error != "login_required":
+            delay = min(CONNECT_RETRY_MIN * 2 ** self._connect_failures, CONNECT_RETRY_MAX)
+            self._connect_failures += 1
+            self._connect_retry_at = now + delay
+        print(f"Connection phase: {phase}" + (f" ({error})" if error else ""))
+
+    def get_readiness(self) -> Dict[str, Any]:
+        rss = browser_rss_bytes(self.browser_executable)
+        return {
+            "phase": self.phase,
+            "ready": self.phase == "ready" and self.client is not None,
+            "error": self.connect_error,
+            "phases": self.phase_timings,
+            "token_age_s": round(time.time() - self.tokens_refreshed_at, 1) if self.tokens_refreshed_at else None,
+            "transport": self.transport,
+            "hibernated": self.hibernated,
+            "idle_s": round(time.time() - self.last_activity, 1),
+            "hibernation": self.hibernation_stats,
+            "lean_mode": self.lean_mode,
+            "browser_rss_mb": round(rss / (1024 * 1024), 1) if rss is not None else None,
+            "cassette": self._cassette_stats(),
+        }
+
+    def _cassette_stats(self) -> Optional[Dict[str, Any]]:
+        if self.recorder:
+            return {"mode": "record", "path": self.recorder.path, "recorded": self.recorder.recorded}
+        if self.replay:
+            return {"mode": "replay", "path": self.replay.path, "speed": self.replay.speed, **self.replay.stats}
+        return None
+
+    def start_background_connect(self) -> asyncio.Task:
+        """Run browser launch and auth in the background; returns the shared connect task"""
+        if self._connect_task is None or self._connect_task.done():
+            self.phase_timings = {}
+            connect = self.try_auto_connect()
+            if os.environ.get("NOTEBOOKLM_PROFILE_STARTUP", "0") == "1":
+                connect = profiler.run("startup_connect", connect)
+            self._connect_task = asyncio.create_task(connect)
+        return self._connect_task
+
+    async def wait_until_ready(self, timeout: float = 120.0) -> bool:
+        """Wait for the in-progress connection instead of starting another one"""
+        if self.client:
+            return True
+        idle = self._connect_task is None or self._connect_task.done()
+        # Start auto-connect once; after a transient failure retry only when the backoff has passed.
+        # A missing login is never retried here: it needs the user to sign in.
+        if idle and (self.phase == "idle" or (
+                self.phase == "failed" and self.connect_error != "login_required"
+                and time.time() >= self._connect_retry_at)):
+            self.start_background_connect()
+        if self._connect_task and not self._connect_task.done():
+            try:
+                await asyncio.wait_for(asyncio.shield(self._connect_task), timeout)
+            except asyncio.TimeoutError:
+                print(f"Timed out waiting for connection (phase: {self.phase})")
+        return self.client is not None
+
+    async def _require_client(self):
+        """The client, waiting for a connection that is still launching or authenticating"""
+        if not self.client and not await self.wait_until_ready():
+            if self.phase == "failed" and self.connect_error:
+                raise Exception(f"Not authenticated ({self.connect_error})")
+            raise Exception("Not authenticated")
+        return self.client
+
+    async def _discover_browser(self) -> Optional[str]:
+        """Locate a usable Chromium/Chrome/Edge executable, installing Chromium if needed"""
         from playwright.async_api import async_playwright
         
         # Detect browser executable path
@@ -311,7 +894,8 @@ class NotebookManager:
                             startupinfo = subprocess.STARTUPINFO()
                             startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
                             
-                        subprocess.run(install_cmd, env=driver_env, check=True, startupinfo=startupinfo)
+                        # Run off the event loop so the API stays responsive during install
+                        await asyncio.to_thread(subprocess.run, install_cmd, env=driver_env, check=True, startupinfo=startupinfo)
                         print("Browser installation completed successfully.")
                         
                         # Search again after installation
@@ -333,6 +917,21 @@ class NotebookManager:
                     print(f"Warning: Could not detect browser path via API: {e}")
                     browser_executable = None
         
+        return browser_executable
+
+    async def _launch_browser(self, headless=True):
+        """Launch browser with persistent context to save login state"""
+        from playwright.async_api import async_playwright
+        
+        # Reuse the previously validated executable and launch args when unchanged on disk
+        cached = browser_config.get_valid()
+        if cached:
+            browser_executable = cached["executable_path"]
+            print(f"Using cached browser config: {browser_executable} ({cached.get('version')})")
+        else:
+            browser_executable = await self._discover_browser()
+        launch_options = (cached or {}).get("launch_args") or DEFAULT_LAUNCH_OPTIONS
+        
         if self.playwright: 
             await self.playwright.stop()
 
@@ -352,21 +951,18 @@ class NotebookManager:
             launch_args = {
                 "user_data_dir": user_data_dir,
                 "headless": headless,
-                "args": [
-                    "--disable-blink-features=AutomationControlled",
-                    "--no-sandbox", 
-                    "--disable-infobars"
-                ],
-                "ignore_default_args": ["--enable-automation"],
-                "user_agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-                "viewport": {"width": 1280, "height": 720}
+                **copy.deepcopy(launch_options)
             }
             
+            if headless and self.lean_mode:
+                launch_args["args"] = launch_args.get("args", []) + LEAN_CHROMIUM_ARGS
+            
             # Add executable_path if we found one
             if browser_executable and os.path.exists(browser_executable):
                 launch_args["executable_path"] = browser_executable
             
             self.context = await self.playwright.chromium.launch_persistent_context(**launch_args)
+            self.browser_executable = launch_args.get("executable_path") or self.playwright.chromium.executable_path
             
             # Stealth scripts
             await self.context.add_init_script("""
@@ -376,14 +972,54 @@ class NotebookManager:
             """)
             
             self.page = self.context.pages[0] if self.context.pages else await self.context.new_page()
+            self.browser_crashed = False
+            self.page.on("crash", self._on_browser_crash)
             
         except Exception as e:
             print(f"Error launching browser: {e}")
             if self.playwright: await self.playwright.stop()
+            self.playwright = None
+            if cached:
+                # The cached config no longer works: forget it and re-discover once
+                print("Cached browser config failed, re-discovering browser...")
+                browser_config.clear()
+                return await self._launch_browser(headless=headless)
             raise e
 
-    async def _initialize_client(self):
-        """Initialize NotebookLM client with current browser session"""
+        # Remember what worked so the next launch can skip discovery
+        if not cached and browser_executable and os.path.exists(browser_executable):
+            browser_config.save(browser_executable, launch_options)
+
+    async def _block_heavy_resources(self, route):
+        request = route.request
+        if request.resource_type in BLOCKED_RESOURCE_TYPES or any(p in request.url for p in BLOCKED_URL_PATTERNS):
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def _enable_lean_routing(self):
+        """Block resources the token scrape doesn't need (headless lean mode only)"""
+        if self.lean_mode and self.context:
+            await self.context.route("**/*", self._block_heavy_resources)
+
+    async def _trim_after_token_capture(self):
+        """Release the web app once tokens are captured; API calls only need the context"""
+        if not self.lean_mode or not self.context:
+            return
+        try:
+            await self.context.unroute("**/*", self._block_heavy_resources)
+            for page in list(self.context.pages):
+                if page is not self.page:
+                    await page.close()
+            await self.page.goto("about:blank")
+            rss = browser_rss_bytes(self.browser_executable)
+            if rss is not None:
+                print(f"Browser trimmed after token capture, RSS: {rss / (1024 * 1024):.1f} MB")
+        except Exception as e:
+            print(f"Warning: Failed to trim browser after token capture: {e}")
+
+    async def _extract_tokens(self) -> Optional[AuthTokens]:
+        """Build AuthTokens from the page currently loaded in the browser"""
         print("Extracting tokens from page...")
         content = await self.page.content()
         current_url = self.page.url
@@ -399,35 +1035,407 @@ class NotebookManager:
             session_id = extract_session_id_from_html(content, current_url)
         except Exception as e:
             print(f"Token extraction failed: {e}")
+            return None
+
+        return AuthTokens(cookies=cookie_dict, csrf_token=csrf_token, session_id=session_id)
+
+    async def _initialize_client(self):
+        """Initialize NotebookLM client with current browser session"""
+        auth = await self._extract_tokens()
+        if not auth:
             return False
 
         print("Initializing NotebookLM Client...")
-        self.auth = AuthTokens(cookies=cookie_dict, csrf_token=csrf_token, session_id=session_id)
+        self.auth = auth
         self.client = NotebookLMClient(auth=self.auth)
+        self.tokens_refreshed_at = time.time()
         
         # Inject Playwright HTTP Client
-        pw_http_client = PlaywrightHttpClient(self.page.context.request)
-        self.client._core._http_client = pw_http_client
+        await self._bind_http_client()
 
         # CRITICAL: Save storage state to the library's expected location
         # This fixes download methods (audio/video/etc.) which look for this file
+        await self._save_storage_state()
+
+        return True
+
+    async def _bind_http_client(self):
+        """Route the client's RPCs through the browser context's request client"""
+        previous = getattr(self.client._core, "_http_client", None)
+        pw_http_client = PlaywrightHttpClient(
+            self.context.request,
+            on_auth_error=self._refresh_after_auth_error,
+            before_request=self._before_rpc,
+            after_request=self._after_rpc,
+            recorder=self.recorder,
+            current_auth=lambda: self.auth
+        )
+        self.client._core._http_client = pw_http_client
+        self.transport = "browser"
+        if previous is not None and not isinstance(previous, PlaywrightHttpClient):
+            try:
+                await previous.aclose()
+            except Exception:
+                pass
+
+    def _auth_secrets(self) -> List[str]:
+        """Token and cookie values the cassette recorder must scrub"""
+        if not self.auth:
+            return []
+        return [self.auth.csrf_token, self.auth.session_id, *(self.auth.cookies or {}).values()]
+
+    async def _connect_replay(self) -> bool:
+        """Serve RPCs from a recorded cassette instead of Google (NOTEBOOKLM_REPLAY)"""
+        self.auth = AuthTokens(cookies={"SID": "REDACTED"}, csrf_token="REDACTED", session_id="REDACTED")
+        http = PlaywrightHttpClient(self.replay)
         try:
-            storage_path = Path.home() / ".notebooklm" / "storage_state.json"
-            storage_path.parent.mkdir(parents=True, exist_ok=True)
-            await self.context.storage_state(path=str(storage_path))
-            print(f"Saved storage state to {storage_path}")
+            client = NotebookLMClient(auth=self.auth)
+            if hasattr(client, "_core"):
+                if hasattr(client, "__aenter__"):
+                    await client.__aenter__()
+                client._core._http_client = http
+            else:
+                # notebooklm-py releases without the _core hook: speak batchexecute through the stand-in client
+                from fake_notebooklm import StandInClient
+                client = StandInClient(http, csrf_token=self.auth.csrf_token, session_id=self.auth.session_id)
+        except Exception as e:
+            self._set_phase("failed", f"replay_unavailable: {e}")
+            return False
+        self.client = client
+        self.transport = "replay"
+        self._set_phase("ready")
+        return True
+
+    def _get_rpc_gate(self) -> asyncio.Event:
+        if self._rpc_gate is None:
+            self._rpc_gate = asyncio.Event()
+            self._rpc_gate.set()
+        return self._rpc_gate
+
+    async def _before_rpc(self):
+        """Track activity and relaunch the browser if it was hibernated"""
+        await self._get_rpc_gate().wait()
+        self.last_activity = time.time()
+        self.inflight_rpcs += 1
+        try:
+            if self.context is None:
+                await self._resume_browser()
+        except Exception:
+            self.inflight_rpcs -= 1
+            raise
+        return self.context.request
+
+    def _after_rpc(self):
+        self.inflight_rpcs -= 1
+        self.last_activity = time.time()
+
+    def _get_browser_lock(self) -> asyncio.Lock:
+        if self._browser_lock is None:
+            self._browser_lock = asyncio.Lock()
+        return self._browser_lock
+
+    async def hibernate(self):
+        """Close the browser context and driver while keeping cookies and tokens"""
+        async with self._get_browser_lock():
+            if not self.context or self.inflight_rpcs > 0:
+                return False
+
+            # Hold new RPCs at the gate so none picks up a request object from the closing context
+            gate = self._get_rpc_gate()
+            gate.clear()
+            try:
+                # An RPC that passed the gate just before it closed counts as in flight by now
+                await asyncio.sleep(0)
+                if self.inflight_rpcs > 0:
+                    return False
+
+                rss_before = browser_rss_bytes(self.browser_executable)
+                # Persist the cookie jar so the relaunched profile (and fast start) can reuse it
+                await self._save_storage_state()
+                try:
+                    await self.context.close()
+                except Exception as e:
+                    print(f"Warning: Error closing browser context: {e}")
+                if self.playwright:
+                    try:
+                        await self.playwright.stop()
+                    except Exception as e:
+                        print(f"Warning: Error stopping Playwright: {e}")
+                self.context = None
+                self.page = None
+                self.playwright = None
+                self.hibernated = True
+
+                rss_idle = browser_rss_bytes(self.browser_executable)
+                stats = self.hibernation_stats
+                stats["count"] += 1
+                stats["rss_before_mb"] = round(rss_before / (1024 * 1024), 1) if rss_before is not None else None
+                stats["rss_idle_mb"] = round(rss_idle / (1024 * 1024), 1) if rss_idle is not None else None
+                print(f"Browser hibernated after {time.time() - self.last_activity:.0f}s idle "
+                      f"(RSS {stats['rss_before_mb']} MB -> {stats['rss_idle_mb']} MB)")
+                return True
+            finally:
+                gate.set()
+
+    async def _resume_browser(self):
+        """Relaunch the hibernated browser; the profile's cookies carry the session"""
+        async with self._get_browser_lock():
+            if self.context is not None:
+                return
+            started = time.time()
+            print("Resuming hibernated browser...")
+            await self._launch_browser(headless=True)
+            self.hibernated = False
+            resume_s = round(time.time() - started, 3)
+            self.hibernation_stats["resume_count"] += 1
+            self.hibernation_stats["last_resume_s"] = resume_s
+            print(f"Browser resumed in {resume_s}s")
+
+        # Tokens may have aged out while we slept; refresh before the RPC goes out
+        if self.tokens_refreshed_at and time.time() - self.tokens_refreshed_at >= TOKEN_REFRESH_INTERVAL:
+            await self.refresh_tokens(reason="resume")
+
+    def _on_browser_crash(self, *args):
+        print("Browser page crashed or context closed unexpectedly")
+        self.browser_crashed = True
+
+    async def is_browser_alive(self) -> bool:
+        """Cheap liveness probe of the headless page"""
+        if self.context is None or self.page is None or self.browser_crashed:
+            return False
+        try:
+            await asyncio.wait_for(self.page.evaluate("1"), timeout=5)
+            return True
+        except Exception:
+            return False
+
+    async def recycle_browser(self, reason: str, drain_timeout: float = 30.0) -> float:
+        """Relaunch the browser between requests, draining in-flight RPCs first.
+
+        Returns the time taken in seconds.
+        """
+        gate = self._get_rpc_gate()
+        gate.clear()
+        started = time.time()
+        try:
+            # Let in-flight RPCs finish before pulling the context out from under them
+            deadline = started + drain_timeout
+            while self.inflight_rpcs > 0 and time.time() < deadline:
+                await asyncio.sleep(0.1)
+            if self.inflight_rpcs > 0:
+                print(f"Recycling with {self.inflight_rpcs} RPCs still in flight after {drain_timeout}s")
+
+            async with self._get_browser_lock():
+                print(f"Recycling browser ({reason})...")
+                if self.context:
+                    try:
+                        await self.context.close()
+                    except Exception as e:
+                        print(f"Warning: Error closing browser context: {e}")
+                if self.playwright:
+                    try:
+                        await self.playwright.stop()
+                    except Exception as e:
+                        print(f"Warning: Error stopping Playwright: {e}")
+                self.context = None
+                self.page = None
+                self.playwright = None
+
+                await self._launch_browser(headless=True)
+                self.hibernated = False
+                if self.client:
+                    await self._bind_http_client()
+        finally:
+            gate.set()
+
+        duration = time.time() - started
+        print(f"Browser recycled in {duration:.2f}s")
+        return duration
+
+    def start_idle_monitor(self):
+        if self.idle_timeout <= 0:
+            return
+        if self._idle_task is None or self._idle_task.done():
+            self._idle_task = asyncio.create_task(self._idle_monitor_loop())
+
+    async def _idle_monitor_loop(self):
+        while True:
+            await asyncio.sleep(IDLE_CHECK_INTERVAL)
+            if (self.context and self.transport == "browser" and self.inflight_rpcs == 0
+                    and time.time() - self.last_activity >= self.idle_timeout):
+                try:
+                    await self.hibernate()
+                except Exception as e:
+                    print(f"Hibernation failed: {e}")
+
+    async def _save_storage_state(self):
+        try:
+            STORAGE_STATE_PATH.parent.mkdir(parents=True, exist_ok=True)
+            await self.context.storage_state(path=str(STORAGE_STATE_PATH))
+            print(f"Saved storage state to {STORAGE_STATE_PATH}")
         except Exception as e:
             print(f"Warning: Failed to save storage state: {e}")
+        self._save_token_cache()
+
+    def _token_cache_snapshot(self) -> Dict[str, Any]:
+        return {
+            "csrf_token": self.auth.csrf_token,
+            "session_id": self.auth.session_id,
+            "saved_at": self.tokens_refreshed_at or time.time()
+        }
+
+    def _save_token_cache(self):
+        if not self.auth:
+            return
+        try:
+            self._token_saver.request()
+        except Exception as e:
+            print(f"Warning: Failed to save token cache: {e}")
 
+    def _load_persisted_auth(self) -> Optional[AuthTokens]:
+        """Rebuild AuthTokens from storage_state.json cookies and the cached tokens"""
+        if not STORAGE_STATE_PATH.exists() or not TOKEN_CACHE_PATH.exists():
+            return None
+        try:
+            tokens = json.loads(TOKEN_CACHE_PATH.read_text(encoding="utf-8"))
+            if time.time() - tokens.get("saved_at", 0) > TOKEN_CACHE_MAX_AGE:
+                print("Cached tokens too old for fast start.")
+                return None
+            state = json.loads(STORAGE_STATE_PATH.read_text(encoding="utf-8"))
+            cookies = {
+                c["name"]: c["value"] for c in state.get("cookies", [])
+                if "google" in c.get("domain", "")
+            }
+            if not cookies or not tokens.get("csrf_token"):
+                return None
+            self.tokens_refreshed_at = tokens["saved_at"]
+            return AuthTokens(cookies=cookies, csrf_token=tokens["csrf_token"], session_id=tokens["session_id"])
+        except Exception as e:
+            print(f"Failed to load persisted session: {e}")
+            return None
+
+    async def _connect_from_persisted_tokens(self) -> bool:
+        """Fast start: validate persisted tokens with one RPC instead of loading the web app"""
+        auth = await run_io(self._load_persisted_auth)
+        if not auth:
+            return False
+
+        started = time.time()
+        client = NotebookLMClient(auth=auth)
+        try:
+            if hasattr(client, "__aenter__"):
+                await client.__aenter__()
+            # The validation call doubles as the first notebook listing
+            notebooks = await client.notebooks.list()
+        except Exception as e:
+            print(f"Fast start validation failed, falling back to browser: {e}")
+            try:
+                if hasattr(client, "__aexit__"):
+                    await client.__aexit__(None, None, None)
+            except Exception:
+                pass
+            self.tokens_refreshed_at = None
+            return False
+
+        self.auth = auth
+        self.client = client
+        self.transport = "http"
+        self._prefetched_notebooks = notebooks
+        self._prefetched_at = time.time()
+        print(f"Fast start: session validated in {time.time() - started:.2f}s ({len(notebooks)} notebooks)")
         return True
 
+    async def refresh_tokens(self, reason: str = "scheduled"):
+        """Re-scrape CSRF/session tokens with the existing page and swap them on the live client.
+
+        Returns (old_auth, new_auth) on success, None otherwise. Concurrent callers
+        share a single refresh.
+        """
+        if self._token_lock is None:
+            self._token_lock = asyncio.Lock()
+        seen_auth = self.auth
+
+        async with self._token_lock:
+            if self.auth is not seen_auth:
+                # Someone else refreshed while we waited
+                return (seen_auth, self.auth)
+            if not self.client:
+                return None
+            if not self.context or not self.page:
+                # Fast-start session without a browser: launch one to re-scrape tokens
+                try:
+                    await self._launch_browser(headless=True)
+                    self.hibernated = False
+                except Exception as e:
+                    print(f"Token refresh error: could not launch browser: {e}")
+                    return None
+
+            started = time.time()
+            print(f"Refreshing session tokens ({reason})...")
+            try:
+                await self._enable_lean_routing()
+                await self.page.goto(NOTEBOOKLM_URL, wait_until="domcontentloaded")
+                if "accounts.google.com" in self.page.url:
+                    print("Token refresh failed: session expired, login required.")
+                    self._set_phase("failed", "login_required")
+                    return None
+                new_auth = await self._extract_tokens()
+            except Exception as e:
+                print(f"Token refresh error: {e}")
+                return None
+            finally:
+                await self._trim_after_token_capture()
+
+            if not new_auth:
+                return None
+
+            # Single attribute swaps: requests already in flight keep their
+            # prepared tokens, new requests pick up the new ones
+            old_auth = self.auth
+            self.auth = new_auth
+            if hasattr(self.client, "_core"):
+                self.client._core.auth = new_auth
+            self.tokens_refreshed_at = time.time()
+            if self.transport != "browser":
+                await self._bind_http_client()
+            print(f"Session tokens refreshed in {time.time() - started:.2f}s")
+
+        await self._save_storage_state()
+        return (old_auth, new_auth)
+
+    async def _refresh_after_auth_error(self):
+        return await self.refresh_tokens(reason="auth error")
+
+    def start_token_refresher(self):
+        """Keep the session alive and refresh tokens ahead of expiry in the background"""
+        if self._refresher_task is None or self._refresher_task.done():
+            self._refresher_task = asyncio.create_task(self._token_refresh_loop())
+
+    async def _token_refresh_loop(self):
+        while True:
+            await asyncio.sleep(TOKEN_CHECK_INTERVAL)
+            if not self.client or not self.tokens_refreshed_at or self.hibernated:
+                # A hibernated session refreshes on resume instead of waking the browser
+                continue
+            if time.time() - self.tokens_refreshed_at >= TOKEN_REFRESH_INTERVAL:
+                try:
+                    await self.refresh_tokens()
+                except Exception as e:
+                    print(f"Background token refresh failed: {e}")
+
     async def login_with_playwright(self):
         """Interactive login with persistent context"""
+        # Let a background auto-connect finish before touching the browser profile
+        if self._connect_task and not self._connect_task.done():
+            await asyncio.shield(self._connect_task)
+
         # Close existing headless session if any
         if self.context:
             await self.context.close()
             
+        self._set_phase("launching")
         await self._launch_browser(headless=False)
+        self._set_phase("authenticating")
         
         print("Navigating to NotebookLM...")
         await self.page.goto("https://notebooklm.google.com/")
@@ -462,34 +1470,56 @@ class NotebookManager:
                 
                 # Navigate to site to restore session/tokens
                 print("Navigating to restore session...")
+                await self._enable_lean_routing()
                 try:
                     await self.page.goto("https://notebooklm.google.com/")
                     await self.page.wait_for_url("https://notebooklm.google.com/", timeout=60000, wait_until="domcontentloaded")
                     await self.page.wait_for_timeout(2000) # Wait for hydration
                 except Exception as e:
                     print(f"Error restoring session navigation: {e}")
+                    self._set_phase("failed", str(e))
                     return False
                 
                 # Re-bind client to new headless context
                 if await self._initialize_client():
                     print("Headless session initialized successfully.")
+                    await self._trim_after_token_capture()
+                    self._set_phase("ready")
+                    self.start_token_refresher()
+                    self.start_idle_monitor()
                     return True
                 else:
                     print("Failed to initialize headless session.")
+                    self._set_phase("failed", "token_extraction_failed")
                     return False
             else:
+                self._set_phase("failed", "token_extraction_failed")
                 return False
                 
         except Exception as e:
             print(f"Login failed or timed out: {e}")
+            self._set_phase("failed", str(e))
             return False
 
     async def try_auto_connect(self):
         """Try to auto-connect using persistent profile"""
+        if self.replay:
+            return await self._connect_replay()
+        if self.fast_start:
+            self._set_phase("authenticating")
+            if await self._connect_from_persisted_tokens():
+                self._set_phase("ready")
+                self.start_token_refresher()
+                self.start_idle_monitor()
+                return True
+
         print("Attempting auto-connect with persistent profile...")
         try:
+            self._set_phase("launching")
             await self._launch_browser(headless=True)
             
+            self._set_phase("authenticating")
+            await self._enable_lean_routing()
             print("Navigating to check session...")
             await self.page.goto("https://notebooklm.google.com/")
             await self.page.wait_for_timeout(2000)
@@ -498,15 +1528,21 @@ class NotebookManager:
                 print("Auto-connect failed: Redirected to login page.")
                 await self.context.close()
                 self.context = None
+                self._set_phase("failed", "login_required")
                 return False
                 
             print("Session appears valid.")
             if await self._initialize_client():
                 print("Auto-connect successful!")
+                await self._trim_after_token_capture()
+                self._set_phase("ready")
+                self.start_token_refresher()
+                self.start_idle_monitor()
                 return True
             else:
                 await self.context.close()
                 self.context = None
+                self._set_phase("failed", "token_extraction_failed")
                 return False
                 
         except Exception as e:
@@ -514,6 +1550,7 @@ class NotebookManager:
             if self.context:
                 await self.context.close()
             self.context = None
+            self._set_phase("failed", str(e))
             return False
 
     # Compatibility method (less used now)
@@ -521,19 +1558,24 @@ class NotebookManager:
         print("Manual login deprecated in favor of Playwright flow")
         return False
 
+    @instrumented
     async def list_notebooks(self) -> List[Notebook]:
-        if not self.client:
-            await self.try_auto_connect()
-        if not self.client:
-            raise Exception("Not authenticated")
+        await self._require_client()
+        # Serve the listing fetched while validating a fast start
+        if self._prefetched_notebooks is not None:
+            notebooks, self._prefetched_notebooks = self._prefetched_notebooks, None
+            if time.time() - self._prefetched_at < PREFETCH_MAX_AGE:
+                return notebooks
         return await self.client.notebooks.list()
 
+    @instrumented
     async def create_notebook(self, title: str) -> Notebook:
-        if not self.client: raise Exception("Not authenticated")
+        await self._require_client()
         return await self.client.notebooks.create(title)
 
+    @instrumented
     async def rename_notebook(self, notebook_id: str, new_title: str):
-        if not self.client: raise Exception("Not authenticated")
+        await self._require_client()
         # Try finding the correct method on the client
         # Assuming typical REST-like method structure
         if hasattr(self.client.notebooks, 'rename'):
@@ -544,39 +1586,54 @@ class NotebookManager:
             # Fallback: Raise error if not supported, or let's try direct call
              await self.client.notebooks.rename(notebook_id, new_title)
 
+    @instrumented
     async def delete_notebook(self, notebook_id: str):
-        if not self.client: raise Exception("Not authenticated")
+        await self._require_client()
         # If we act on current notebook, clear selection
         if self.current_notebook_id == notebook_id:
             self.current_notebook_id = None
         await self.client.notebooks.delete(notebook_id)
 
+    @instrumented
     async def add_source_url(self, notebook_id: str, url: str):
-        if not self.client: raise Exception("Not authenticated")
-        return await self.client.sources.add_url(notebook_id, url)
+        await self._require_client()
+        source = await self.client.sources.add_url(notebook_id, url)
+        # The source set changed; the next generation fingerprint must re-list
+        summary_service.known_sources.pop(notebook_id, None)
+        return source
 
+    @instrumented
     async def add_source_text(self, notebook_id: str, title: str, content: str):
-        if not self.client: raise Exception("Not authenticated")
-        return await self.client.sources.add_text(notebook_id, title, content)
+        await self._require_client()
+        source = await self.client.sources.add_text(notebook_id, title, content)
+        summary_service.known_sources.pop(notebook_id, None)
+        return source
 
+    @instrumented
     async def add_source_file(self, notebook_id: str, file_path: str):
-        if not self.client: raise Exception("Not authenticated")
-        return await self.client.sources.add_file(notebook_id, file_path)
+        await self._require_client()
+        source = await self.client.sources.add_file(notebook_id, file_path)
+        summary_service.known_sources.pop(notebook_id, None)
+        return source
 
+    @instrumented
     async def delete_source(self, notebook_id: str, source_id: str):
-        if not self.client: raise Exception("Not authenticated")
+        await self._require_client()
         await self.client.sources.delete(notebook_id, source_id)
+        summary_service.invalidate(notebook_id, source_id)
+        summary_service.known_sources.pop(notebook_id, None)
 
     def set_notebook(self, notebook_id: str):
         self.current_notebook_id = notebook_id
 
-    async def get_sources(self) -> List[Dict[str, Any]]:
-        if not self.client:
-            raise Exception("Not authenticated")
-        if not self.current_notebook_id:
+    @instrumented
+    async def get_sources(self, notebook_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        await self._require_client()
+        notebook_id = notebook_id or self.current_notebook_id
+        if not notebook_id:
             raise Exception("No notebook selected")
             
-        sources = await self.client.sources.list(self.current_notebook_id)
+        sources = await self.client.sources.list(notebook_id)
         print(f"DEBUG: Found {len(sources)} sources")
         
         # Serialize to dicts
@@ -608,10 +1665,13 @@ class NotebookManager:
                     "title": s.title,
                     "type": "ERROR"
                 })
+        summary_service.sync_sources(notebook_id, serialized)
         return serialized
     
+    @instrumented
     async def get_source_content(self, source_id: str) -> Dict[str, Any]:
-        if not self.client or not self.current_notebook_id:
+        await self._require_client()
+        if not self.current_notebook_id:
             raise Exception("not_authenticated_or_selected")
         
         fulltext = await self.client.sources.get_fulltext(self.current_notebook_id, source_id)
@@ -622,38 +1682,46 @@ class NotebookManager:
             "char_count": fulltext.char_count
         }
 
-    async def generate_source_summary(self, notebook_id: str, source_id: str) -> str:
-        """Generate a summary and key topics for a specific source using the AI"""
-        self.set_notebook(notebook_id)
-        if not self.client: raise Exception("Not authenticated")
-        
-        # 1. Find source title
-        sources = await self.get_sources()
-        target_source = next((s for s in sources if s['id'] == source_id), None)
-        
-        if not target_source:
-            print(f"Error: Source ID {source_id} not found in {len(sources)} sources")
-            raise Exception(f"Source with ID {source_id} not found")
-            
-        title = target_source['title']
-        print(f"Found target source: {title}")
-        
-        # 2. Query AI
-        prompt = (
-            f"Please analyze the source document titled '{title}'. "
-            f"Provide a concise summary (2-3 sentences) and list 3-5 key topics. "
-            f"Structure your response strictly with '## Summary' followed by the summary, and '## Key Topics' followed by the list. "
-            f"Focus ONLY on this source."
-        )
-        
-        print(f"Sending prompt for summary: {prompt[:50]}...")
-        summary = await self.query(prompt)
-        print(f"Summary generated, length: {len(summary)}")
+    @instrumented
+    async def generate_source_summary(self, notebook_id: str, source_id: str, force: bool = False) -> str:
+        """Get the summary and key topics for a specific source (cached, not added to chat history)"""
+        await self._require_client()
+
+        cached = None if force else summary_service.get_cached(notebook_id, source_id)
+        if cached is not None:
+            return cached
+
+        # Only list sources when we have never seen this one (the listing also
+        # invalidates summaries of sources that changed)
+        if source_id not in summary_service.known_sources.get(notebook_id, {}):
+            sources = await self.get_sources(notebook_id)
+            if not any(s['id'] == source_id for s in sources):
+                print(f"Error: Source ID {source_id} not found in {len(sources)} sources")
+                raise Exception(f"Source with ID {source_id} not found")
+
+        summary = await summary_service.get_summary(self.client, notebook_id, source_id, force=force)
+        print(f"Summary ready, length: {len(summary)}")
         return summary
 
+    async def get_source_fingerprint(self, notebook_id: str) -> str:
+        """Fingerprint of the notebook's current sources, used to key generation requests"""
+        sources = summary_service.known_sources.get(notebook_id)
+        if sources is None:
+            await self.get_sources(notebook_id)
+            sources = summary_service.known_sources.get(notebook_id, {})
+        return generation_dedup.source_fingerprint(sources, summary_service.fingerprint)
+
+    @instrumented
+    async def summarize_sources(self, notebook_id: str, source_ids: Optional[List[str]] = None, force: bool = False) -> Dict[str, Any]:
+        """Summarize many or all sources of a notebook with bounded concurrency"""
+        await self._require_client()
+        if source_ids is None or notebook_id not in summary_service.known_sources:
+            await self.get_sources(notebook_id)
+        return await summary_service.summarize_sources(self.client, notebook_id, source_ids, force=force)
+
+    @instrumented
     async def query(self, prompt: str):
-        if not self.client:
-            raise Exception("Not authenticated")
+        await self._require_client()
         if not self.current_notebook_id:
             raise Exception("No notebook selected")
         
@@ -675,15 +1743,15 @@ class NotebookManager:
         self.add_message(self.current_notebook_id, "ai", answer_text)
         return answer_text
 
+    @instrumented
     async def get_suggested_questions(self, notebook_id: str) -> List[str]:
         """Get AI-generated suggested questions for a notebook"""
         if not self.client:
-            print("get_suggested_questions: No client, attempting to connect...")
-            # Try to auto-connect if not already connected
-            await self.try_auto_connect()
+            print("get_suggested_questions: No client, waiting for connection...")
+            await self.wait_until_ready()
             
         if not self.client:
-            print("get_suggested_questions: Still no client after auto-connect attempt")
+            print("get_suggested_questions: Still no client after waiting for connection")
             return []
             
         try:
@@ -702,10 +1770,10 @@ class NotebookManager:
             traceback.print_exc()
             return []
 
+    @instrumented
     async def stream_query(self, prompt: str):
         """Stream the response from NotebookLM in real-time (simulated)"""
-        if not self.client:
-            raise Exception("Not authenticated")
+        await self._require_client()
         if not self.current_notebook_id:
             raise Exception("No notebook selected")
             
@@ -756,131 +1824,109 @@ class NotebookManager:
             self.add_message(notebook_id, "ai", error_msg)
 
     # Generation methods using NotebookLM Artifacts API
-    async def generate_audio(self, instructions: str = "make it engaging") -> str:
+    # Each returns {"path", "artifact", "data"}; data is the parsed JSON or text for text artifacts
+
+    async def _store_download(self, notebook_id: str, type: str, temp_path: str, ext: str, title: str, details: Dict) -> Dict[str, Any]:
+        """Store a finished download once and add it to the catalog"""
+        if ext not in TEXT_ARTIFACT_EXTS:
+            # Binary media is moved into place without being read
+            stored = await artifact_store.commit_file(notebook_id, type, temp_path, ext)
+            artifact = self.add_artifact(notebook_id, type, title, {**stored, **details})
+            return {"path": stored["path"], "artifact": artifact, "data": None}
+
+        def read_once():
+            raw = Path(temp_path).read_bytes()
+            os.remove(temp_path)
+            return raw
+
+        processed = process_download(await run_io(read_once), ext)
+        return await self._store_processed(notebook_id, type, processed, ext, title, details)
+
+    async def _store_processed(self, notebook_id: str, type: str, processed: Dict[str, Any], ext: str, title: str, details: Dict) -> Dict[str, Any]:
+        with tracer.span("generation.store", type=type, bytes=len(processed["data"])):
+            stored = await artifact_store.store_bytes(notebook_id, type, processed["data"], ext)
+        # The first view is served from memory instead of re-reading what was just written
+        content_cache.prime(stored["path"], decode_text(processed["data"]), stored["hash"], processed["parsed"] if ext == ".json" else None)
+        artifact = self.add_artifact(notebook_id, type, processed["title"] or title,
+                                     {**stored, **processed["metadata"], **details})
+        return {"path": stored["path"], "artifact": artifact, "data": processed["parsed"]}
+
+    @instrumented
+    async def generate_audio(self, instructions: str = "make it engaging", notebook_id: Optional[str] = None) -> Dict[str, Any]:
         """Generate podcast audio using NotebookLM's audio generation"""
-        if not self.client or not self.current_notebook_id:
-            raise Exception("Not authenticated or no notebook selected")
+        # Pinned before any await so a notebook switch meanwhile can't redirect the generation
+        notebook_id = notebook_id or self.current_notebook_id
+        await self._require_client()
+        if not notebook_id:
+            raise Exception("No notebook selected")
         
-        print(f"Generating audio for notebook {self.current_notebook_id}...")
-        status = await self.client.artifacts.generate_audio(
-            self.current_notebook_id, 
-            instructions=instructions
-        )
+        print(f"Generating audio for notebook {notebook_id}...")
+        with tracer.span("generation.submit", type="audio"):
+            status = await self.client.artifacts.generate_audio(
+                notebook_id, 
+                instructions=instructions
+            )
         
         print(f"Waiting for audio generation (task_id: {status.task_id})...")
-        await self.client.artifacts.wait_for_completion(
-            self.current_notebook_id, 
-            status.task_id,
-            timeout=900
-        )
-        
-        filename = "podcast.mp3"
-        print(f"Downloading audio to {filename}...")
-        await self.client.artifacts.download_audio(
-            self.current_notebook_id, 
-            filename
-        )
-        
-        return os.path.abspath(filename)
+        await self.completion_watcher.wait(notebook_id, status.task_id, "audio", timeout=900)
+        
+        temp_path = artifact_store.temp_path(".mp3")
+        print(f"Downloading audio to {temp_path}...")
+        with tracer.span("generation.download", type="audio"):
+            await self.client.artifacts.download_audio(
+                notebook_id, 
+                temp_path,
+                artifact_id=status.task_id
+            )
+        
+        return await self._store_download(notebook_id, "audio", temp_path, ".mp3", "Audio Overview",
+                                          {"remote_id": status.task_id, "instructions": instructions})
     
-    async def export_quiz_to_docx(self, quiz_content: str, output_path: str = None) -> str:
-        """Export quiz JSON content to a Word document"""
-        try:
-            quiz_data = json.loads(quiz_content)
-        except json.JSONDecodeError:
-            raise Exception("Invalid quiz content format")
-
-        doc = Document()
-        
-        # Title
-        title_para = doc.add_paragraph()
-        run = title_para.add_run(quiz_data.get("title", "Quiz"))
-        run.bold = True
-        run.font.size = Pt(16)
-        title_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        
-        doc.add_paragraph() # Spacer
-
-        # Questions
-        questions = quiz_data.get("questions", [])
-        for i, q in enumerate(questions):
-            # Question Text
-            q_para = doc.add_paragraph(f"{i+1}. {q.get('question') or q.get('text', '')}")
-            q_para.runs[0].bold = True
-            
-            # Options
-            options = q.get("answerOptions") or q.get("options") or []
-            for opt in options:
-                opt_text = opt.get("text") or opt.get("option", "")
-                is_correct = opt.get("isCorrect", False)
-                
-                # Checkbox style
-                prefix = "[ ] "
-                # if is_correct: prefix = "[x] " # Maybe don't reveal answer in question part?
-                
-                o_para = doc.add_paragraph(f"{prefix}{opt_text}")
-                o_para.paragraph_format.left_indent = Pt(20)
+    async def export_quiz_to_docx(self, quiz_content: str, output_path: str = None, content_hash: str = None) -> str:
+        """Export quiz JSON content to a Word document (rendered off the event loop)"""
+        return await export_service.export(quiz_content, output_path or "quiz_export.docx", "docx", content_hash)
 
-            doc.add_paragraph() # Spacer between questions
-
-        # Answer Key Section (New Page)
-        doc.add_page_break()
-        key_header = doc.add_paragraph("Answer Key")
-        key_header.runs[0].bold = True
-        key_header.runs[0].font.size = Pt(14)
-        
-        for i, q in enumerate(questions):
-            options = q.get("answerOptions") or q.get("options") or []
-            correct_opt = next((opt for opt in options if opt.get("isCorrect")), None)
-            
-            if correct_opt:
-                correct_text = correct_opt.get("text") or correct_opt.get("option", "")
-                rationale = correct_opt.get("rationale", "")
-                
-                p = doc.add_paragraph()
-                p.add_run(f"{i+1}. {correct_text}").bold = True
-                if rationale:
-                    p.add_run(f"\nRationale: {rationale}").italic = True
-                    
-            doc.add_paragraph()
-
-        filename = output_path or "quiz_export.docx"
-        doc.save(filename)
-        return os.path.abspath(filename)
-
-    async def generate_video(self, style: str = "whiteboard") -> str:
+    @instrumented
+    async def generate_video(self, style: str = "whiteboard", notebook_id: Optional[str] = None) -> Dict[str, Any]:
         """Generate video using NotebookLM's video generation"""
-        if not self.client or not self.current_notebook_id:
-            raise Exception("Not authenticated or no notebook selected")
+        # Pinned before any await so a notebook switch meanwhile can't redirect the generation
+        notebook_id = notebook_id or self.current_notebook_id
+        await self._require_client()
+        if not notebook_id:
+            raise Exception("No notebook selected")
         
-        print(f"Generating video for notebook {self.current_notebook_id}...")
-        status = await self.client.artifacts.generate_video(
-            self.current_notebook_id,
-            style=style
-        )
+        print(f"Generating video for notebook {notebook_id}...")
+        with tracer.span("generation.submit", type="video"):
+            status = await self.client.artifacts.generate_video(
+                notebook_id,
+                style=style
+            )
         
         print(f"Waiting for video generation (task_id: {status.task_id})...")
-        await self.client.artifacts.wait_for_completion(
-            self.current_notebook_id,
-            status.task_id,
-            timeout=900
-        )
-        
-        filename = "video.mp4"
-        print(f"Downloading video to {filename}...")
-        await self.client.artifacts.download_video(
-            self.current_notebook_id,
-            filename
-        )
-        
-        return os.path.abspath(filename)
+        await self.completion_watcher.wait(notebook_id, status.task_id, "video", timeout=900)
+        
+        temp_path = artifact_store.temp_path(".mp4")
+        print(f"Downloading video to {temp_path}...")
+        with tracer.span("generation.download", type="video"):
+            await self.client.artifacts.download_video(
+                notebook_id,
+                temp_path,
+                artifact_id=status.task_id
+            )
+        
+        return await self._store_download(notebook_id, "video", temp_path, ".mp4", "Video Overview",
+                                          {"remote_id": status.task_id, "style": style})
     
-    async def generate_quiz(self, difficulty: str = "medium", quantity: str = "standard", instructions: str = None, output_format: str = "json") -> str:
+    @instrumented
+    async def generate_quiz(self, difficulty: str = "medium", quantity: str = "standard", instructions: str = None, output_format: str = "json", notebook_id: Optional[str] = None) -> Dict[str, Any]:
         """Generate quiz using NotebookLM's quiz generation"""
-        if not self.client or not self.current_notebook_id:
-            raise Exception("Not authenticated or no notebook selected")
+        # Pinned before any await so a notebook switch meanwhile can't redirect the generation
+        notebook_id = notebook_id or self.current_notebook_id
+        await self._require_client()
+        if not notebook_id:
+            raise Exception("No notebook selected")
         
-        print(f"Generating quiz for notebook {self.current_notebook_id}...")
+        print(f"Generating quiz for notebook {notebook_id}...")
         
         # Ensure Traditional Chinese is used by default if not specified
         if not instructions:
@@ -903,116 +1949,98 @@ class NotebookManager:
         }
         qty_enum = quantity_map.get(quantity.lower(), QuizQuantity.STANDARD)
         
-        status = await self.client.artifacts.generate_quiz(
-            self.current_notebook_id,
-            difficulty=diff_enum,
-            quantity=qty_enum,
-            instructions=instructions
-        )
+        with tracer.span("generation.submit", type="quiz"):
+            status = await self.client.artifacts.generate_quiz(
+                notebook_id,
+                difficulty=diff_enum,
+                quantity=qty_enum,
+                instructions=instructions
+            )
         
         print(f"Waiting for quiz generation (task_id: {status.task_id})...")
-        await self.client.artifacts.wait_for_completion(
-            self.current_notebook_id,
-            status.task_id,
-            timeout=900
-        )
-        
-        ext = "json" if output_format == "json" else "md"
-        filename = f"quiz.{ext}"
-        print(f"Downloading quiz to {filename}...")
-        await self.client.artifacts.download_quiz(
-            self.current_notebook_id,
-            filename,
-            output_format=output_format
-        )
-        
-        # Post-process the file to ensure it's human-readable (not escaped Unicode)
-        if output_format == "json" and os.path.exists(filename):
-            try:
-                content = json.loads(Path(filename).read_text(encoding="utf-8"))
-                Path(filename).write_text(
-                    json.dumps(content, ensure_ascii=False, indent=2),
-                    encoding="utf-8"
-                )
-                print(f"Optimized {filename} for readability (Trad. Chinese).")
-            except Exception as e:
-                print(f"Warning: Failed to post-process quiz JSON: {e}")
-        
-        abs_path = os.path.abspath(filename)
-        # Try to read title from JSON if available
-        title = "Quiz"
-        try:
-             if output_format == "json" and os.path.exists(filename):
-                 data = json.loads(Path(filename).read_text(encoding="utf-8"))
-                 title = data.get("title", "Quiz")
-        except:
-            pass
-
-        self.add_artifact(self.current_notebook_id, "quiz", title, {"filename": filename, "path": abs_path, "difficulty": difficulty})
-        return abs_path
+        await self.completion_watcher.wait(notebook_id, status.task_id, "quiz", timeout=900)
+        
+        ext = ".json" if output_format == "json" else ".md"
+        temp_path = artifact_store.temp_path(ext)
+        print(f"Downloading quiz to {temp_path}...")
+        with tracer.span("generation.download", type="quiz"):
+            await self.client.artifacts.download_quiz(
+                notebook_id,
+                temp_path,
+                artifact_id=status.task_id,
+                output_format=output_format
+            )
+        
+        # JSON is re-serialized in memory without escaped Unicode so the stored file stays readable
+        return await self._store_download(notebook_id, "quiz", temp_path, ext, "Quiz",
+                                          {"remote_id": status.task_id, "difficulty": difficulty})
     
-    async def generate_mindmap(self) -> str:
+    @instrumented
+    async def generate_mindmap(self, notebook_id: Optional[str] = None) -> Dict[str, Any]:
         """Generate mind map using NotebookLM's mind map generation"""
-        if not self.client or not self.current_notebook_id:
-            raise Exception("Not authenticated or no notebook selected")
+        # Pinned before any await so a notebook switch meanwhile can't redirect the generation
+        notebook_id = notebook_id or self.current_notebook_id
+        await self._require_client()
+        if not notebook_id:
+            raise Exception("No notebook selected")
         
-        print(f"Generating mind map for notebook {self.current_notebook_id}...")
+        print(f"Generating mind map for notebook {notebook_id}...")
         # Unofficial library's generate_mind_map is synchronous and returns a dict with 'mind_map' and 'note_id'
-        data = await self.client.artifacts.generate_mind_map(
-            self.current_notebook_id
-        )
+        with tracer.span("generation.submit", type="mind_map"):
+            data = await self.client.artifacts.generate_mind_map(
+                notebook_id
+            )
         
         mind_map_data = data.get("mind_map")
         if not mind_map_data:
             raise Exception("Failed to generate mind map data")
-            
-        filename = "mindmap.json"
-        print(f"Saving mind map to {filename}...")
         
         # Save the mind map JSON data
-        Path(filename).write_text(
-            json.dumps(mind_map_data, ensure_ascii=False, indent=2),
-            encoding="utf-8"
-        )
-        
-        abs_path = os.path.abspath(filename)
-        self.add_artifact(self.current_notebook_id, "mindmap", "Mind Map", {"filename": filename, "path": abs_path})
-        return abs_path
+        result = await self._store_processed(notebook_id, "mindmap", process_json(mind_map_data), ".json", "Mind Map",
+                                             {"remote_id": data.get("note_id")})
+        print(f"Saved mind map to {result['path']}")
+        return result
     
-    async def generate_slide_deck(self) -> str:
+    @instrumented
+    async def generate_slide_deck(self, notebook_id: Optional[str] = None) -> Dict[str, Any]:
         """Generate slide deck using NotebookLM's slide generation"""
-        if not self.client or not self.current_notebook_id:
-            raise Exception("Not authenticated or no notebook selected")
+        # Pinned before any await so a notebook switch meanwhile can't redirect the generation
+        notebook_id = notebook_id or self.current_notebook_id
+        await self._require_client()
+        if not notebook_id:
+            raise Exception("No notebook selected")
         
-        print(f"Generating slide deck for notebook {self.current_notebook_id}...")
-        status = await self.client.artifacts.generate_slide_deck(
-            self.current_notebook_id
-        )
+        print(f"Generating slide deck for notebook {notebook_id}...")
+        with tracer.span("generation.submit", type="slide_deck"):
+            status = await self.client.artifacts.generate_slide_deck(
+                notebook_id
+            )
         
         print(f"Waiting for slide deck generation (task_id: {status.task_id})...")
-        await self.client.artifacts.wait_for_completion(
-            self.current_notebook_id,
-            status.task_id,
-            timeout=900
-        )
-        
-        filename = "slides.pdf"
-        print(f"Downloading slide deck to {filename}...")
-        await self.client.artifacts.download_slide_deck(
-            self.current_notebook_id,
-            filename
-        )
-        
-        abs_path = os.path.abspath(filename)
-        self.add_artifact(self.current_notebook_id, "slides", "Slide Deck", {"filename": filename, "path": abs_path})
-        return abs_path
+        await self.completion_watcher.wait(notebook_id, status.task_id, "slide_deck", timeout=900)
+        
+        temp_path = artifact_store.temp_path(".pdf")
+        print(f"Downloading slide deck to {temp_path}...")
+        with tracer.span("generation.download", type="slide_deck"):
+            await self.client.artifacts.download_slide_deck(
+                notebook_id,
+                temp_path,
+                artifact_id=status.task_id
+            )
+        
+        return await self._store_download(notebook_id, "slides", temp_path, ".pdf", "Slide Deck",
+                                          {"remote_id": status.task_id})
 
-    async def generate_study_guide(self) -> str:
+    @instrumented
+    async def generate_study_guide(self, notebook_id: Optional[str] = None) -> Dict[str, Any]:
         """Generate study guide using NotebookLM's study guide generation"""
-        if not self.client or not self.current_notebook_id:
-            raise Exception("Not authenticated or no notebook selected")
+        # Pinned before any await so a notebook switch meanwhile can't redirect the generation
+        notebook_id = notebook_id or self.current_notebook_id
+        await self._require_client()
+        if not notebook_id:
+            raise Exception("No notebook selected")
         
-        print(f"Generating study guide for notebook {self.current_notebook_id}...")
+        print(f"Generating study guide for notebook {notebook_id}...")
         
         # Use generate_report with Traditional Chinese prompt and language
         custom_prompt = (
@@ -1023,38 +2051,39 @@ class NotebookManager:
             "- 內容必須嚴謹且準確地反映原始文件。"
         )
         
-        status = await self.client.artifacts.generate_report(
-            self.current_notebook_id,
-            report_format=ReportFormat.STUDY_GUIDE,
-            language="zh-TW",
-            custom_prompt=custom_prompt
-        )
+        with tracer.span("generation.submit", type="report"):
+            status = await self.client.artifacts.generate_report(
+                notebook_id,
+                report_format=ReportFormat.STUDY_GUIDE,
+                language="zh-TW",
+                custom_prompt=custom_prompt
+            )
         
         print(f"Waiting for study guide generation (task_id: {status.task_id})...")
-        await self.client.artifacts.wait_for_completion(
-            self.current_notebook_id,
-            status.task_id,
-            timeout=900
-        )
-        
-        filename = "study_guide.md"
-        print(f"Downloading study guide to {filename}...")
-        await self.client.artifacts.download_report(
-            self.current_notebook_id,
-            filename,
-            artifact_id=status.task_id
-        )
-        
-        abs_path = os.path.abspath(filename)
-        self.add_artifact(self.current_notebook_id, "study_guide", "Study Guide", {"filename": filename, "path": abs_path, "language": "zh-TW"})
-        return abs_path
+        await self.completion_watcher.wait(notebook_id, status.task_id, "report", timeout=900)
+        
+        temp_path = artifact_store.temp_path(".md")
+        print(f"Downloading study guide to {temp_path}...")
+        with tracer.span("generation.download", type="report"):
+            await self.client.artifacts.download_report(
+                notebook_id,
+                temp_path,
+                artifact_id=status.task_id
+            )
+        
+        return await self._store_download(notebook_id, "study_guide", temp_path, ".md", "Study Guide",
+                                          {"remote_id": status.task_id, "language": "zh-TW"})
     
-    async def generate_flashcards(self, quantity: str = "normal", output_format: str = "json") -> str:
+    @instrumented
+    async def generate_flashcards(self, quantity: str = "normal", output_format: str = "json", notebook_id: Optional[str] = None) -> Dict[str, Any]:
         """Generate flashcards using NotebookLM's flashcard generation"""
-        if not self.client or not self.current_notebook_id:
-            raise Exception("Not authenticated or no notebook selected")
+        # Pinned before any await so a notebook switch meanwhile can't redirect the generation
+        notebook_id = notebook_id or self.current_notebook_id
+        await self._require_client()
+        if not notebook_id:
+            raise Exception("No notebook selected")
         
-        print(f"Generating flashcards for notebook {self.current_notebook_id}...")
+        print(f"Generating flashcards for notebook {notebook_id}...")
         
         # Map quantity string to enum
         quantity_map = {
@@ -1064,29 +2093,27 @@ class NotebookManager:
         }
         qty_enum = quantity_map.get(quantity.lower(), QuizQuantity.STANDARD)
         
-        status = await self.client.artifacts.generate_flashcards(
-            self.current_notebook_id,
-            quantity=qty_enum
-        )
+        with tracer.span("generation.submit", type="flashcards"):
+            status = await self.client.artifacts.generate_flashcards(
+                notebook_id,
+                quantity=qty_enum
+            )
         
         print(f"Waiting for flashcards generation (task_id: {status.task_id})...")
-        await self.client.artifacts.wait_for_completion(
-            self.current_notebook_id,
-            status.task_id,
-            timeout=900
-        )
-        
-        ext = "json" if output_format == "json" else "md"
-        filename = f"flashcards.{ext}"
-        print(f"Downloading flashcards to {filename}...")
-        await self.client.artifacts.download_flashcards(
-            self.current_notebook_id,
-            filename,
-            output_format=output_format
-        )
-        
-        abs_path = os.path.abspath(filename)
-        self.add_artifact(self.current_notebook_id, "flashcards", "Flashcards", {"filename": filename, "path": abs_path})
-        return abs_path
+        await self.completion_watcher.wait(notebook_id, status.task_id, "flashcards", timeout=900)
+        
+        ext = ".json" if output_format == "json" else ".md"
+        temp_path = artifact_store.temp_path(ext)
+        print(f"Downloading flashcards to {temp_path}...")
+        with tracer.span("generation.download", type="flashcards"):
+            await self.client.artifacts.download_flashcards(
+                notebook_id,
+                temp_path,
+                artifact_id=status.task_id,
+                output_format=output_format
+            )
+        
+        return await self._store_download(notebook_id, "flashcards", temp_path, ext, "Flashcards",
+                                          {"remote_id": status.task_id})
 
 manager = NotebookManager()
@@ -0,0 +1,247 @@
+import asyncio
+import contextvars
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+# Profile session of the current request/task; inherited by tasks it creates
+active_profile: contextvars.ContextVar[Optional["ProfileSession"]] = contextvars.ContextVar("active_profile", default=None)
+
+_ASYNCIO_EVENTS = os.path.join("asyncio", "events.py")
+# Worker threads parked in these modules are idle, not doing work for anyone
+_IDLE_MODULES = ("threading.py", "queue.py", "selectors.py", os.path.join("concurrent", "futures", "thread.py"))
+
+def _frame_label(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+def _stack(frame) -> List[Any]:
+    frames = []
+    while frame is not None:
+        frames.append(frame)
+        frame = frame.f_back
+    frames.reverse()
+    return frames
+
+class ProfileSession:
+    """Samples collected for one request (and the tasks it spawns) or one background task"""
+
+    def __init__(self, label: str, max_seconds: float):
+        self.label = label
+        self.started = time.time()
+        self.deadline = self.started + max_seconds
+        safe = re.sub(r"[^A-Za-z0-9_.-]+", "_", label).strip("_")[:60] or "profile"
+        # Short random suffix: captures of the same endpoint can start within one second
+        self.name = f"{time.strftime('%Y%m%d-%H%M%S', time.localtime(self.started))}-{safe}-{uuid.uuid4().hex[:6]}.folded"
+        self.samples: Counter = Counter()
+        self.loop_samples = 0
+        self.worker_samples = 0
+        self.tasks: set = set()
+        self.owner_done = False
+        self.finished_at: Optional[float] = None
+
+    def track(self, task: asyncio.Task):
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    @property
+    def done(self) -> bool:
+        if self.finished_at is not None:
+            return True
+        return (self.owner_done and not self.tasks) or time.time() > self.deadline
+
+class SamplingProfiler:
+    """On-demand sampling profiler writing flamegraph "folded" stacks.
+
+    A sampler thread reads sys._current_frames() every `interval` seconds.
+    Event-loop samples count only while a task belonging to a session is
+    running, so concurrent requests don't pollute each other's profile; busy
+    executor threads (file I/O, exports) are added to every active session
+    under their thread name. Time spent awaiting upstream RPCs does not show
+    up here (the loop is idle then); tracing covers that.
+
+    Files go to <backend.log dir>/profiles and open in speedscope,
+    flamegraph.pl or inferno.
+    """
+
+    def __init__(self, interval: float = 0.005, max_seconds: float = 900.0, out_dir: Optional[str] = None):
+        self.interval = interval
+        self.max_seconds = max_seconds
+        self.out_dir = out_dir
+        self.sessions: List[ProfileSession] = []
+        self.captures: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._thread: Optional[threading.Thread] = None
+        self._previous_factory = None
+
+    def get_out_dir(self) -> str:
+        if self.out_dir is None:
+            from file_io import log_dir
+            self.out_dir = os.path.join(log_dir(), "profiles")
+        return self.out_dir
+
+    # --- starting sessions (on the loop) ---
+
+    def _install(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._loop_thread_id = threading.get_ident()
+            self._previous_factory = loop.get_task_factory()
+            loop.set_task_factory(self._task_factory)
+
+    def _task_factory(self, loop, coro, **kwargs):
+        if self._previous_factory is not None:
+            task = self._previous_factory(loop, coro, **kwargs)
+        else:
+            task = asyncio.Task(coro, loop=loop, **kwargs)
+        context = kwargs.get("context")
+        session = context.get(active_profile) if context is not None else active_profile.get()
+        if session is not None and not session.done:
+            session.track(task)
+        return task
+
+    def start(self, label: str) -> ProfileSession:
+        """Start a session and make it current; tasks created from here on join it"""
+        self._install()
+        session = ProfileSession(label, self.max_seconds)
+        active_profile.set(session)
+        with self._lock:
+            self.sessions.append(session)
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+            self._thread.start()
+        print(f"Profiling {label} -> {session.name}")
+        return session
+
+    def stop(self, session: ProfileSession):
+        """The owner is done; the capture is written once the tasks it spawned finish too"""
+        session.owner_done = True
+        active_profile.set(None)
+
+    async def run(self, label: str, coro):
+        """Run a coroutine (a background job) in its own task under a new session"""
+        async def runner():
+            session = self.start(label)
+            try:
+                return await coro
+            finally:
+                self.stop(session)
+        return await asyncio.create_task(runner(), context=contextvars.copy_context())
+
+    # --- sampler thread ---
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                sessions = list(self.sessions)
+            if not sessions:
+                return
+            self._sample(sessions)
+            for session in sessions:
+                if session.done:
+                    self._finish(session)
+
+    def _sample(self, sessions: List[ProfileSession]):
+        me = threading.get_ident()
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == me:
+                continue
+            if thread_id == self._loop_thread_id:
+                self._sample_loop(frame, sessions)
+                continue
+            frames = _stack(frame)
+            if not frames or frames[-1].f_code.co_filename.endswith(_IDLE_MODULES):
+                continue
+            name = names.get(thread_id, str(thread_id))
+            if name in ("loop-watchdog", "span-exporter") or name.startswith("MainThread"):
+                continue
+            key = ";".join([f"[{name}]"] + [_frame_label(f.f_code) for f in frames])
+            for session in sessions:
+                session.samples[key] += 1
+                session.worker_samples += 1
+
+    def _sample_loop(self, frame, sessions: List[ProfileSession]):
+        try:
+            task = asyncio.current_task(self._loop)
+            session = task.get_context().get(active_profile) if task is not None else None
+        except Exception:
+            return
+        if session is None or session not in sessions:
+            return
+        frames = _stack(frame)
+        # Drop the event loop's own frames above the running callback
+        for i in range(len(frames) - 1, -1, -1):
+            code = frames[i].f_code
+            if code.co_name == "_run" and code.co_filename.endswith(_ASYNCIO_EVENTS):
+                frames = frames[i + 1:]
+                break
+        key = ";".join(["[event loop]"] + [_frame_label(f.f_code) for f in frames])
+        session.samples[key] += 1
+        session.loop_samples += 1
+
+    def _finish(self, session: ProfileSession):
+        session.finished_at = session.finished_at or time.time()
+        with self._lock:
+            if session in self.sessions:
+                self.sessions.remove(session)
+        path = os.path.join(self.get_out_dir(), session.name)
+        try:
+            os.makedirs(self.out_dir, exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                for stack, count in session.samples.most_common():
+                    f.write(f"{stack} {count}\n")
+        except OSError as e:
+            print(f"Warning: Failed to write profile {path}: {e}")
+            return
+        capture = {
+            "name": session.name,
+            "label": session.label,
+            "started": session.started,
+            "duration_s": round(session.finished_at - session.started, 3),
+            "interval_ms": self.interval * 1000,
+            "loop_samples": session.loop_samples,
+            "worker_samples": session.worker_samples,
+        }
+        with self._lock:
+            self.captures.append(capture)
+            del self.captures[:-100]
+        print(f"Profile saved: {path} ({session.loop_samples} loop / {session.worker_samples} worker samples)")
+
+    # --- listing ---
+
+    def list_profiles(self) -> List[Dict[str, Any]]:
+        """Captures on disk (including ones from earlier runs), newest first"""
+        out_dir = self.get_out_dir()
+        with self._lock:
+            known = {c["name"]: c for c in self.captures}
+        profiles = []
+        if os.path.isdir(out_dir):
+            for name in os.listdir(out_dir):
+                if not name.endswith(".folded"):
+                    continue
+                st = os.stat(os.path.join(out_dir, name))
+                profiles.append({"name": name, "size": st.st_size, "modified": st.st_mtime, **known.get(name, {})})
+        profiles.sort(key=lambda p: p["modified"], reverse=True)
+        return profiles
+
+    def profile_path(self, name: str) -> Optional[str]:
+        if os.path.basename(name) != name or not name.endswith(".folded"):
+            return None
+        path = os.path.join(self.get_out_dir(), name)
+        return path if os.path.exists(path) else None
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"active": [s.label for s in self.sessions], "captures": len(self.captures)}
+
+# Global instance
+profiler = SamplingProfiler(interval=float(os.environ.get("NOTEBOOKLM_PROFILE_INTERVAL_MS", "5")) / 1000)
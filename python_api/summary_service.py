@@ -0,0 +1,202 @@
+import asyncio
+import inspect
+import json
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Any
+from file_io import json_saver
+
+SUMMARY_PROMPT = (
+    "Please analyze the source document titled '{title}'. "
+    "Provide a concise summary (2-3 sentences) and list 3-5 key topics. "
+    "Structure your response strictly with '## Summary' followed by the summary, and '## Key Topics' followed by the list. "
+    "Focus ONLY on this source."
+)
+
+def _accepts_source_ids(ask) -> bool:
+    """Whether this client version's chat.ask can scope a question to sources"""
+    try:
+        params = inspect.signature(ask).parameters
+    except (TypeError, ValueError):
+        return False
+    return "source_ids" in params or any(p.kind == p.VAR_KEYWORD for p in params.values())
+
+class SummaryService:
+    """Per-source summaries cached by source id, kept separate from chat history."""
+
+    def __init__(self, cache_file: str = "source_summaries.json", max_concurrency: int = 4):
+        self.cache_file = Path(cache_file)
+        self.max_concurrency = max_concurrency
+        # notebook_id -> source_id -> {"summary", "fingerprint", "created_at"}
+        self.summaries: Dict[str, Dict[str, dict]] = {}
+        # notebook_id -> source_id -> last seen serialized source
+        self.known_sources: Dict[str, Dict[str, dict]] = {}
+        self._inflight: Dict[tuple, asyncio.Future] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.hits = 0
+        self.misses = 0
+        self.shared = 0
+        # chat API class -> whether its ask() takes source_ids, checked once per class
+        self._scoped_ask: Dict[type, bool] = {}
+        self._saver = json_saver(
+            self.cache_file,
+            lambda: {nb: dict(entries) for nb, entries in self.summaries.items()},
+            indent=2, ensure_ascii=False
+        )
+        self._load()
+
+    def _load(self):
+        if self.cache_file.exists():
+            try:
+                self.summaries = json.loads(self.cache_file.read_text(encoding="utf-8"))
+            except:
+                self.summaries = {}
+
+    def _save(self):
+        self._saver.request()
+
+    @staticmethod
+    def fingerprint(source: Dict[str, Any]) -> str:
+        return f"{source.get('title')}|{source.get('url')}|{source.get('status')}"
+
+    def sync_sources(self, notebook_id: str, sources: List[Dict[str, Any]]):
+        """Record the latest source listing and drop summaries of changed or removed sources"""
+        self.known_sources[notebook_id] = {s["id"]: s for s in sources}
+        cached = self.summaries.get(notebook_id)
+        if not cached:
+            return
+
+        stale = [
+            sid for sid, entry in cached.items()
+            if sid not in self.known_sources[notebook_id]
+            or entry.get("fingerprint") != self.fingerprint(self.known_sources[notebook_id][sid])
+        ]
+        if stale:
+            for sid in stale:
+                del cached[sid]
+            print(f"Invalidated {len(stale)} cached summaries for notebook {notebook_id}")
+            self._save()
+
+    def invalidate(self, notebook_id: str, source_id: Optional[str] = None):
+        if notebook_id not in self.summaries:
+            return
+        if source_id is None:
+            del self.summaries[notebook_id]
+        elif source_id in self.summaries[notebook_id]:
+            del self.summaries[notebook_id][source_id]
+        else:
+            return
+        self._save()
+
+    def get_cached(self, notebook_id: str, source_id: str) -> Optional[str]:
+        entry = self.summaries.get(notebook_id, {}).get(source_id)
+        return entry["summary"] if entry else None
+
+    def get_cached_for_notebook(self, notebook_id: str) -> Dict[str, str]:
+        return {sid: e["summary"] for sid, e in self.summaries.get(notebook_id, {}).items()}
+
+    async def _fetch_summary(self, client, notebook_id: str, source_id: str, title: str) -> str:
+        # Prefer the Source Guide RPC: it is cheaper than a chat turn and
+        # does not add anything to the notebook's conversation
+        if hasattr(client.sources, "get_guide"):
+            try:
+                guide = await client.sources.get_guide(notebook_id, source_id)
+                if isinstance(guide, dict):
+                    summary, keywords = guide.get("summary"), guide.get("keywords")
+                else:
+                    summary, keywords = getattr(guide, "summary", None), getattr(guide, "keywords", None)
+                if summary:
+                    text = f"## Summary\n{summary}"
+                    if keywords:
+                        text += "\n\n## Key Topics\n" + "\n".join(f"- {k}" for k in keywords)
+                    return text
+            except Exception as e:
+                print(f"Source guide unavailable for {source_id}, falling back to chat: {e}")
+
+        prompt = SUMMARY_PROMPT.format(title=title)
+        chat_type = type(client.chat)
+        if chat_type not in self._scoped_ask:
+            self._scoped_ask[chat_type] = _accepts_source_ids(client.chat.ask)
+        if self._scoped_ask[chat_type]:
+            result = await client.chat.ask(notebook_id, prompt, source_ids=[source_id])
+        else:
+            # Older client versions cannot scope a question to sources
+            result = await client.chat.ask(notebook_id, prompt)
+        return result.answer
+
+    async def get_summary(self, client, notebook_id: str, source_id: str, title: Optional[str] = None, force: bool = False) -> str:
+        """Return the summary for a source, generating it only on a cache miss"""
+        if not force:
+            cached = self.get_cached(notebook_id, source_id)
+            if cached is not None:
+                self.hits += 1
+                return cached
+
+        # Concurrent requests for the same source share one generation
+        key = (notebook_id, source_id)
+        if key in self._inflight:
+            self.shared += 1
+            return await asyncio.shield(self._inflight[key])
+
+        self.misses += 1
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            if self._semaphore is None:
+                self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+            source = self.known_sources.get(notebook_id, {}).get(source_id, {})
+            title = title or source.get("title") or source_id
+
+            async with self._semaphore:
+                print(f"Generating summary for source {source_id} ({title})")
+                summary = await self._fetch_summary(client, notebook_id, source_id, title)
+
+            self.summaries.setdefault(notebook_id, {})[source_id] = {
+                "summary": summary,
+                "fingerprint": self.fingerprint(source) if source else None,
+                "created_at": time.time()
+            }
+            self._save()
+            future.set_result(summary)
+            return summary
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so a future nobody else awaits does not warn
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+
+    async def summarize_sources(self, client, notebook_id: str, source_ids: Optional[List[str]] = None, force: bool = False) -> Dict[str, Any]:
+        """Summarize many (or all known) sources of a notebook with bounded concurrency"""
+        if source_ids is None:
+            source_ids = list(self.known_sources.get(notebook_id, {}).keys())
+
+        results = await asyncio.gather(
+            *(self.get_summary(client, notebook_id, sid, force=force) for sid in source_ids),
+            return_exceptions=True
+        )
+
+        summaries, errors = {}, {}
+        for sid, result in zip(source_ids, results):
+            if isinstance(result, Exception):
+                errors[sid] = str(result)
+            else:
+                summaries[sid] = result
+        return {"summaries": summaries, "errors": errors}
+
+    def get_stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "cached": sum(len(entries) for entries in self.summaries.values()),
+            "inflight": len(self._inflight),
+            "hits": self.hits,
+            "misses": self.misses,
+            "shared": self.shared,
+            "hit_ratio": round(self.hits / total, 3) if total else None,
+        }
+
+# Global instance
+summary_service = SummaryService()
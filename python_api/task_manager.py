@@ -7,7 +7,7 @@ class TaskManager:
         # task_id -> task_dict
         self.tasks: Dict[str, dict] = {}
         
-    def create_task(self, type: str, notebook_id: str) -> str:
+    def create_task(self, type: str, notebook_id: str, profile: Optional[str] = None) -> str:
         task_id = str(uuid.uuid4())
         self.tasks[task_id] = {
             "id": task_id,
@@ -17,7 +17,9 @@ class TaskManager:
             "created_at": time.time(),
             "updated_at": time.time(),
             "result": None,
-            "error": None
+            "error": None,
+            "reused": None,
+            "profile": profile
         }
         return task_id
         
@@ -30,6 +32,12 @@ class TaskManager:
             if error:
                 self.tasks[task_id]["error"] = error
                 
+    def mark_reused(self, task_id: str, reuse: dict):
+        """Record that a task was served by another identical generation"""
+        if task_id in self.tasks:
+            self.tasks[task_id]["reused"] = reuse
+            self.tasks[task_id]["updated_at"] = time.time()
+
     def get_task(self, task_id: str) -> Optional[dict]:
         return self.tasks.get(task_id)
         
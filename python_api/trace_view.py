@@ -0,0 +1,117 @@
+"""Print traces written by the backend (NOTEBOOKLM_TRACE=1) with their critical path.
+
+The critical path is the chain of spans that determined the request's end
+time: starting from the root, repeatedly take the child that finished last,
+then the child that finished before that one started, and so on.
+
+Usage:
+    python trace_view.py [traces.jsonl ...] [--name select_notebook] [--slowest 3] [--trace ID]
+"""
+import argparse
+import json
+import os
+import sys
+from collections import defaultdict
+
+def load_spans(paths):
+    spans = []
+    for path in paths:
+        if not os.path.exists(path):
+            continue
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    spans.append(json.loads(line))
+    return spans
+
+def group_traces(spans):
+    traces = defaultdict(list)
+    for span in spans:
+        traces[span["trace_id"]].append(span)
+    return traces
+
+def roots_of(spans):
+    ids = {s["span_id"] for s in spans}
+    return [s for s in spans if not s["parent_id"] or s["parent_id"] not in ids]
+
+def critical_path(span, children):
+    """Spans on the critical path below (and including) span, in start order"""
+    chosen, cursor = [], span["end_ns"]
+    for child in sorted(children[span["span_id"]], key=lambda s: s["end_ns"], reverse=True):
+        if child["end_ns"] <= cursor:
+            chosen.append(child)
+            cursor = child["start_ns"]
+    path = [span]
+    for child in reversed(chosen):
+        path.extend(critical_path(child, children))
+    return path
+
+def describe(span):
+    attrs = {k: v for k, v in span.get("attributes", {}).items() if v not in (None, "")}
+    extra = " ".join(f"{k}={v}" for k, v in attrs.items())
+    status = "" if span["status"] == "ok" else f" [{span['error'] or span['status']}]"
+    return f"{span['name']}{status}" + (f"  ({extra})" if extra else "")
+
+def print_trace(spans):
+    children = defaultdict(list)
+    for span in spans:
+        children[span["parent_id"]].append(span)
+    root = max(roots_of(spans), key=lambda s: s["duration_ms"])
+    on_path = {s["span_id"] for s in critical_path(root, children)}
+    t0 = root["start_ns"]
+
+    print(f"Trace {root['trace_id']}  {root['duration_ms']:.1f} ms  {describe(root)}")
+
+    def walk(span, depth):
+        marker = "*" if span["span_id"] in on_path else " "
+        offset = (span["start_ns"] - t0) / 1e6
+        print(f" {marker} {offset:9.1f} {span['duration_ms']:9.1f} ms  {'  ' * depth}{describe(span)}")
+        for child in sorted(children[span["span_id"]], key=lambda s: s["start_ns"]):
+            walk(child, depth + 1)
+
+    print(f"   {'start':>9} {'duration':>12}")
+    walk(root, 0)
+
+    print("\nCritical path (self time = time not covered by a critical child):")
+    path = critical_path(root, children)
+    for span in path:
+        covered = sum(c["duration_ms"] for c in children[span["span_id"]] if c["span_id"] in on_path)
+        self_ms = max(0.0, span["duration_ms"] - covered)
+        print(f"  {self_ms:9.1f} ms self  {span['duration_ms']:9.1f} ms total  {describe(span)}")
+    print()
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("files", nargs="*", default=["traces.jsonl"])
+    parser.add_argument("--trace", help="Trace id to show")
+    parser.add_argument("--name", help="Only traces whose root span name contains this")
+    parser.add_argument("--slowest", type=int, default=1, help="Show the N slowest matching traces")
+    args = parser.parse_args()
+
+    traces = group_traces(load_spans(args.files))
+    if not traces:
+        print("No spans found (is NOTEBOOKLM_TRACE=1 set on the backend?)")
+        return 1
+
+    if args.trace:
+        selected = [traces[args.trace]] if args.trace in traces else []
+    else:
+        candidates = []
+        for spans in traces.values():
+            root = max(roots_of(spans), key=lambda s: s["duration_ms"])
+            if args.name and args.name not in root["name"]:
+                continue
+            candidates.append((root["duration_ms"], spans))
+        candidates.sort(key=lambda c: c[0], reverse=True)
+        selected = [spans for _, spans in candidates[:args.slowest]]
+
+    if not selected:
+        print("No matching traces")
+        return 1
+    for spans in selected:
+        print_trace(spans)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,196 @@
+import contextvars
+import json
+import os
+import queue
+import secrets
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+class Span:
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "start_ns", "end_ns", "attributes", "status", "error")
+
+    def __init__(self, name: str, parent: Optional["Span"], attributes: Dict[str, Any]):
+        self.trace_id = parent.trace_id if parent else secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent.span_id if parent else None
+        self.name = name
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes = attributes
+        self.status = "ok"
+        self.error: Optional[str] = None
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": round((self.end_ns - self.start_ns) / 1e6, 3),
+            "status": self.status,
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+    def to_otlp(self) -> Dict[str, Any]:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [{"key": k, "value": {"stringValue": str(v)}} for k, v in self.attributes.items()],
+            "status": {"code": 2, "message": self.error or ""} if self.status == "error" else {"code": 1},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+# Active span of the current task; asyncio copies it into every task created from here
+current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("current_span", default=None)
+
+class SpanExporter:
+    """Writes finished spans from a background thread so exporting never touches the loop.
+
+    Spans go to a size-rotated JSONL file, or to an OTLP/HTTP collector
+    (JSON encoding, POST {endpoint}/v1/traces) when one is configured.
+    """
+
+    def __init__(self, path: Optional[str] = None, otlp_endpoint: Optional[str] = None,
+                 max_bytes: int = 5 * 1024 * 1024, backups: int = 3, service_name: str = "notebooklm-backend"):
+        self.path = path
+        self.otlp_endpoint = otlp_endpoint.rstrip("/") if otlp_endpoint else None
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.service_name = service_name
+        self.queue: "queue.Queue[Span]" = queue.Queue(maxsize=10000)
+        self.stats = {"exported": 0, "dropped": 0, "failed": 0}
+        self._thread: Optional[threading.Thread] = None
+
+    def export(self, span: Span):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+            self._thread.start()
+        try:
+            self.queue.put_nowait(span)
+        except queue.Full:
+            self.stats["dropped"] += 1
+
+    def _run(self):
+        if not self.otlp_endpoint and not self.path:
+            from file_io import log_dir
+            self.path = os.path.join(log_dir(), "traces.jsonl")
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < 512:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                if self.otlp_endpoint:
+                    self._post_otlp(batch)
+                else:
+                    self._write_jsonl(batch)
+                self.stats["exported"] += len(batch)
+            except Exception as e:
+                self.stats["failed"] += len(batch)
+                print(f"Warning: Failed to export {len(batch)} spans: {e}")
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+    def _rotate(self):
+        for i in range(self.backups - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{i}"):
+                os.replace(f"{self.path}.{i}", f"{self.path}.{i + 1}")
+        os.replace(self.path, f"{self.path}.1")
+
+    def _write_jsonl(self, batch: List[Span]):
+        if os.path.exists(self.path) and os.path.getsize(self.path) > self.max_bytes:
+            self._rotate()
+        with open(self.path, "a", encoding="utf-8") as f:
+            for span in batch:
+                f.write(json.dumps(span.to_dict(), ensure_ascii=False, default=str) + "\n")
+
+    def _post_otlp(self, batch: List[Span]):
+        body = {
+            "resourceSpans": [{
+                "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": self.service_name}}]},
+                "scopeSpans": [{"scope": {"name": "notebooklm-desktop"}, "spans": [s.to_otlp() for s in batch]}],
+            }]
+        }
+        req = urllib.request.Request(
+            f"{self.otlp_endpoint}/v1/traces", data=json.dumps(body).encode("utf-8"),
+            headers={"Content-Type": "application/json"}, method="POST"
+        )
+        with urllib.request.urlopen(req, timeout=5) as resp:
+            resp.read()
+
+    def flush(self, timeout: float = 5.0):
+        """Block until queued spans are written (call from a thread, or at exit)"""
+        deadline = time.time() + timeout
+        while self.queue.unfinished_tasks and time.time() < deadline:
+            time.sleep(0.02)
+
+class Tracer:
+    """Lightweight spans; a no-op unless an exporter is configured"""
+
+    def __init__(self, exporter: Optional[SpanExporter] = None):
+        self.exporter = exporter
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        if self.exporter is None:
+            yield None
+            return
+        parent = current_span.get()
+        span = Span(name, parent, attributes)
+        token = current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.status = "error"
+            span.error = f"{type(e).__name__}: {e}"[:300]
+            raise
+        finally:
+            span.end_ns = time.time_ns()
+            try:
+                current_span.reset(token)
+            except ValueError:
+                # Async generators can finish in a different context than they started
+                current_span.set(parent)
+            self.exporter.export(span)
+
+    def get_stats(self) -> Dict[str, Any]:
+        if self.exporter is None:
+            return {"enabled": False}
+        return {
+            "enabled": True,
+            "target": self.exporter.otlp_endpoint or self.exporter.path,
+            "queued": self.exporter.queue.qsize(),
+            **self.exporter.stats,
+        }
+
+def tracer_from_env() -> Tracer:
+    otlp = os.environ.get("NOTEBOOKLM_OTLP_ENDPOINT")
+    path = os.environ.get("NOTEBOOKLM_TRACE_FILE")
+    if not otlp and not path and os.environ.get("NOTEBOOKLM_TRACE", "0") != "1":
+        return Tracer()
+    return Tracer(SpanExporter(path=path, otlp_endpoint=otlp))
+
+# Global instance
+tracer = tracer_from_env()
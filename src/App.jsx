@@ -28,6 +28,8 @@ export default function App() {
   const [artifacts, setArtifacts] = useState([]);
 
   const chatEndRef = useRef();
+  // In-flight open_notebook stream; aborted when another notebook is selected
+  const openNotebookAbortRef = useRef(null);
 
   /* Resizing State */
   const [leftWidth, setLeftWidth] = useState(280);
@@ -48,20 +50,7 @@ export default function App() {
   }, [isDarkMode]);
 
   useEffect(() => {
-    if (isAuthenticated && activeNotebookId) {
-      setMessages([]);
-      setLoadingHistory(true);
-      fetch(`http://127.0.0.1:8000/api/history?notebook_id=${activeNotebookId}`)
-        .then(res => res.json())
-        .then(data => {
-          setMessages(data);
-          setLoadingHistory(false);
-        })
-        .catch(err => {
-          console.error(err);
-          setLoadingHistory(false);
-        });
-    } else {
+    if (!isAuthenticated || !activeNotebookId) {
       setMessages([]);
     }
   }, [isAuthenticated, activeNotebookId]);
@@ -111,45 +100,74 @@ export default function App() {
   };
 
   const handleNotebookSelect = async (id) => {
+    openNotebookAbortRef.current?.abort();
+    const controller = new AbortController();
+    openNotebookAbortRef.current = controller;
+
     setActiveNotebookId(id);
     setSources([]);
     setSuggestions([]);
 
     // Clear messages immediately to avoid stale content
     setMessages([]);
+    setLoadingSources(true);
+    setLoadingHistory(true);
+
+    // Each section is applied as soon as the backend streams it
+    const applySection = ({ section, data, error }) => {
+      // Late sections of a notebook the user already left must not overwrite the new one
+      if (controller.signal.aborted) return;
+      if (error) console.error(`Failed to load ${section}:`, error);
+      if (section === "sources") {
+        setSources(data || []);
+        setLoadingSources(false);
+      } else if (section === "suggestions") {
+        setSuggestions(data || []);
+      } else if (section === "artifacts") {
+        setArtifacts(data || []);
+      } else if (section === "remote_artifacts") {
+        // Local + previously generated remote artifacts; keep the local list if sync failed
+        if (!error) setArtifacts(data || []);
+      } else if (section === "history") {
+        setMessages(data || []);
+        setLoadingHistory(false);
+      }
+    };
 
     try {
-      setLoadingSources(true);
-      const res = await fetch("http://127.0.0.1:8000/api/select_notebook", {
+      const res = await fetch("http://127.0.0.1:8000/api/open_notebook", {
         method: "POST",
         headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({ notebook_id: id })
+        body: JSON.stringify({ notebook_id: id }),
+        signal: controller.signal
       });
-      const data = await res.json();
+      if (!res.ok) throw new Error(`open_notebook failed: ${res.status}`);
 
-      if (data.status === "success") {
-        setSources(data.sources || []);
+      const reader = res.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = "";
 
-        // Load artifacts
-        fetch(`http://127.0.0.1:8000/api/notebooks/${id}/artifacts`)
-          .then(res => res.json())
-          .then(aData => setArtifacts(aData.artifacts || []))
-          .catch(e => console.error("Failed to load artifacts:", e));
-      }
-      setLoadingSources(false);
-
-      // Fetch suggestions
-      console.log("Fetching suggestions for notebook:", id);
-      fetch(`http://127.0.0.1:8000/api/notebook_suggestions/${id}`)
-        .then(res => res.json())
-        .then(data => {
-          console.log("Suggestions received:", data);
-          setSuggestions(data.suggestions || []);
-        })
-        .catch(err => console.error("Error fetching suggestions:", err));
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
 
+        buffer += decoder.decode(value, { stream: true });
+        let newline;
+        while ((newline = buffer.indexOf("\n")) >= 0) {
+          const line = buffer.slice(0, newline).trim();
+          buffer = buffer.slice(newline + 1);
+          if (line) applySection(JSON.parse(line));
+        }
+      }
     } catch (e) {
-      console.error("Failed to select notebook:", e);
+      if (e.name !== "AbortError") console.error("Failed to select notebook:", e);
+    } finally {
+      // The newer selection owns the loading flags now
+      if (openNotebookAbortRef.current === controller) {
+        openNotebookAbortRef.current = null;
+        setLoadingSources(false);
+        setLoadingHistory(false);
+      }
     }
   };
 
@@ -266,7 +284,7 @@ export default function App() {
 
         // Refresh artifacts
         if (activeNotebookId) {
-          fetch(`http://127.0.0.1:8000/api/notebooks/${activeNotebookId}/artifacts`)
+          fetch(`http://127.0.0.1:8000/api/notebooks/${activeNotebookId}/artifacts?include_remote=true`)
             .then(res => res.json())
             .then(d => setArtifacts(d.artifacts || []))
             .catch(console.error);
@@ -486,6 +504,12 @@ export default function App() {
               onThemeToggle={() => setIsDarkMode(!isDarkMode)}
               isLoading={loadingSources}
               artifacts={artifacts}
+              onRefreshArtifacts={() =>
+                fetch(`http://127.0.0.1:8000/api/notebooks/${activeNotebookId}/artifacts?include_remote=true`)
+                  .then(res => res.json())
+                  .then(d => setArtifacts(d.artifacts || []))
+                  .catch(console.error)
+              }
             />
           </>
         )}
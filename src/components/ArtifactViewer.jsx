@@ -181,23 +181,27 @@ const InteractiveQuiz = ({ content }) => {
 
 export default function ArtifactViewer({ artifact, notebookId, onClose }) {
     const [content, setContent] = useState('');
+    const [parsed, setParsed] = useState(null);
     const [loading, setLoading] = useState(true);
     const [error, setError] = useState(null);
 
     useEffect(() => {
         if (!artifact) return;
 
-        const isTextBased = ['quiz', 'study_guide', 'mindmap', 'flashcards'].includes(artifact.type);
+        const isTextBased = ['quiz', 'study_guide', 'report', 'mindmap', 'flashcards'].includes(artifact.type);
 
         if (isTextBased) {
             setLoading(true);
-            fetch(`http://127.0.0.1:8000/api/notebooks/${notebookId}/artifacts/${artifact.id}/content`)
+            // parsed=true returns quiz/flashcard/mindmap data already normalized by the backend (without the raw text)
+            fetch(`http://127.0.0.1:8000/api/notebooks/${notebookId}/artifacts/${artifact.id}/content?parsed=true`)
                 .then(res => {
                     if (!res.ok) throw new Error("Failed to load content");
                     return res.json();
                 })
                 .then(data => {
-                    setContent(data.content);
+                    // Only one of content/parsed is sent
+                    setContent(data.content ?? '');
+                    setParsed(data.parsed ?? null);
                     setLoading(false);
                 })
                 .catch(err => {
@@ -238,7 +242,9 @@ export default function ArtifactViewer({ artifact, notebookId, onClose }) {
 
     // Parse content for Mind Map
     let mindMapData = null;
-    if (artifact.type === 'mindmap' && content) {
+    if (artifact.type === 'mindmap' && parsed) {
+        mindMapData = parsed;
+    } else if (artifact.type === 'mindmap' && content) {
         try {
             mindMapData = typeof content === 'string' ? JSON.parse(content) : content;
             if (mindMapData.root) mindMapData = mindMapData.root;
@@ -310,7 +316,9 @@ export default function ArtifactViewer({ artifact, notebookId, onClose }) {
                         <span style={{ fontSize: '1.5rem' }}>
                             {artifact.type === 'quiz' ? '❓' :
                                 artifact.type === 'study_guide' ? '📚' :
-                                    artifact.type === 'mindmap' ? '🧠' : '📄'}
+                                    artifact.type === 'mindmap' ? '🧠' :
+                                        artifact.type === 'audio' ? '🎧' :
+                                            artifact.type === 'video' ? '🎥' : '📄'}
                         </span>
                         <div>
                             <h3 style={{ margin: 0, fontSize: '1.1rem', fontWeight: '600', color: 'var(--text-primary)' }}>{artifact.title}</h3>
@@ -344,7 +352,16 @@ export default function ArtifactViewer({ artifact, notebookId, onClose }) {
                     ) : (
                         <div className="artifact-content" style={{ color: 'var(--text-primary)', height: '100%' }}>
                             {/* Render based on type */}
-                            {artifact.type === 'study_guide' || artifact.type === 'flashcards' ? (
+                            {artifact.type === 'flashcards' && parsed?.cards ? (
+                                <div style={{ lineHeight: '1.8', maxWidth: '800px', margin: '0 auto', fontSize: '1.05rem' }}>
+                                    {parsed.cards.map((card, i) => (
+                                        <div key={i} style={{ marginBottom: '16px', padding: '16px', background: 'var(--surface-color)', borderRadius: '8px', border: '1px solid var(--border-color)' }}>
+                                            <div style={{ fontWeight: 'bold' }}>Q{i + 1}: {card.front}</div>
+                                            <div>{card.back}</div>
+                                        </div>
+                                    ))}
+                                </div>
+                            ) : artifact.type === 'study_guide' || artifact.type === 'report' || artifact.type === 'flashcards' ? (
                                 <div style={{ lineHeight: '1.8', maxWidth: '800px', margin: '0 auto', fontSize: '1.05rem' }}>
                                     <ReactMarkdown>{content}</ReactMarkdown>
                                 </div>
@@ -361,7 +378,17 @@ export default function ArtifactViewer({ artifact, notebookId, onClose }) {
                                     </div>
                                 ) : <div>Invalid Mind Map Data (Check Console)</div>
                             ) : artifact.type === 'quiz' ? (
-                                <InteractiveQuiz content={content} />
+                                <InteractiveQuiz content={parsed || content} />
+                            ) : artifact.type === 'audio' ? (
+                                <div style={{ display: 'flex', justifyContent: 'center', padding: '40px' }}>
+                                    <audio controls preload="metadata" style={{ width: '100%', maxWidth: '700px' }}
+                                        src={`http://127.0.0.1:8000/api/notebooks/${notebookId}/artifacts/${artifact.id}/media`} />
+                                </div>
+                            ) : artifact.type === 'video' ? (
+                                <div style={{ display: 'flex', justifyContent: 'center' }}>
+                                    <video controls preload="metadata" style={{ maxWidth: '100%', maxHeight: '70vh' }}
+                                        src={`http://127.0.0.1:8000/api/notebooks/${notebookId}/artifacts/${artifact.id}/media`} />
+                                </div>
                             ) : (
                                 <div style={{ textAlign: 'center', padding: '40px', color: 'var(--text-secondary)' }}>
                                     Preview not available for this file type.<br />
@@ -95,6 +95,7 @@ export default function SourceList({ sources, notebookId, onRefresh, width, isDa
             case 'flashcards': return '🃏';
             case 'mindmap': return '🧠';
             case 'study_guide': return '📚';
+            case 'report': return '📝';
             default: return '📄';
         }
     };
@@ -152,8 +153,26 @@ export default function SourceList({ sources, notebookId, onRefresh, width, isDa
         }
     };
 
-    const handleViewArtifact = (artifact) => {
-        setViewingArtifact(artifact);
+    const handleViewArtifact = async (artifact) => {
+        if (!artifact.remote) {
+            setViewingArtifact(artifact);
+            return;
+        }
+        // Generated earlier in NotebookLM: download it instead of regenerating
+        if (!artifact.details?.completed) {
+            alert(`此內容尚未完成 (${artifact.details?.status})`);
+            return;
+        }
+        try {
+            const res = await fetch(`http://127.0.0.1:8000/api/notebooks/${notebookId}/artifacts/remote/${artifact.details.remote_id}/download`, { method: 'POST' });
+            if (!res.ok) throw new Error(await res.text());
+            const data = await res.json();
+            setViewingArtifact(data.artifact);
+            if (onRefreshArtifacts) onRefreshArtifacts();
+        } catch (e) {
+            console.error("Failed to download remote artifact", e);
+            alert("下載失敗: " + e.message);
+        }
     };
     const handleDownload = async () => {
         const selected = sources.filter(s => selectedIds.has(s.id));
@@ -445,7 +464,7 @@ export default function SourceList({ sources, notebookId, onRefresh, width, isDa
                                         {artifact.title || artifact.type}
                                     </div>
                                     <div style={{ fontSize: '0.75rem', color: isDarkMode ? '#888' : '#666' }}>
-                                        {new Date(artifact.created_at).toLocaleString()}
+                                        {artifact.created_at ? new Date(artifact.created_at).toLocaleString() : ''}{artifact.remote ? ' · ☁️' : ''}
                                     </div>
                                 </div>
                             </div>